@@ -0,0 +1,161 @@
+# benchmark_almacenamiento.py
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+from benchmark_estadisticas import medir
+from gestor_bd import DIFICULTAD, FECHA, PARTIDAS, GestorBaseDatos
+from migraciones import aplicar_migraciones
+from repositorio import CODIGOS_DIFICULTAD, PALABRAS_POR_DEFECTO
+
+
+def crear_base_anterior(nombre_db: str, cantidad: int, semilla: int = 42):
+    """Base con el esquema anterior (estadisticas con texto repetido por fila) y N partidas sintéticas"""
+    conn = sqlite3.connect(nombre_db)
+    conn.execute('''
+        CREATE TABLE estadisticas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            fecha TEXT NOT NULL,
+            palabra TEXT NOT NULL,
+            intentos INTEGER NOT NULL,
+            victoria INTEGER NOT NULL,
+            tiempo_segundos INTEGER,
+            dificultad TEXT NOT NULL,
+            jugador_id INTEGER
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE palabras (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            palabra TEXT UNIQUE NOT NULL,
+            dificultad TEXT NOT NULL,
+            categoria TEXT NOT NULL
+        )
+    ''')
+    conn.executemany("INSERT INTO palabras (palabra, dificultad, categoria) VALUES (?, ?, ?)", PALABRAS_POR_DEFECTO)
+    
+    aleatorio = random.Random(semilla)
+    inicio = datetime(2024, 1, 1)
+    
+    def filas():
+        for i in range(cantidad):
+            palabra, dificultad, _ = aleatorio.choice(PALABRAS_POR_DEFECTO)
+            yield (
+                (inicio + timedelta(seconds=i * 37)).strftime("%Y-%m-%d %H:%M:%S"),
+                palabra,
+                aleatorio.randint(0, 8),
+                1 if aleatorio.random() < 0.6 else 0,
+                aleatorio.randint(5, 300),
+                dificultad,
+                aleatorio.choice([None, 1, 2, 3])
+            )
+    
+    with conn:
+        conn.executemany('''
+            INSERT INTO estadisticas (fecha, palabra, intentos, victoria, tiempo_segundos, dificultad, jugador_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', filas())
+    
+    # Índices, rachas, jugadores y épocas: todo menos el formato compacto
+    aplicar_migraciones(conn, hasta=7)
+    conn.execute("ANALYZE")
+    conn.execute("VACUUM")
+    conn.close()
+
+
+def tamano(nombre_db: str) -> int:
+    """Bytes que ocupan las páginas de la base (tras VACUUM coincide con el archivo)"""
+    conn = sqlite3.connect(nombre_db)
+    try:
+        return conn.execute("PRAGMA page_count").fetchone()[0] * conn.execute("PRAGMA page_size").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def consultas_anteriores(conn: sqlite3.Connection):
+    """Las consultas que hacía el gestor sobre la tabla estadisticas"""
+    return {
+        "ranking DIFICIL": lambda: conn.execute('''
+            SELECT palabra, intentos, tiempo_segundos, fecha, dificultad FROM estadisticas
+            WHERE victoria = 1 AND dificultad = ? ORDER BY intentos ASC, tiempo_segundos ASC LIMIT 10
+        ''', ("DIFICIL",)).fetchall(),
+        "histograma": lambda: conn.execute('''
+            SELECT victoria, dificultad, intentos, tiempo_segundos, COUNT(*) FROM estadisticas
+            GROUP BY victoria, dificultad, intentos, tiempo_segundos
+        ''').fetchall(),
+        "historial MEDIO (victorias)": lambda: conn.execute('''
+            SELECT id, fecha, palabra, intentos, victoria, tiempo_segundos, dificultad FROM estadisticas
+            WHERE dificultad = ? AND victoria = ? ORDER BY id DESC LIMIT 50
+        ''', ("MEDIO", 1)).fetchall(),
+        "historial último mes": lambda: conn.execute('''
+            SELECT id, fecha, palabra, intentos, victoria, tiempo_segundos, dificultad FROM estadisticas
+            WHERE fecha >= ? ORDER BY id DESC LIMIT 50
+        ''', ("2025-01-01",)).fetchall(),
+        "partidas por dificultad": lambda: conn.execute(
+            "SELECT dificultad, COUNT(*) FROM estadisticas GROUP BY dificultad"
+        ).fetchall(),
+    }
+
+
+def consultas_compactas(conn: sqlite3.Connection):
+    """Las mismas consultas tal como las hace ahora el gestor, sobre partidas"""
+    return {
+        "ranking DIFICIL": lambda: conn.execute(f'''
+            SELECT w.palabra, p.intentos, p.tiempo_segundos, {FECHA}, {DIFICULTAD} FROM {PARTIDAS}
+            WHERE p.victoria = 1 AND p.dificultad = ? ORDER BY p.intentos ASC, p.tiempo_segundos ASC LIMIT 10
+        ''', (CODIGOS_DIFICULTAD["DIFICIL"],)).fetchall(),
+        "histograma": lambda: conn.execute('''
+            SELECT victoria, dificultad, intentos, tiempo_segundos, COUNT(*) FROM partidas
+            GROUP BY victoria, dificultad, intentos, tiempo_segundos
+        ''').fetchall(),
+        "historial MEDIO (victorias)": lambda: conn.execute(f'''
+            SELECT p.id, {FECHA}, w.palabra, p.intentos, p.victoria, p.tiempo_segundos, {DIFICULTAD} FROM {PARTIDAS}
+            WHERE p.dificultad = ? AND p.victoria = ? ORDER BY p.id DESC LIMIT 50
+        ''', (CODIGOS_DIFICULTAD["MEDIO"], 1)).fetchall(),
+        "historial último mes": lambda: conn.execute(f'''
+            SELECT p.id, {FECHA}, w.palabra, p.intentos, p.victoria, p.tiempo_segundos, {DIFICULTAD} FROM {PARTIDAS}
+            WHERE p.momento >= ? ORDER BY p.id DESC LIMIT 50
+        ''', (GestorBaseDatos._a_momento("2025-01-01"),)).fetchall(),
+        "partidas por dificultad": lambda: conn.execute(
+            "SELECT dificultad, COUNT(*) FROM partidas GROUP BY dificultad"
+        ).fetchall(),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Compara tamaño y consultas del esquema anterior y del compacto")
+    parser.add_argument("--filas", type=int, default=1_000_000, help="Partidas sintéticas a generar")
+    parser.add_argument("--repeticiones", type=int, default=5, help="Ejecuciones por medición")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as carpeta:
+        nombre_db = os.path.join(carpeta, "benchmark.db")
+        
+        print(f"⏳ Generando {args.filas:,} partidas con el esquema anterior...")
+        crear_base_anterior(nombre_db, args.filas)
+        tamano_antes = tamano(nombre_db)
+        
+        conn = sqlite3.connect(nombre_db)
+        try:
+            antes = {nombre: medir(consulta, args.repeticiones) for nombre, consulta in consultas_anteriores(conn).items()}
+            
+            inicio = time.perf_counter()
+            aplicar_migraciones(conn)
+            duracion_migracion = time.perf_counter() - inicio
+            conn.execute("ANALYZE")
+            conn.execute("VACUUM")
+            despues = {nombre: medir(consulta, args.repeticiones) for nombre, consulta in consultas_compactas(conn).items()}
+        finally:
+            conn.close()
+        tamano_despues = tamano(nombre_db)
+        
+        print(f"🔄 Migración al formato compacto: {duracion_migracion:.1f} s")
+        print(f"💾 Tamaño: {tamano_antes / 2**20:.1f} MB -> {tamano_despues / 2**20:.1f} MB "
+              f"({100 * (1 - tamano_despues / tamano_antes):.0f}% menos)")
+        print(f"{'consulta':<30} {'antes ms':>10} {'después ms':>11}")
+        for nombre, tiempo in antes.items():
+            print(f"{nombre:<30} {tiempo:>10.2f} {despues[nombre]:>11.2f}")
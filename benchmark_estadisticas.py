@@ -0,0 +1,109 @@
+# benchmark_estadisticas.py
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+from gestor_bd import GestorBaseDatos
+from repositorio import CODIGOS_DIFICULTAD
+
+
+def generar_partidas(nombre_db: str, cantidad: int, semilla: int = 42):
+    """Rellena partidas con N partidas sintéticas, directamente en la tabla compacta
+    
+    Los triggers de resumen se quitan durante la carga y los resúmenes se recalculan
+    después de una vez, como haría una base que llegó ahí partida a partida.
+    """
+    gestor = GestorBaseDatos(nombre_db)
+    try:
+        conn = gestor.conn
+        aleatorio = random.Random(semilla)
+        palabras = conn.execute("SELECT id, dificultad FROM palabras").fetchall()
+        jugadores = [None] + [gestor.crear_jugador(f"Jugador {i}") for i in range(1, 4)]
+        inicio = int(datetime(2024, 1, 1).timestamp())
+        
+        def filas():
+            for i in range(cantidad):
+                palabra_id, dificultad = aleatorio.choice(palabras)
+                yield (
+                    inicio + i * 37,
+                    palabra_id,
+                    aleatorio.randint(0, 8),
+                    1 if aleatorio.random() < 0.6 else 0,
+                    aleatorio.randint(5, 300),
+                    CODIGOS_DIFICULTAD[dificultad],
+                    aleatorio.choice(jugadores)
+                )
+        
+        triggers = conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'partidas'"
+        ).fetchall()
+        with conn:
+            for nombre, _ in triggers:
+                conn.execute(f"DROP TRIGGER {nombre}")
+            conn.executemany('''
+                INSERT INTO partidas (momento, palabra_id, intentos, victoria, tiempo_segundos, dificultad, jugador_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', filas())
+            for _, sql in triggers:
+                conn.execute(sql)
+        
+        gestor.reconstruir_resumen_estadisticas()
+        gestor.reconstruir_rachas()
+        conn.execute("ANALYZE")
+    finally:
+        gestor.cerrar()
+
+
+def consultas(gestor: GestorBaseDatos):
+    """Las lecturas que hacen los paneles de estadísticas, tal como las hace el gestor"""
+    return {
+        "obtener_estadisticas": gestor.obtener_estadisticas,
+        "obtener_estadisticas (jugador)": lambda: gestor.obtener_estadisticas(1),
+        "obtener_estadisticas_extendidas": gestor.obtener_estadisticas_extendidas,
+        "obtener_estadisticas_extendidas (jugador)": lambda: gestor.obtener_estadisticas_extendidas(1),
+        "obtener_estadisticas_por_categoria": gestor.obtener_estadisticas_por_categoria,
+        "obtener_ranking": gestor.obtener_ranking,
+        "obtener_ranking (DIFICIL)": lambda: gestor.obtener_ranking(dificultad="DIFICIL"),
+        "obtener_ranking (jugador)": lambda: gestor.obtener_ranking(jugador_id=1),
+        "obtener_rachas": gestor.obtener_rachas,
+        "obtener_tendencia (mes)": lambda: gestor.obtener_tendencia("mes"),
+        "obtener_historial": gestor.obtener_historial,
+        "obtener_historial (MEDIO, victorias)": lambda: gestor.obtener_historial(dificultad="MEDIO", victoria=True),
+        "buscar": lambda: gestor.buscar("ON"),
+    }
+
+
+def medir(funcion, repeticiones: int) -> float:
+    """Devuelve el mejor tiempo (en ms) de varias ejecuciones"""
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1000
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Benchmark de las consultas de estadísticas del gestor")
+    parser.add_argument("--filas", type=int, default=1_000_000, help="Partidas sintéticas a generar")
+    parser.add_argument("--repeticiones", type=int, default=5, help="Ejecuciones por medición")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as carpeta:
+        nombre_db = os.path.join(carpeta, "benchmark.db")
+        
+        print(f"⏳ Generando {args.filas:,} partidas sintéticas...")
+        inicio = time.perf_counter()
+        generar_partidas(nombre_db, args.filas)
+        print(f"✅ Generadas en {time.perf_counter() - inicio:.1f} s")
+        
+        gestor = GestorBaseDatos(nombre_db)
+        try:
+            print(f"{'consulta':<45} {'ms':>10}")
+            for nombre, consulta in consultas(gestor).items():
+                print(f"{nombre:<45} {medir(consulta, args.repeticiones):>10.2f}")
+        finally:
+            gestor.cerrar()
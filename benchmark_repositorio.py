@@ -0,0 +1,50 @@
+# benchmark_repositorio.py
+import time
+from typing import Callable
+from repositorio import RepositorioJuego
+
+# Partidas que se repiten en la medición (palabra, intentos, victoria, tiempo, dificultad, jugador_id)
+PARTIDAS_PRUEBA = [
+    ("SOL", 2, True, 30, "FACIL", None),
+    ("LUNA", 5, False, 80, "FACIL", None),
+    ("PYTHON", 3, True, 45, "MEDIO", 1),
+    ("DOCKER", 1, True, 20, "DIFICIL", 1),
+    ("JAVA", 3, True, 15, "MEDIO", 2),
+    ("REACT", 4, False, 120, "DIFICIL", 2),
+    ("CASA", 2, True, None, "FACIL", 1),
+    ("MESA", 2, True, 30, "FACIL", None),
+]
+
+
+def medir_guardado(crear: Callable[[], RepositorioJuego], partidas: int) -> float:
+    """Milisegundos en guardar N partidas y leer estadísticas y ranking"""
+    repo = crear()
+    try:
+        inicio = time.perf_counter()
+        for i in range(partidas):
+            palabra, intentos, victoria, tiempo, dificultad, jugador_id = PARTIDAS_PRUEBA[i % len(PARTIDAS_PRUEBA)]
+            repo.guardar_partida(palabra, intentos, victoria, tiempo, dificultad, jugador_id)
+        repo.sincronizar()
+        repo.obtener_estadisticas()
+        repo.obtener_ranking()
+        return (time.perf_counter() - inicio) * 1000
+    finally:
+        repo.cerrar()
+
+
+if __name__ == "__main__":
+    import argparse
+    from gestor_bd import GestorBaseDatos
+    from repositorio_memoria import RepositorioMemoria
+    
+    parser = argparse.ArgumentParser(description="Mide el guardado de partidas en cada repositorio")
+    parser.add_argument("--partidas", type=int, default=10000, help="Partidas que se guardan en cada repositorio")
+    args = parser.parse_args()
+    
+    implementaciones = {
+        "SQLite": lambda: GestorBaseDatos(":memory:"),
+        "Memoria": RepositorioMemoria,
+    }
+    
+    for nombre, crear in implementaciones.items():
+        print(f"⏱️ {nombre}: {args.partidas:,} partidas en {medir_guardado(crear, args.partidas):.1f} ms")
@@ -0,0 +1,150 @@
+# conexiones.py
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+from instrumentacion import ConexionInstrumentada
+
+# Perfiles de durabilidad: (journal_mode, synchronous)
+PERFILES_DURABILIDAD = {
+    "seguro": ("WAL", "FULL"),      # fsync en cada commit
+    "normal": ("WAL", "NORMAL"),    # fsync solo en checkpoints; puede perder la última partida si se va la luz
+    "clasico": ("DELETE", "FULL"),  # journal de rollback, como antes
+}
+
+# Una entrada por (ruta, hilo): la conexión de escritura solo se puede usar en el hilo que la creó
+_registro: Dict[Tuple[str, int], "GestorConexiones"] = {}
+_bloqueo_registro = threading.Lock()
+
+
+def es_error_bloqueo(error: Exception) -> bool:
+    """Indica si el error se debe a que otra conexión tiene la base bloqueada"""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    mensaje = str(error).lower()
+    return "locked" in mensaje or "busy" in mensaje
+
+
+class GestorConexiones:
+    """Una conexión de escritura y un pool de conexiones de solo lectura a la misma base"""
+    
+    def __init__(self, nombre_db: str, perfil: str = "normal", timeout_ms: int = 5000,
+                 max_lectores: int = 4, max_reintentos: int = 5):
+        if perfil not in PERFILES_DURABILIDAD:
+            raise ValueError(f"Perfil de durabilidad desconocido: {perfil}")
+        
+        self.nombre_db = nombre_db
+        self.perfil = perfil
+        self.timeout_ms = timeout_ms
+        self.max_lectores = max_lectores
+        self.max_reintentos = max_reintentos
+        self.en_memoria = nombre_db == ":memory:"
+        
+        self._lectores_libres: List[sqlite3.Connection] = []
+        self._bloqueo = threading.Lock()
+        self._referencias = 0
+        self._clave_registro = None
+        
+        # Hilo que archiva las partidas de épocas anteriores (ver epocas.py)
+        self.archivador = None
+        
+        self.escritor = self.conectar()
+    
+    def conectar(self, solo_lectura: bool = False) -> sqlite3.Connection:
+        """Abre una conexión instrumentada con el perfil de durabilidad y el busy timeout configurados"""
+        journal_mode, synchronous = PERFILES_DURABILIDAD[self.perfil]
+        
+        if solo_lectura:
+            uri = Path(self.nombre_db).resolve().as_uri() + "?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, timeout=self.timeout_ms / 1000,
+                                   check_same_thread=False, factory=ConexionInstrumentada)
+        else:
+            conn = sqlite3.connect(self.nombre_db, timeout=self.timeout_ms / 1000,
+                                   factory=ConexionInstrumentada)
+            if not self.en_memoria:
+                # Solo tiene efecto en bases nuevas (las existentes: gestor_bd.py --compactar)
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute(f"PRAGMA journal_mode = {journal_mode}")
+        
+        conn.execute(f"PRAGMA busy_timeout = {int(self.timeout_ms)}")
+        conn.execute(f"PRAGMA synchronous = {synchronous}")
+        return conn
+    
+    @contextmanager
+    def lector(self):
+        """Presta una conexión de solo lectura del pool"""
+        # Una base en memoria solo existe dentro de la conexión de escritura
+        if self.en_memoria:
+            yield self.escritor
+            return
+        
+        with self._bloqueo:
+            conn = self._lectores_libres.pop() if self._lectores_libres else None
+        if conn is None:
+            conn = self.conectar(solo_lectura=True)
+        
+        try:
+            yield conn
+        finally:
+            with self._bloqueo:
+                if len(self._lectores_libres) < self.max_lectores:
+                    self._lectores_libres.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+    
+    def ejecutar_con_reintentos(self, funcion: Callable, *args, **kwargs):
+        """Ejecuta una operación reintentando con espera exponencial si la base está ocupada"""
+        espera = 0.05
+        for intento in range(self.max_reintentos + 1):
+            try:
+                return funcion(*args, **kwargs)
+            except sqlite3.OperationalError as e:
+                if not es_error_bloqueo(e) or intento == self.max_reintentos:
+                    raise
+                print(f"⚠️ Base de datos ocupada, reintentando en {espera:.2f}s")
+                time.sleep(espera)
+                espera = min(espera * 2, 2.0)
+    
+    def cerrar(self):
+        """Cierra el escritor y todas las conexiones de lectura"""
+        if self.archivador:
+            self.archivador.detener()
+        with self._bloqueo:
+            lectores, self._lectores_libres = self._lectores_libres, []
+        for conn in lectores:
+            conn.close()
+        self.escritor.close()
+
+
+def obtener_conexiones(nombre_db: str, perfil: str = "normal") -> GestorConexiones:
+    """Devuelve el gestor compartido de una base en este hilo (lo crea si no existe) y suma una referencia"""
+    if nombre_db == ":memory:":
+        gestor = GestorConexiones(nombre_db, perfil)
+        gestor._referencias = 1
+        return gestor
+    
+    clave = (os.path.abspath(nombre_db), threading.get_ident())
+    with _bloqueo_registro:
+        gestor = _registro.get(clave)
+        if gestor is None:
+            # El perfil lo fija quien abre la base primero en este hilo
+            gestor = GestorConexiones(nombre_db, perfil)
+            gestor._clave_registro = clave
+            _registro[clave] = gestor
+        gestor._referencias += 1
+        return gestor
+
+
+def liberar_conexiones(gestor: GestorConexiones):
+    """Resta una referencia y cierra las conexiones cuando nadie más las usa"""
+    with _bloqueo_registro:
+        gestor._referencias -= 1
+        if gestor._referencias > 0:
+            return
+        if gestor._clave_registro is not None:
+            _registro.pop(gestor._clave_registro, None)
+    gestor.cerrar()
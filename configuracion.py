@@ -22,7 +22,16 @@ class Configuracion:
             "tamano_fuente": 12,             # Tamaño de fuente general
             "mostrar_tiempo": True,          # Mostrar temporizador
             "animaciones": True,             # Animaciones en interfaz
-            "palabra_completa": False        # Permitir adivinar palabra completa
+            "palabra_completa": False,       # Permitir adivinar palabra completa
+            "escritura_diferida": False,     # Guardar partidas en segundo plano
+            "perfil_durabilidad": "normal",  # seguro, normal, clasico
+            "depuracion_sql": False,         # Mostrar métricas de SQL al salir
+            "umbral_sql_lento_ms": None,     # Mostrar el plan de las consultas más lentas
+            "mantenimiento_automatico": True,  # Checkpoint, vacuum, optimize y quick_check en ratos libres
+            "copias_automaticas": False,     # Copia de seguridad diaria en ratos libres
+            "copias_conservar": 7,           # Copias que se guardan al rotar
+            "retencion_dias": 0,             # Partidas de más días se archivan y borran (0 = conservar todas)
+            "jugador_actual": None           # id del perfil activo (None = invitado)
         }
         
         try:
@@ -86,7 +95,16 @@ class Configuracion:
             "tamano_fuente": 12,
             "mostrar_tiempo": True,
             "animaciones": True,
-            "palabra_completa": False
+            "palabra_completa": False,
+            "escritura_diferida": False,
+            "perfil_durabilidad": "normal",
+            "depuracion_sql": False,
+            "umbral_sql_lento_ms": None,
+            "mantenimiento_automatico": True,
+            "copias_automaticas": False,
+            "copias_conservar": 7,
+            "retencion_dias": 0,
+            "jugador_actual": None
         }
         self.config = config_default
         self.guardar_configuracion()
\ No newline at end of file
@@ -0,0 +1,149 @@
+# copias_seguridad.py
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List
+
+
+class CopiaCancelada(Exception):
+    """Se pidió parar la copia antes de terminar"""
+
+
+def carpeta_copias(nombre_db: str) -> str:
+    """Carpeta por defecto de las copias: 'copias' junto a la base"""
+    return str(Path(nombre_db).resolve().with_name("copias"))
+
+
+def listar_copias(nombre_db: str, carpeta: str = None) -> List[str]:
+    """Copias terminadas de una base, de la más reciente a la más antigua"""
+    carpeta = Path(carpeta or carpeta_copias(nombre_db))
+    if not carpeta.is_dir():
+        return []
+    # El nombre lleva la fecha (AAAAMMDD_HHMMSS), así que el orden alfabético es el cronológico
+    return sorted((str(ruta) for ruta in carpeta.glob(f"{Path(nombre_db).stem}_*.db")), reverse=True)
+
+
+def rotar_copias(nombre_db: str, conservar: int, carpeta: str = None) -> List[str]:
+    """Borra las copias más antiguas y deja solo las 'conservar' más recientes"""
+    sobrantes = listar_copias(nombre_db, carpeta)[conservar:]
+    for ruta in sobrantes:
+        os.remove(ruta)
+    return sobrantes
+
+
+class CopiaSeguridad(threading.Thread):
+    """Copia en caliente con la API de backup, por pasos de unas pocas páginas, en un hilo aparte
+    
+    Entre paso y paso el juego puede seguir leyendo y escribiendo: la conexión de
+    origen mantiene abierta una transacción de lectura, así que todos los pasos ven
+    la misma instantánea del WAL y la copia no se reinicia con cada partida guardada.
+    """
+    
+    def __init__(self, conexiones, carpeta: str = None, paginas: int = 256, pausa: float = 0.005,
+                 conservar: int = 7, al_progresar: Callable[[float], None] = None):
+        if conexiones.en_memoria:
+            raise ValueError("Una base en memoria no se puede copiar desde otro hilo")
+        super().__init__(name="copia-seguridad", daemon=True)
+        self.conexiones = conexiones
+        self.carpeta = carpeta or carpeta_copias(conexiones.nombre_db)
+        self.paginas = paginas
+        self.pausa = pausa
+        self.conservar = conservar
+        self.al_progresar = al_progresar
+        
+        # Estado que consulta la interfaz mientras el hilo trabaja
+        self.progreso = 0.0
+        self.ruta = None
+        self.borradas: List[str] = []
+        self.error = None
+        self._cancelar = threading.Event()
+    
+    def run(self):
+        Path(self.carpeta).mkdir(parents=True, exist_ok=True)
+        nombre = f"{Path(self.conexiones.nombre_db).stem}_{datetime.now():%Y%m%d_%H%M%S}.db"
+        destino = Path(self.carpeta) / nombre
+        parcial = destino.with_name(nombre + ".parcial")
+        
+        origen = self.conexiones.conectar(solo_lectura=True)
+        try:
+            # Sin esto, cada escritura de otra conexión haría que SQLite empezara la copia de nuevo
+            origen.execute("BEGIN")
+            origen.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+            
+            copia = sqlite3.connect(parcial)
+            try:
+                origen.backup(copia, pages=self.paginas, progress=self._paso, sleep=self.pausa)
+                
+                # La copia queda como un único archivo, sin WAL, y se verifica antes de darla por buena
+                copia.execute("PRAGMA journal_mode = DELETE")
+                resultado = "; ".join(fila[0] for fila in copia.execute("PRAGMA quick_check"))
+            finally:
+                copia.close()
+            if resultado != "ok":
+                raise sqlite3.DatabaseError(f"quick_check de la copia: {resultado}")
+            
+            os.replace(parcial, destino)
+            self.ruta = str(destino)
+            self.progreso = 1.0
+            self.borradas = rotar_copias(self.conexiones.nombre_db, self.conservar, self.carpeta)
+        except CopiaCancelada as e:
+            self.error = e
+        except (sqlite3.Error, OSError) as e:
+            self.error = e
+            print(f"⚠️ Error haciendo la copia de seguridad: {e}")
+        finally:
+            origen.close()
+            if parcial.exists():
+                parcial.unlink()
+    
+    def _paso(self, estado: int, restantes: int, total: int):
+        if self._cancelar.is_set():
+            raise CopiaCancelada("Copia de seguridad cancelada")
+        # El último 1% queda para la verificación
+        self.progreso = 0.99 * (total - restantes) / total if total else 0.0
+        if self.al_progresar:
+            self.al_progresar(self.progreso)
+    
+    def cancelar(self):
+        """Pide parar la copia en el siguiente paso (el archivo a medias se borra)"""
+        self._cancelar.set()
+    
+    @property
+    def terminada(self) -> bool:
+        return self.ident is not None and not self.is_alive()
+
+
+if __name__ == "__main__":
+    import argparse
+    from conexiones import liberar_conexiones, obtener_conexiones
+    
+    parser = argparse.ArgumentParser(description="Copia de seguridad en caliente de la base del juego")
+    parser.add_argument("--db", default="juego_palabras.db", help="Ruta de la base de datos")
+    parser.add_argument("--carpeta", default=None, help="Carpeta de destino (por defecto, 'copias' junto a la base)")
+    parser.add_argument("--conservar", type=int, default=7, help="Copias que se guardan al rotar")
+    parser.add_argument("--paginas", type=int, default=256, help="Páginas copiadas en cada paso")
+    args = parser.parse_args()
+    
+    conexiones = obtener_conexiones(args.db)
+    try:
+        avance = {"decena": -1}
+        
+        def mostrar(progreso: float):
+            decena = int(progreso * 10)
+            if decena != avance["decena"]:
+                avance["decena"] = decena
+                print(f"⏳ {progreso:.0%}")
+        
+        copia = CopiaSeguridad(conexiones, args.carpeta, args.paginas, conservar=args.conservar,
+                               al_progresar=mostrar)
+        copia.start()
+        copia.join()
+        if copia.error:
+            raise SystemExit(1)
+        print(f"✅ Copia verificada: {copia.ruta}")
+        for ruta in copia.borradas:
+            print(f"🗑️ Copia antigua borrada: {ruta}")
+    finally:
+        liberar_conexiones(conexiones)
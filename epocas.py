@@ -0,0 +1,146 @@
+# epocas.py
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# Columnas que se mueven entre la vista estadisticas y su archivo
+COLUMNAS_ARCHIVO = "id, fecha, palabra, intentos, victoria, tiempo_segundos, dificultad, jugador_id, origen, secuencia"
+
+
+def inicio_epoca(conn: sqlite3.Connection) -> int:
+    """Primer id de partida de la época actual (0 si nunca se reseteó)"""
+    try:
+        fila = conn.execute("SELECT inicio_id FROM epocas ORDER BY id DESC LIMIT 1").fetchone()
+    except sqlite3.OperationalError:
+        # Bases anteriores a la migración de épocas
+        return 0
+    return fila[0] if fila else 0
+
+
+def primer_id_vigente(conn: sqlite3.Connection) -> int:
+    """Primer id de la época actual cuya partida no está ya plegada en los resúmenes de retención"""
+    inicio = inicio_epoca(conn)
+    try:
+        fila = conn.execute(
+            "SELECT MAX(plegado_hasta) FROM retenciones WHERE epoca_inicio = ?", (inicio,)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        # Bases anteriores a la migración de retención
+        return inicio
+    return inicio if fila[0] is None else max(inicio, fila[0] + 1)
+
+
+def ruta_archivo(nombre_db: str) -> str:
+    """Base de datos donde se guardan las partidas de épocas anteriores"""
+    ruta = Path(nombre_db)
+    return str(ruta.with_name(f"{ruta.stem}_archivo{ruta.suffix or '.db'}"))
+
+
+def adjuntar_archivo(conn: sqlite3.Connection, nombre_db: str):
+    """Adjunta el archivo como esquema 'archivo' y crea su tabla si hace falta"""
+    conn.execute("ATTACH DATABASE ? AS archivo", (ruta_archivo(nombre_db),))
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS archivo.estadisticas (
+            id INTEGER PRIMARY KEY,
+            fecha TEXT NOT NULL,
+            palabra TEXT NOT NULL,
+            intentos INTEGER NOT NULL,
+            victoria INTEGER NOT NULL,
+            tiempo_segundos INTEGER,
+            dificultad TEXT NOT NULL,
+            jugador_id INTEGER,
+            origen INTEGER,
+            secuencia INTEGER
+        )
+    ''')
+    # Archivos de antes de la sincronización: sus partidas son todas de este kiosco
+    columnas = {fila[1] for fila in conn.execute("PRAGMA archivo.table_info(estadisticas)")}
+    for columna in ("origen", "secuencia"):
+        if columna not in columnas:
+            conn.execute(f"ALTER TABLE archivo.estadisticas ADD COLUMN {columna} INTEGER")
+    conn.commit()
+
+
+def activar_vacuum_incremental(conn: sqlite3.Connection):
+    """Pasa una base existente a auto_vacuum incremental (reescribe el archivo entero una vez)"""
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("VACUUM")
+
+
+class ArchivadorEpocas(threading.Thread):
+    """Mueve al archivo, por lotes y en segundo plano, las partidas de épocas anteriores"""
+    
+    def __init__(self, conexiones, tamano_lote: int = 1000, paginas_vacuum: int = 256,
+                 pausa: float = 0.01):
+        super().__init__(name="archivador-epocas", daemon=True)
+        self.conexiones = conexiones
+        self.tamano_lote = tamano_lote
+        self.paginas_vacuum = paginas_vacuum
+        self.pausa = pausa
+        self.movidas = 0
+        self.ultimo_error = None
+        self._detener = threading.Event()
+    
+    def run(self):
+        conn = self.conexiones.conectar()
+        try:
+            adjuntar_archivo(conn, self.conexiones.nombre_db)
+            if self.archivar(conn):
+                self.compactar(conn)
+        except sqlite3.Error as e:
+            self.ultimo_error = e
+            print(f"⚠️ Error archivando partidas de épocas anteriores: {e}")
+        finally:
+            conn.close()
+    
+    def archivar(self, conn: sqlite3.Connection) -> bool:
+        """Copia y borra lotes de filas anteriores a la época actual; False si se detuvo antes de acabar"""
+        limite = inicio_epoca(conn)
+        
+        def mover(desde: int, hasta: int):
+            # Copia y borrado en transacciones separadas: repetir un lote a medias es inocuo
+            with conn:
+                conn.execute(f'''
+                    INSERT OR IGNORE INTO archivo.estadisticas ({COLUMNAS_ARCHIVO})
+                    SELECT {COLUMNAS_ARCHIVO} FROM main.estadisticas WHERE id BETWEEN ? AND ?
+                ''', (desde, hasta))
+            with conn:
+                conn.execute("DELETE FROM main.partidas WHERE id BETWEEN ? AND ?", (desde, hasta))
+        
+        while not self._detener.is_set():
+            ids = conn.execute(
+                "SELECT id FROM main.partidas WHERE id < ? ORDER BY id LIMIT ?",
+                (limite, self.tamano_lote)
+            ).fetchall()
+            if not ids:
+                return True
+            
+            self.conexiones.ejecutar_con_reintentos(mover, ids[0][0], ids[-1][0])
+            self.movidas += len(ids)
+            
+            # Deja hueco al escritor del juego entre lote y lote
+            time.sleep(self.pausa)
+        
+        return False
+    
+    def compactar(self, conn: sqlite3.Connection):
+        """Devuelve al sistema las páginas libres, unas pocas cada vez"""
+        if conn.execute("PRAGMA main.auto_vacuum").fetchone()[0] != 2:
+            return
+        
+        # Con execute el pragma solo avanza un paso (una página); executescript lo completa
+        def liberar():
+            conn.executescript(f"PRAGMA main.incremental_vacuum({self.paginas_vacuum})")
+        
+        while not self._detener.is_set() and conn.execute("PRAGMA main.freelist_count").fetchone()[0] > 0:
+            self.conexiones.ejecutar_con_reintentos(liberar)
+            time.sleep(self.pausa)
+    
+    def detener(self):
+        """Pide al hilo que pare tras el lote en curso y espera a que termine"""
+        self._detener.set()
+        if self.is_alive():
+            self.join()
@@ -0,0 +1,152 @@
+# escritor_diferido.py
+import queue
+import sqlite3
+import threading
+from typing import Callable, List, Tuple
+from conexiones import GestorConexiones
+
+_FIN = object()
+
+
+class EscritorDiferido:
+    """Hilo que guarda partidas en segundo plano agrupándolas en transacciones"""
+    
+    def __init__(self, conexiones: GestorConexiones, capacidad: int = 1000, tamano_lote: int = 100,
+                 al_guardar: Callable[[List[Tuple]], None] = None):
+        self.conexiones = conexiones
+        self.tamano_lote = tamano_lote
+        # Se llama desde el hilo escritor con las partidas ya guardadas, antes de que avance la barrera
+        self.al_guardar = al_guardar
+        self.cola = queue.Queue(maxsize=capacidad)
+        self.ultimo_error = None
+        
+        # Números de secuencia para la barrera de lectura
+        self._condicion = threading.Condition()
+        self._encoladas = 0
+        self._confirmadas = 0
+        
+        # Error aún no avisado (lo lanzan esperar y cerrar) y partidas que hay que volver a intentar
+        self._error = None
+        self._fallidas: List[Tuple] = []
+        
+        self._hilo = threading.Thread(target=self._ejecutar, name="EscritorDiferido", daemon=True)
+        self._hilo.start()
+    
+    def encolar(self, fila: Tuple) -> int:
+        """Encola una partida y devuelve su número de secuencia (bloquea si la cola está llena)"""
+        with self._condicion:
+            self._encoladas += 1
+            secuencia = self._encoladas
+        self.cola.put(fila)
+        return secuencia
+    
+    def pendientes(self) -> int:
+        """Número de partidas encoladas que aún no se han confirmado"""
+        with self._condicion:
+            return self._encoladas - self._confirmadas
+    
+    def esperar(self, secuencia: int = None, timeout: float = None) -> bool:
+        """Espera a que se procese la partida indicada (por defecto, todas las encoladas)
+        
+        Si un lote falló desde la última llamada, lanza su error (una vez).
+        """
+        with self._condicion:
+            objetivo = self._encoladas if secuencia is None else secuencia
+            listo = self._condicion.wait_for(lambda: self._confirmadas >= objetivo, timeout)
+            self._lanzar_error()
+            return listo
+    
+    def cerrar(self):
+        """Vacía la cola, confirma lo pendiente y detiene el hilo (lanza el error si algo no se guardó)"""
+        if self._hilo.is_alive():
+            self.cola.put(_FIN)
+            self._hilo.join()
+        with self._condicion:
+            self._lanzar_error()
+    
+    def _lanzar_error(self):
+        # Se llama con la condición tomada
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+    
+    def _ejecutar(self):
+        """Bucle del hilo escritor: toma lotes de la cola y los guarda en una transacción"""
+        # Conexión propia del hilo, con el mismo perfil y busy timeout que el resto
+        conn = self.conexiones.conectar()
+        try:
+            terminar = False
+            while not terminar:
+                lote = [self.cola.get()]
+                
+                # Agrupar lo que ya esté esperando, sin bloquear
+                while len(lote) < self.tamano_lote:
+                    try:
+                        lote.append(self.cola.get_nowait())
+                    except queue.Empty:
+                        break
+                
+                if _FIN in lote:
+                    lote.remove(_FIN)
+                    terminar = True
+                
+                if lote or (terminar and self._fallidas):
+                    self._guardar_lote(conn, lote)
+        finally:
+            conn.close()
+    
+    def _insertar(self, conn: sqlite3.Connection, filas: List[Tuple]):
+        """Inserta partidas con un único commit (reintentando si la base está bloqueada)"""
+        def insertar():
+            with conn:
+                conn.executemany('''
+                    INSERT INTO estadisticas (fecha, palabra, intentos, victoria, tiempo_segundos, dificultad, jugador_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', filas)
+        
+        self.conexiones.ejecutar_con_reintentos(insertar)
+    
+    def _insertar_una_a_una(self, conn: sqlite3.Connection, filas: List[Tuple]):
+        """Inserta fila a fila descartando las que la base rechaza
+        
+        Devuelve las guardadas, las que quedan por guardar si la base deja de responder a medias, y ese error.
+        """
+        guardadas = []
+        for i, fila in enumerate(filas):
+            try:
+                self._insertar(conn, [fila])
+                guardadas.append(fila)
+            except sqlite3.OperationalError as e:
+                return guardadas, filas[i:], e
+            except sqlite3.Error as e:
+                print(f"❌ Partida rechazada por la base ({e}): {fila}")
+        return guardadas, [], None
+    
+    def _guardar_lote(self, conn: sqlite3.Connection, lote: List[Tuple]):
+        """Inserta un lote de partidas (y las que fallaron antes) con un único commit"""
+        filas = self._fallidas + lote
+        guardadas = []
+        error = None
+        try:
+            self._insertar(conn, filas)
+            guardadas, filas = filas, []
+        except sqlite3.OperationalError as e:
+            # Base bloqueada, disco lleno...: las partidas se guardan con el siguiente lote o al cerrar
+            error = e
+        except sqlite3.Error as e:
+            # Datos que la base rechaza: repetirlos no cambiaría nada, pero solo se pierden las filas malas
+            guardadas, filas, error_base = self._insertar_una_a_una(conn, filas)
+            error = error_base or e
+        
+        if filas:
+            print(f"⚠️ Error guardando {len(filas)} partidas en segundo plano (se reintentará): {error}")
+        self._fallidas = filas
+        if guardadas and self.al_guardar:
+            self.al_guardar(guardadas)
+        
+        # La barrera avanza igual (no se queda colgada), pero el error llega a quien espera o cierra
+        with self._condicion:
+            if error is not None:
+                self.ultimo_error = self._error = error
+            self._confirmadas += len(lote)
+            self._condicion.notify_all()
@@ -0,0 +1,93 @@
+# exportador_historial.py
+import csv
+import gzip
+import io
+import json
+import time
+from typing import Dict, IO
+from gestor_bd import GestorBaseDatos
+
+COLUMNAS = ("id", "fecha", "palabra", "intentos", "victoria", "tiempo_segundos", "dificultad", "jugador_id")
+
+# Buffer de escritura: suficiente para escribir a ritmo de disco sin acumular el historial
+TAMANO_BUFFER = 1024 * 1024
+
+
+def abrir_salida(ruta: str, comprimir: bool = None) -> IO[str]:
+    """Abre el archivo de salida en modo texto, con gzip si se pide o si termina en .gz"""
+    if comprimir is None:
+        comprimir = ruta.endswith(".gz")
+    
+    if comprimir:
+        binario = gzip.open(ruta, "wb", compresslevel=6)
+        return io.TextIOWrapper(io.BufferedWriter(binario, TAMANO_BUFFER), encoding="utf-8", newline="")
+    return open(ruta, "w", encoding="utf-8", newline="", buffering=TAMANO_BUFFER)
+
+
+def exportar_csv(gestor_db: GestorBaseDatos, ruta: str, comprimir: bool = None, **filtros) -> int:
+    """Exporta el historial a CSV y devuelve el número de partidas escritas"""
+    filas = 0
+    with abrir_salida(ruta, comprimir) as salida:
+        escritor = csv.writer(salida)
+        escritor.writerow(COLUMNAS)
+        for partida in gestor_db.iterar_partidas(**filtros):
+            escritor.writerow(partida)
+            filas += 1
+    return filas
+
+
+def exportar_jsonl(gestor_db: GestorBaseDatos, ruta: str, comprimir: bool = None, **filtros) -> int:
+    """Exporta el historial a JSONL (un objeto por partida) y devuelve el número de partidas"""
+    filas = 0
+    with abrir_salida(ruta, comprimir) as salida:
+        for partida in gestor_db.iterar_partidas(**filtros):
+            salida.write(json.dumps(dict(zip(COLUMNAS, partida)), ensure_ascii=False))
+            salida.write("\n")
+            filas += 1
+    return filas
+
+
+EXPORTADORES = {
+    "csv": exportar_csv,
+    "jsonl": exportar_jsonl,
+}
+
+
+def exportar(gestor_db: GestorBaseDatos, ruta: str, formato: str = None,
+             comprimir: bool = None, **filtros) -> Dict:
+    """Exporta eligiendo el formato por parámetro o por la extensión del archivo"""
+    if formato is None:
+        formato = "jsonl" if ".jsonl" in ruta else "csv"
+    
+    inicio = time.perf_counter()
+    filas = EXPORTADORES[formato](gestor_db, ruta, comprimir, **filtros)
+    segundos = time.perf_counter() - inicio
+    
+    return {
+        "filas": filas,
+        "segundos": segundos,
+        "filas_por_segundo": filas / segundos if segundos else 0.0
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Exporta el historial de partidas a CSV o JSONL")
+    parser.add_argument("salida", help="Archivo de salida (.csv, .jsonl, opcionalmente .gz)")
+    parser.add_argument("--db", default="juego_palabras.db", help="Ruta de la base de datos")
+    parser.add_argument("--formato", choices=sorted(EXPORTADORES), help="Formato (por defecto, según la extensión)")
+    parser.add_argument("--gzip", action="store_true", default=None, help="Comprimir con gzip")
+    parser.add_argument("--desde", help="Fecha inicial incluida (YYYY-MM-DD[ HH:MM:SS])")
+    parser.add_argument("--hasta", help="Fecha final excluida (YYYY-MM-DD[ HH:MM:SS])")
+    parser.add_argument("--dificultad", choices=["FACIL", "MEDIO", "DIFICIL"], help="Filtrar por dificultad")
+    args = parser.parse_args()
+    
+    gestor = GestorBaseDatos(args.db)
+    try:
+        resultado = exportar(gestor, args.salida, args.formato, args.gzip,
+                             desde=args.desde, hasta=args.hasta, dificultad=args.dificultad)
+        print(f"✅ {resultado['filas']:,} partidas exportadas en {resultado['segundos']:.1f}s "
+              f"({resultado['filas_por_segundo']:,.0f} filas/s)")
+    finally:
+        gestor.cerrar()
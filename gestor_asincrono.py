@@ -0,0 +1,223 @@
+# gestor_asincrono.py
+import asyncio
+import copy
+import queue
+import threading
+from typing import Dict, List, Tuple
+from gestor_bd import GestorBaseDatos
+
+_FIN = object()
+
+
+class _Peticion:
+    """Llamada pendiente a un método del gestor y el futuro de asyncio que la espera"""
+    
+    def __init__(self, metodo: str, args: tuple, kwargs: dict, futuro: asyncio.Future, clave: tuple = None):
+        self.metodo = metodo
+        self.args = args
+        self.kwargs = kwargs
+        self.futuro = futuro
+        self.clave = clave
+        self.esperando = 0
+        # La lee el hilo de la base antes de ejecutar: nadie espera ya el resultado
+        self.cancelada = False
+
+
+class GestorAsincrono:
+    """API async sobre GestorBaseDatos: un hilo dueño de la base atiende una cola de peticiones
+    
+    Las lecturas idénticas que coinciden en el tiempo se ejecutan una sola vez. Una
+    petición cancelada antes de que el hilo la tome no se ejecuta; una que ya está en
+    marcha termina (también las escrituras) y su resultado se descarta.
+    """
+    
+    def __init__(self, nombre_db: str = "juego_palabras.db", **opciones):
+        self.nombre_db = nombre_db
+        self.opciones = opciones
+        self.cola = queue.Queue()
+        self.ejecutadas = 0
+        self.coalescidas = 0
+        
+        # Lecturas encoladas o en marcha, por (método, argumentos)
+        self._en_curso: Dict[tuple, _Peticion] = {}
+        self._bucle = None
+        self._hilo = None
+        self._terminado = None
+        self._cerrando = False
+    
+    async def __aenter__(self):
+        await self.iniciar()
+        return self
+    
+    async def __aexit__(self, *excepcion):
+        await self.cerrar()
+    
+    async def iniciar(self):
+        """Arranca el hilo de la base y espera a que el gestor esté abierto (y migrado)"""
+        if self._hilo:
+            return
+        self._bucle = asyncio.get_running_loop()
+        listo = self._bucle.create_future()
+        self._terminado = self._bucle.create_future()
+        self._hilo = threading.Thread(target=self._ejecutar, args=(listo,), name="GestorAsincrono", daemon=True)
+        self._hilo.start()
+        try:
+            await listo
+        except Exception:
+            # No se pudo abrir la base: se puede volver a intentar
+            self._hilo = None
+            raise
+    
+    async def cerrar(self):
+        """Atiende lo ya encolado, cierra el gestor en su hilo y espera a que termine"""
+        if not self._hilo or self._cerrando:
+            return
+        self._cerrando = True
+        self.cola.put(_FIN)
+        # Aunque se cancele quien cierra, el hilo acaba igual de vaciar la cola
+        await asyncio.shield(self._terminado)
+    
+    async def guardar_partida(self, palabra: str, intentos: int, victoria: bool, tiempo: int,
+                              dificultad: str, jugador_id: int = None):
+        """Guarda los resultados de una partida"""
+        await self._pedir("guardar_partida", palabra, intentos, victoria, tiempo, dificultad,
+                          jugador_id=jugador_id, escritura=True)
+    
+    async def obtener_estadisticas(self, jugador_id: int = None) -> Dict:
+        """Estadísticas generales (de todos o de un jugador)"""
+        return await self._pedir("obtener_estadisticas", jugador_id=jugador_id, coalescer=True)
+    
+    async def obtener_ranking(self, limite: int = 10, dificultad: str = None,
+                              jugador_id: int = None) -> List[Tuple]:
+        """Ranking de mejores partidas"""
+        return await self._pedir("obtener_ranking", limite=limite, dificultad=dificultad,
+                                 jugador_id=jugador_id, coalescer=True)
+    
+    async def obtener_palabra_aleatoria(self, dificultad: str) -> str:
+        """Palabra aleatoria de una dificultad (nunca se comparte entre peticiones)"""
+        return await self._pedir("obtener_palabra_aleatoria", dificultad)
+    
+    async def _pedir(self, metodo: str, *args, coalescer: bool = False, escritura: bool = False, **kwargs):
+        """Encola la llamada (o se une a una lectura idéntica en curso) y espera su resultado"""
+        if not self._hilo or self._cerrando:
+            raise RuntimeError("El gestor asíncrono no está abierto")
+        
+        clave = (metodo, args, tuple(sorted(kwargs.items()))) if coalescer else None
+        peticion = self._en_curso.get(clave) if coalescer else None
+        if peticion is None:
+            peticion = _Peticion(metodo, args, kwargs, self._bucle.create_future(), clave)
+            if coalescer:
+                self._en_curso[clave] = peticion
+            elif escritura:
+                # Las lecturas que lleguen después tienen que ver lo escrito: no se unen a las anteriores
+                self._en_curso.clear()
+            self.cola.put(peticion)
+        else:
+            self.coalescidas += 1
+        
+        peticion.esperando += 1
+        try:
+            # shield: cancelar a quien espera no cancela el resultado que comparten los demás
+            resultado = await asyncio.shield(peticion.futuro)
+        except asyncio.CancelledError:
+            peticion.esperando -= 1
+            if peticion.esperando == 0 and not peticion.futuro.done():
+                peticion.cancelada = True
+                peticion.futuro.cancel()
+                self._olvidar(peticion)
+            raise
+        
+        # Cada uno recibe su copia: modificarla no toca lo que ven los demás
+        return copy.deepcopy(resultado) if coalescer else resultado
+    
+    def _olvidar(self, peticion: _Peticion):
+        if peticion.clave is not None and self._en_curso.get(peticion.clave) is peticion:
+            del self._en_curso[peticion.clave]
+    
+    def _ejecutar(self, listo: asyncio.Future):
+        """Bucle del hilo de la base: el gestor se crea, se usa y se cierra siempre aquí"""
+        try:
+            gestor = GestorBaseDatos(self.nombre_db, **self.opciones)
+        except Exception as e:
+            self._responder(listo, None, e)
+            self._responder(self._terminado, None, None)
+            return
+        self._responder(listo, None, None)
+        
+        try:
+            while True:
+                peticion = self.cola.get()
+                if peticion is _FIN:
+                    break
+                if peticion.cancelada:
+                    continue
+                
+                try:
+                    resultado = getattr(gestor, peticion.metodo)(*peticion.args, **peticion.kwargs)
+                except Exception as e:
+                    self.ejecutadas += 1
+                    self._responder(peticion.futuro, None, e, peticion)
+                else:
+                    self.ejecutadas += 1
+                    self._responder(peticion.futuro, resultado, None, peticion)
+        finally:
+            # Un error al cerrar (partidas que no se pudieron guardar) le llega a quien espera en cerrar()
+            error = None
+            try:
+                gestor.cerrar()
+            except Exception as e:
+                error = e
+            self._responder(self._terminado, None, error)
+    
+    def _responder(self, futuro: asyncio.Future, resultado, error: Exception, peticion: _Peticion = None):
+        """Completa un futuro desde el hilo de la base (en el hilo del bucle de eventos)"""
+        def completar():
+            if peticion:
+                self._olvidar(peticion)
+            if futuro.done():
+                return
+            if error is not None:
+                futuro.set_exception(error)
+            else:
+                futuro.set_result(resultado)
+        
+        try:
+            self._bucle.call_soon_threadsafe(completar)
+        except RuntimeError:
+            # El bucle ya se cerró: nadie queda esperando
+            pass
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API async: lecturas concurrentes y partidas")
+    parser.add_argument("--db", default="juego_palabras.db", help="Ruta de la base de datos")
+    parser.add_argument("--clientes", type=int, default=200, help="Tareas que piden a la vez")
+    args = parser.parse_args()
+    
+    async def principal():
+        # Mide cuánto se retrasa el bucle de eventos mientras la base trabaja
+        retraso_maximo = 0.0
+        
+        async def latido():
+            nonlocal retraso_maximo
+            while True:
+                inicio = time.perf_counter()
+                await asyncio.sleep(0.005)
+                retraso_maximo = max(retraso_maximo, time.perf_counter() - inicio - 0.005)
+        
+        async with GestorAsincrono(args.db) as gestor:
+            pulso = asyncio.create_task(latido())
+            inicio = time.perf_counter()
+            await asyncio.gather(*(
+                gestor.obtener_estadisticas() if i % 2 else gestor.obtener_ranking(10, "MEDIO")
+                for i in range(args.clientes)
+            ))
+            duracion = time.perf_counter() - inicio
+            pulso.cancel()
+            print(f"⚡ {args.clientes} lecturas en {duracion * 1000:.1f} ms: {gestor.ejecutadas} ejecutadas, "
+                  f"{gestor.coalescidas} coalescidas | retraso máximo del bucle {retraso_maximo * 1000:.1f} ms")
+    
+    asyncio.run(principal())
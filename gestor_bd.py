@@ -1,15 +1,71 @@
 # gestor_bd.py
+import math
+import random
 import sqlite3
-from datetime import datetime
-from typing import Dict, List, Tuple
+from array import array
+from collections import deque
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Tuple, Union
+from conexiones import liberar_conexiones, obtener_conexiones
+from epocas import COLUMNAS_ARCHIVO, ArchivadorEpocas, adjuntar_archivo, inicio_epoca, primer_id_vigente
+from escritor_diferido import EscritorDiferido
+from instrumentacion import instrumentador
+from migraciones import (aplicar_migraciones, recalcular_rachas, recalcular_resumen_categorias,
+                         recalcular_resumen_diario, sql_nombre_dificultad)
+from repositorio import CODIGOS_DIFICULTAD, DIFICULTADES, PALABRAS_POR_DEFECTO, RepositorioJuego
 
-class GestorBaseDatos:
+# Columnas de partidas con el formato de la antigua tabla estadisticas
+FECHA = "datetime(p.momento, 'unixepoch', 'localtime')"
+DIFICULTAD = sql_nombre_dificultad("p.dificultad")
+PARTIDAS = "partidas p LEFT JOIN palabras w ON w.id = p.palabra_id"
+
+# Primer día de cada periodo de las tendencias (semanas de lunes a domingo)
+PERIODOS_TENDENCIA = {
+    "dia": "dia",
+    "semana": "date(dia, '-6 days', 'weekday 1')",
+    "mes": "date(dia, 'start of month')",
+}
+
+class GestorBaseDatos(RepositorioJuego):
     """Clase para manejar la base de datos SQLite del juego"""
     
-    def __init__(self, nombre_db="juego_palabras.db"):
-        self.conn = sqlite3.connect(nombre_db)
+    def __init__(self, nombre_db="juego_palabras.db", escritura_diferida: bool = False,
+                 perfil_durabilidad: str = "normal", partidas_recientes: int = 10,
+                 depuracion_sql: bool = False, umbral_sql_lento_ms: float = None):
+        self.nombre_db = nombre_db
+        
+        # Métricas de SQL: plan de las sentencias lentas y volcado al salir
+        if umbral_sql_lento_ms is not None:
+            instrumentador.umbral_lento_ms = umbral_sql_lento_ms
+        if depuracion_sql:
+            instrumentador.activar_volcado_al_salir()
+        
+        # Conexiones compartidas por todas las instancias que abren la misma base
+        self.conexiones = obtener_conexiones(nombre_db, perfil_durabilidad)
+        self.conn = self.conexiones.escritor
         self.cursor = self.conn.cursor()
+        self._cerrado = False
+        self.escritor = None
+        
+        # Ids de palabras por dificultad y versión de palabras con la que se cargaron
+        self._pool_palabras: Dict[str, array] = {}
+        self._version_pool = None
+        
         self.crear_tablas()
+        
+        # Partidas de épocas anteriores que quedaron sin archivar (reset interrumpido)
+        if self.cursor.execute(
+            "SELECT 1 FROM partidas WHERE id < ? LIMIT 1", (inicio_epoca(self.conn),)
+        ).fetchone():
+            self.iniciar_archivado()
+        
+        # Últimas partidas (victoria, intentos, tiempo) de esta instancia, de la más antigua a la más reciente
+        self._partidas_recientes = deque(maxlen=partidas_recientes)
+        self.cargar_partidas_recientes()
+        
+        # Guardado en segundo plano (no aplica a bases en memoria: el hilo no las vería)
+        if escritura_diferida and nombre_db != ":memory:":
+            self.escritor = EscritorDiferido(self.conexiones, al_guardar=self._partidas_guardadas)
     
     def crear_tablas(self):
         """Crea las tablas necesarias si no existen"""
@@ -36,242 +92,924 @@ class GestorBaseDatos:
             )
         ''')
         
+        # Tabla resumen mantenida por triggers (una fila por dificultad)
+        self.crear_resumen_estadisticas()
+        
         # Verificar si hay palabras
         self.cursor.execute("SELECT COUNT(*) FROM palabras")
         if self.cursor.fetchone()[0] == 0:
             self.insertar_palabras_por_defecto()
         
         self.conn.commit()
+        
+        # Índices y cambios de esquema versionados
+        aplicar_migraciones(self.conn)
     
-    def insertar_palabras_por_defecto(self):
-        """Inserta palabras iniciales en la base de datos"""
-        palabras_facil = [
-            ("SOL", "FACIL", "NATURALEZA"),
-            ("LUNA", "FACIL", "NATURALEZA"),
-            ("MESA", "FACIL", "OBJETOS"),
-            ("SILLA", "FACIL", "OBJETOS"),
-            ("CASA", "FACIL", "LUGARES"),
-            ("PERRO", "FACIL", "ANIMALES"),
-            ("GATO", "FACIL", "ANIMALES"),
-            ("AGUA", "FACIL", "ELEMENTOS"),
-            ("FUEGO", "FACIL", "ELEMENTOS"),
-            ("LIBRO", "FACIL", "OBJETOS"),
-            ("LAPIZ", "FACIL", "OBJETOS"),
-            ("FLOR", "FACIL", "NATURALEZA"),
-            ("ARBOL", "FACIL", "NATURALEZA"),
-            ("RIO", "FACIL", "NATURALEZA"),
-            ("PLAYA", "FACIL", "LUGARES"),
-            ("CIELO", "FACIL", "NATURALEZA"),
-            ("ESTRELLA", "FACIL", "NATURALEZA"),
-            ("MANO", "FACIL", "CUERPO"),
-            ("PIE", "FACIL", "CUERPO"),
-            ("CABEZA", "FACIL", "CUERPO")
-        ]
+    def crear_resumen_estadisticas(self):
+        """Crea la tabla resumen y los triggers que la mantienen al día"""
+        self.cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'resumen_estadisticas'"
+        )
+        existia = self.cursor.fetchone() is not None
         
-        palabras_medio = [
-            ("PYTHON", "MEDIO", "PROGRAMACION"),
-            ("JAVA", "MEDIO", "PROGRAMACION"),
-            ("HTML", "MEDIO", "TECNOLOGIA"),
-            ("CSS", "MEDIO", "TECNOLOGIA"),
-            ("MYSQL", "MEDIO", "BASE_DATOS"),
-            ("LINUX", "MEDIO", "SISTEMA"),
-            ("WINDOWS", "MEDIO", "SISTEMA"),
-            ("OFFICE", "MEDIO", "SOFTWARE"),
-            ("GOOGLE", "MEDIO", "INTERNET"),
-            ("FACEBOOK", "MEDIO", "REDES"),
-            ("TWITTER", "MEDIO", "REDES"),
-            ("YOUTUBE", "MEDIO", "VIDEO"),
-            ("CAMARA", "MEDIO", "TECNOLOGIA"),
-            ("CELULAR", "MEDIO", "TECNOLOGIA"),
-            ("COMPUTADORA", "MEDIO", "TECNOLOGIA"),
-            ("TECLADO", "MEDIO", "HARDWARE"),
-            ("MONITOR", "MEDIO", "HARDWARE"),
-            ("IMPRESORA", "MEDIO", "HARDWARE"),
-            ("ESCANER", "MEDIO", "HARDWARE"),
-            ("AURICULARES", "MEDIO", "HARDWARE")
-        ]
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS resumen_estadisticas (
+                dificultad TEXT PRIMARY KEY,
+                partidas INTEGER NOT NULL DEFAULT 0,
+                victorias INTEGER NOT NULL DEFAULT 0,
+                suma_intentos_victorias INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
         
-        palabras_dificil = [
-            ("JAVASCRIPT", "DIFICIL", "PROGRAMACION"),
-            ("REACT", "DIFICIL", "PROGRAMACION"),
-            ("ANGULAR", "DIFICIL", "PROGRAMACION"),
-            ("VUE", "DIFICIL", "PROGRAMACION"),
-            ("DOCKER", "DIFICIL", "DEVOPS"),
-            ("KUBERNETES", "DIFICIL", "DEVOPS"),
-            ("MICROSERVICIOS", "DIFICIL", "ARQUITECTURA"),
-            ("INTELIGENCIA", "DIFICIL", "IA"),
-            ("ARTIFICIAL", "DIFICIL", "IA"),
-            ("ALGORITMO", "DIFICIL", "PROGRAMACION"),
-            ("CRIPTOCURRENCY", "DIFICIL", "FINANZAS"),
-            ("BLOCKCHAIN", "DIFICIL", "TECNOLOGIA"),
-            ("CIBERSEGURIDAD", "DIFICIL", "SEGURIDAD"),
-            ("VULNERABILIDAD", "DIFICIL", "SEGURIDAD"),
-            ("ENCRIPTACION", "DIFICIL", "SEGURIDAD"),
-            ("BIGDATA", "DIFICIL", "DATOS"),
-            ("DATA SCIENCE", "DIFICIL", "CIENCIA"),
-            ("MACHINE LEARNING", "DIFICIL", "IA"),
-            ("DEEP LEARNING", "DIFICIL", "IA"),
-            ("NEURAL NETWORK", "DIFICIL", "IA")
-        ]
+        # Cada partida insertada suma a su dificultad
+        self.cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_resumen_insert
+            AFTER INSERT ON estadisticas
+            BEGIN
+                INSERT OR IGNORE INTO resumen_estadisticas (dificultad) VALUES (NEW.dificultad);
+                UPDATE resumen_estadisticas SET
+                    partidas = partidas + 1,
+                    victorias = victorias + (NEW.victoria = 1),
+                    suma_intentos_victorias = suma_intentos_victorias
+                        + CASE WHEN NEW.victoria = 1 THEN NEW.intentos ELSE 0 END
+                WHERE dificultad = NEW.dificultad;
+            END
+        ''')
+        
+        # Cada partida borrada resta de su dificultad
+        self.cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_resumen_delete
+            AFTER DELETE ON estadisticas
+            BEGIN
+                UPDATE resumen_estadisticas SET
+                    partidas = partidas - 1,
+                    victorias = victorias - (OLD.victoria = 1),
+                    suma_intentos_victorias = suma_intentos_victorias
+                        - CASE WHEN OLD.victoria = 1 THEN OLD.intentos ELSE 0 END
+                WHERE dificultad = OLD.dificultad;
+            END
+        ''')
         
-        # Insertar todas las palabras
-        todas_palabras = palabras_facil + palabras_medio + palabras_dificil
+        # Bases de datos anteriores al resumen: calcularlo una única vez
+        if not existia:
+            self.reconstruir_resumen_estadisticas()
+    
+    def reconstruir_resumen_estadisticas(self):
+        """Recalcula la tabla resumen desde cero con un único recorrido de estadisticas"""
+        self.cursor.execute("DELETE FROM resumen_estadisticas")
+        self.cursor.execute('''
+            INSERT INTO resumen_estadisticas (dificultad, partidas, victorias, suma_intentos_victorias)
+            SELECT
+                dificultad,
+                COUNT(*),
+                SUM(victoria = 1),
+                SUM(CASE WHEN victoria = 1 THEN intentos ELSE 0 END)
+            FROM estadisticas
+            WHERE id >= ?
+            GROUP BY dificultad
+        ''', (primer_id_vigente(self.conn),))
+        
+        # El resumen por jugador existe a partir de la migración 6
+        self.cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'resumen_jugadores'"
+        )
+        if self.cursor.fetchone():
+            self.cursor.execute("DELETE FROM resumen_jugadores")
+            self.cursor.execute('''
+                INSERT INTO resumen_jugadores (jugador_id, dificultad, partidas, victorias, suma_intentos_victorias)
+                SELECT
+                    jugador_id,
+                    dificultad,
+                    COUNT(*),
+                    SUM(victoria = 1),
+                    SUM(CASE WHEN victoria = 1 THEN intentos ELSE 0 END)
+                FROM estadisticas
+                WHERE jugador_id IS NOT NULL AND id >= ?
+                GROUP BY jugador_id, dificultad
+            ''', (primer_id_vigente(self.conn),))
         
+        # Más lo que aportaban las partidas ya retenidas (migración 12)
+        self.cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'retenido_histograma'"
+        )
+        if self.cursor.fetchone():
+            # jugador_id 0 es la fila de todos, que va a resumen_estadisticas
+            sumas = f'''
+                {sql_nombre_dificultad("dificultad")},
+                SUM(partidas),
+                SUM(CASE WHEN victoria = 1 THEN partidas ELSE 0 END),
+                SUM(CASE WHEN victoria = 1 THEN intentos * partidas ELSE 0 END)
+            '''
+            sumar = '''
+                partidas = partidas + excluded.partidas,
+                victorias = victorias + excluded.victorias,
+                suma_intentos_victorias = suma_intentos_victorias + excluded.suma_intentos_victorias
+            '''
+            self.cursor.execute(f'''
+                INSERT INTO resumen_estadisticas (dificultad, partidas, victorias, suma_intentos_victorias)
+                SELECT {sumas}
+                FROM retenido_histograma
+                WHERE jugador_id = 0 AND epoca_inicio >= ?
+                GROUP BY dificultad
+                ON CONFLICT (dificultad) DO UPDATE SET {sumar}
+            ''', (inicio_epoca(self.conn),))
+            self.cursor.execute(f'''
+                INSERT INTO resumen_jugadores (jugador_id, dificultad, partidas, victorias, suma_intentos_victorias)
+                SELECT jugador_id, {sumas}
+                FROM retenido_histograma
+                WHERE jugador_id <> 0 AND epoca_inicio >= ?
+                GROUP BY jugador_id, dificultad
+                ON CONFLICT (jugador_id, dificultad) DO UPDATE SET {sumar}
+            ''', (inicio_epoca(self.conn),))
+        
+        # Y los resúmenes diario (migración 9) y por categoría (migración 10)
+        for tabla, recalcular in [("resumen_diario", recalcular_resumen_diario),
+                                  ("resumen_categorias", recalcular_resumen_categorias)]:
+            self.cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (tabla,))
+            if self.cursor.fetchone():
+                recalcular(self.cursor)
+        self.conn.commit()
+    
+    def insertar_palabras_por_defecto(self):
+        """Inserta palabras iniciales en la base de datos"""
         self.cursor.executemany(
             "INSERT INTO palabras (palabra, dificultad, categoria) VALUES (?, ?, ?)",
-            todas_palabras
+            PALABRAS_POR_DEFECTO
         )
     
-    def guardar_partida(self, palabra: str, intentos: int, victoria: bool, tiempo: int, dificultad: str):
-        """Guarda los resultados de una partida"""
+    def guardar_partida(self, palabra: str, intentos: int, victoria: bool, tiempo: int, dificultad: str,
+                        jugador_id: int = None):
+        """Guarda los resultados de una partida (jugador_id None = invitado)"""
         fecha = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.cursor.execute('''
-            INSERT INTO estadisticas (fecha, palabra, intentos, victoria, tiempo_segundos, dificultad)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (fecha, palabra, intentos, 1 if victoria else 0, tiempo, dificultad))
-        self.conn.commit()
+        fila = (fecha, palabra, intentos, 1 if victoria else 0, tiempo, dificultad, jugador_id)
+        
+        if self.escritor:
+            self.escritor.encolar(fila)
+            return
+        
+        def insertar():
+            with self.conn:
+                self.cursor.execute('''
+                    INSERT INTO estadisticas (fecha, palabra, intentos, victoria, tiempo_segundos, dificultad, jugador_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', fila)
+        
+        self.conexiones.ejecutar_con_reintentos(insertar)
+        self._partidas_guardadas([fila])
+    
+    def _partidas_guardadas(self, filas: List[Tuple]):
+        """Pasa al buffer de últimas partidas las ya guardadas (en diferido, desde el hilo escritor)"""
+        self._partidas_recientes.extend((fila[3], fila[2], fila[4]) for fila in filas)
     
-    def obtener_estadisticas(self) -> Dict:
-        """Obtiene estadísticas generales del juego"""
-        # Victorias totales
-        self.cursor.execute("SELECT COUNT(*) FROM estadisticas WHERE victoria = 1")
-        victorias = self.cursor.fetchone()[0]
+    def sincronizar(self):
+        """Barrera de lectura: espera a que se guarden las partidas encoladas (y avisa si alguna falló)"""
+        if self.escritor:
+            self.escritor.esperar()
+    
+    def obtener_estadisticas(self, jugador_id: int = None) -> Dict:
+        """Obtiene estadísticas generales del juego (de todos o de un jugador)"""
+        self.sincronizar()
         
-        # Derrotas totales
-        self.cursor.execute("SELECT COUNT(*) FROM estadisticas WHERE victoria = 0")
-        derrotas = self.cursor.fetchone()[0]
+        # Una fila por dificultad, mantenida por triggers
+        with self.conexiones.lector() as conn:
+            if jugador_id is None:
+                filas = conn.execute(
+                    "SELECT dificultad, partidas, victorias, suma_intentos_victorias FROM resumen_estadisticas"
+                )
+            else:
+                filas = conn.execute('''
+                    SELECT dificultad, partidas, victorias, suma_intentos_victorias
+                    FROM resumen_jugadores
+                    WHERE jugador_id = ?
+                ''', (jugador_id,))
+            resumen = {fila[0]: fila[1:] for fila in filas}
         
-        # Promedio de intentos en victorias
-        self.cursor.execute("SELECT AVG(intentos) FROM estadisticas WHERE victoria = 1")
-        avg_intentos = self.cursor.fetchone()[0] or 0
+        return self.armar_estadisticas(resumen)
+    
+    def obtener_estadisticas_por_categoria(self, jugador_id: int = None) -> Dict[str, Dict]:
+        """Victorias por categoría de palabra (de todos o de un jugador), de la más jugada a la menos"""
+        self.sincronizar()
         
-        # Total partidas
-        total = victorias + derrotas
+        # Contadores mantenidos por triggers: ni recorre partidas ni cruza con palabras
+        with self.conexiones.lector() as conn:
+            filas = conn.execute('''
+                SELECT categoria, partidas, victorias, suma_intentos_victorias
+                FROM resumen_categorias
+                WHERE jugador_id = ? AND partidas > 0
+                ORDER BY partidas DESC, categoria
+            ''', (jugador_id or 0,)).fetchall()
         
-        # Estadísticas por dificultad
-        stats_dificultad = {}
-        for dificultad in ["FACIL", "MEDIO", "DIFICIL"]:
+        return {
+            categoria: {
+                "victorias": victorias,
+                "total": partidas,
+                "porcentaje": round(victorias / partidas * 100, 1),
+                "promedio_intentos": round(suma_intentos / victorias, 2) if victorias else 0
+            }
+            for categoria, partidas, victorias, suma_intentos in filas
+        }
+    
+    def cargar_partidas_recientes(self):
+        """Rellena el buffer de últimas partidas recorriendo la clave primaria hacia atrás"""
+        self.sincronizar()
+        self.cursor.execute(
+            "SELECT victoria, intentos, tiempo_segundos FROM partidas WHERE id >= ? ORDER BY id DESC LIMIT ?",
+            (inicio_epoca(self.conn), self._partidas_recientes.maxlen)
+        )
+        self._partidas_recientes.clear()
+        self._partidas_recientes.extendleft(self.cursor.fetchall())
+    
+    def obtener_metricas_recientes(self, n: int = None, jugador_id: int = None) -> Dict:
+        """Métricas de las últimas n partidas (por defecto, todo el buffer)"""
+        # En diferido el buffer se llena cuando el escritor confirma cada partida
+        self.sincronizar()
+        if jugador_id is None:
+            ventana = list(self._partidas_recientes)
+            if n is not None:
+                ventana = ventana[-n:] if n > 0 else []
+        else:
+            # Por jugador: últimas n filas del índice (jugador_id, id)
+            with self.conexiones.lector() as conn:
+                ventana = conn.execute('''
+                    SELECT victoria, intentos, tiempo_segundos
+                    FROM partidas
+                    WHERE jugador_id = ? AND id >= ?
+                    ORDER BY id DESC
+                    LIMIT ?
+                ''', (jugador_id, inicio_epoca(conn),
+                      n if n is not None else self._partidas_recientes.maxlen)).fetchall()
+        
+        partidas = len(ventana)
+        victorias = [p for p in ventana if p[0] == 1]
+        tiempos = [p[2] for p in ventana if p[2] is not None]
+        
+        return {
+            "partidas": partidas,
+            "victorias": len(victorias),
+            "derrotas": partidas - len(victorias),
+            "porcentaje": round(len(victorias) / partidas * 100, 1) if partidas else 0,
+            "promedio_intentos": round(sum(p[1] for p in victorias) / len(victorias), 2) if victorias else 0,
+            "promedio_tiempo": round(sum(tiempos) / len(tiempos), 1) if tiempos else 0
+        }
+    
+    def obtener_rachas(self, jugador_id: int = None) -> Dict:
+        """Obtiene la racha actual y la mejor racha de victorias, global y por dificultad"""
+        self.sincronizar()
+        
+        # Claves de la tabla rachas (ver ambitos_racha): total y una por dificultad
+        dificultades = ["FACIL", "MEDIO", "DIFICIL"]
+        if jugador_id is None:
+            claves = ["GLOBAL"] + dificultades
+        else:
+            claves = [f"J{jugador_id}"] + [f"J{jugador_id}:{dificultad}" for dificultad in dificultades]
+        
+        with self.conexiones.lector() as conn:
+            rachas = {
+                fila[0]: fila[1:] for fila in conn.execute(
+                    f"SELECT ambito, actual, mejor FROM rachas WHERE ambito IN ({', '.join('?' * len(claves))})",
+                    claves
+                )
+            }
+        
+        actual, mejor = rachas.get(claves[0], (0, 0))
+        por_dificultad = {}
+        for dificultad, clave in zip(dificultades, claves[1:]):
+            actual_dif, mejor_dif = rachas.get(clave, (0, 0))
+            por_dificultad[dificultad.lower()] = {"actual": actual_dif, "mejor": mejor_dif}
+        
+        return {
+            "actual": actual,
+            "mejor": mejor,
+            "por_dificultad": por_dificultad
+        }
+    
+    def borrar_estadisticas(self):
+        """Empieza una época nueva: las estadísticas de todos los jugadores quedan a cero al instante
+        
+        Las partidas anteriores no se borran aquí; se mueven al archivo en
+        segundo plano y se pueden recuperar con restaurar_epoca.
+        """
+        self.sincronizar()
+        with self.conn:
+            self.cursor.execute('''
+                INSERT INTO epocas (inicio_id, fecha)
+                SELECT COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'partidas'), 0) + 1, ?
+            ''', (datetime.now().strftime("%Y-%m-%d %H:%M:%S"),))
+            self.cursor.execute("DELETE FROM resumen_estadisticas")
+            self.cursor.execute("DELETE FROM resumen_jugadores")
+            self.cursor.execute("DELETE FROM resumen_diario")
+            self.cursor.execute("DELETE FROM resumen_categorias")
+            self.cursor.execute("DELETE FROM rachas")
+        self._partidas_recientes.clear()
+        self.iniciar_archivado()
+    
+    def iniciar_archivado(self):
+        """Arranca (si no está ya en marcha) el archivado de las épocas anteriores"""
+        # Una base en memoria solo existe en la conexión de escritura
+        if self.conexiones.en_memoria:
+            return
+        archivador = self.conexiones.archivador
+        if archivador and archivador.is_alive():
+            return
+        self.conexiones.archivador = ArchivadorEpocas(self.conexiones)
+        self.conexiones.archivador.start()
+    
+    def obtener_epocas(self) -> List[Tuple]:
+        """Épocas (id, inicio_id, fecha, partidas aprox. por rango de ids), de la más reciente a la más antigua"""
+        with self.conexiones.lector() as conn:
+            epocas = conn.execute("SELECT id, inicio_id, fecha FROM epocas ORDER BY id DESC").fetchall()
+            maximo = conn.execute(
+                "SELECT COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'partidas'), 0)"
+            ).fetchone()[0]
+        
+        # Cada época va desde su inicio_id hasta el inicio de la siguiente
+        resultado = []
+        fin = maximo + 1
+        for epoca_id, inicio_id, fecha in epocas:
+            resultado.append((epoca_id, inicio_id, fecha, max(fin - max(inicio_id, 1), 0)))
+            fin = inicio_id
+        return resultado
+    
+    def restaurar_epoca(self, epoca_id: int):
+        """Deshace los reseteos posteriores a una época y vuelve a contar sus partidas"""
+        self.sincronizar()
+        fila = self.cursor.execute("SELECT inicio_id FROM epocas WHERE id = ?", (epoca_id,)).fetchone()
+        if fila is None:
+            raise ValueError(f"No existe la época {epoca_id}")
+        inicio_id = fila[0]
+        
+        # El archivador no puede seguir moviendo filas que pasan a estar vigentes
+        if self.conexiones.archivador:
+            self.conexiones.archivador.detener()
+            self.conexiones.archivador = None
+        
+        with self.conn:
+            self.cursor.execute("DELETE FROM epocas WHERE id > ?", (epoca_id,))
+        
+        # Traer de vuelta lo que ya se había archivado
+        if not self.conexiones.en_memoria:
+            adjuntar_archivo(self.conn, self.nombre_db)
+            try:
+                # Un lote interrumpido pudo quedar copiado en el archivo sin borrarse de partidas
+                with self.conn:
+                    self.cursor.execute(f'''
+                        INSERT INTO main.estadisticas ({COLUMNAS_ARCHIVO})
+                        SELECT {COLUMNAS_ARCHIVO} FROM archivo.estadisticas a
+                        WHERE a.id >= ? AND NOT EXISTS (SELECT 1 FROM main.partidas WHERE id = a.id)
+                        ORDER BY a.id
+                    ''', (inicio_id,))
+                    self.cursor.execute("DELETE FROM archivo.estadisticas WHERE id >= ?", (inicio_id,))
+            finally:
+                self.cursor.execute("DETACH DATABASE archivo")
+        
+        # Las filas restauradas no siguen el orden de inserción: resúmenes y rachas desde cero
+        self.reconstruir_resumen_estadisticas()
+        self.reconstruir_rachas()
+        self.cargar_partidas_recientes()
+        
+        # Épocas todavía anteriores siguen pendientes de archivar
+        if self.cursor.execute("SELECT 1 FROM partidas WHERE id < ? LIMIT 1", (inicio_id,)).fetchone():
+            self.iniciar_archivado()
+    
+    def reconstruir_rachas(self):
+        """Recalcula las rachas desde el historial completo"""
+        with self.conn:
+            recalcular_rachas(self.cursor)
+    
+    def obtener_palabra_aleatoria(self, dificultad: str) -> str:
+        """Obtiene una palabra aleatoria según la dificultad"""
+        # Dos intentos: si el id elegido ya no existe se recarga el pool
+        for _ in range(2):
+            ids = self._obtener_pool_palabras(dificultad)
+            if not ids:
+                break
+            
             self.cursor.execute(
-                "SELECT COUNT(*) FROM estadisticas WHERE victoria = 1 AND dificultad = ?",
-                (dificultad,)
+                "SELECT palabra FROM palabras WHERE id = ?",
+                (random.choice(ids),)
             )
-            victorias_dif = self.cursor.fetchone()[0]
+            resultado = self.cursor.fetchone()
+            if resultado:
+                return resultado[0]
+            self._pool_palabras.clear()
+        
+        return self.obtener_palabra_alternativa(dificultad)
+    
+    def _obtener_pool_palabras(self, dificultad: str) -> array:
+        """Devuelve los ids de palabras de una dificultad, recargándolos si palabras cambió"""
+        self.cursor.execute("SELECT version FROM contador_cambios WHERE tabla = 'palabras'")
+        fila = self.cursor.fetchone()
+        version = fila[0] if fila else None
+        
+        if version != self._version_pool:
+            self._pool_palabras.clear()
+            self._version_pool = version
+        
+        if dificultad not in self._pool_palabras:
+            self.cursor.execute("SELECT id FROM palabras WHERE dificultad = ? AND jugable = 1", (dificultad,))
+            self._pool_palabras[dificultad] = array("q", (fila[0] for fila in self.cursor))
+        
+        return self._pool_palabras[dificultad]
+    
+    def obtener_categoria(self, palabra: str) -> str:
+        """Categoría de una palabra (None si no está en la base)"""
+        with self.conexiones.lector() as conn:
+            resultado = conn.execute(
+                "SELECT categoria FROM palabras WHERE palabra = ?", (palabra,)
+            ).fetchone()
+        return resultado[0] if resultado else None
+    
+    def buscar(self, texto: str, limite: int = 50, jugador_id: int = None,
+               en_categoria: bool = False, solo_jugadas: bool = False) -> List[Dict]:
+        """Palabras que contienen 'texto' con sus resultados en la época actual, de la más jugada a la menos
+        
+        Con el índice FTS5 (trigram) solo se tocan las palabras que coinciden y
+        sus partidas; con menos de 3 letras, o sin FTS5, se recorre palabras con LIKE.
+        """
+        texto = " ".join(texto.split())
+        if not texto:
+            return []
+        
+        self.sincronizar()
+        with self.conexiones.lector() as conn:
+            indexada = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'palabras_fts'"
+            ).fetchone()
+            if indexada and len(texto) >= 3:
+                # Entre comillas es una sola frase: sin operadores ni comodines de FTS5
+                columnas = "{palabra categoria}" if en_categoria else "palabra"
+                coincidencias = "SELECT rowid AS id FROM palabras_fts WHERE palabras_fts MATCH ?"
+                frase = texto.replace('"', '""')
+                parametros = [f'{columnas} : "{frase}"']
+            else:
+                patron = "%" + texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                condiciones = ["palabra LIKE ? ESCAPE '\\'"]
+                if en_categoria:
+                    condiciones.append("categoria LIKE ? ESCAPE '\\'")
+                coincidencias = f"SELECT id FROM palabras WHERE {' OR '.join(condiciones)}"
+                parametros = [patron] * len(condiciones)
             
+            # CROSS JOIN fija el orden: de las coincidencias a palabras, nunca recorrer palabras entera.
+            # Los agregados salen de idx_partidas_palabra, sin pasar por la tabla partidas
+            union = "p.palabra_id = w.id AND p.id >= ?"
+            parametros.append(inicio_epoca(conn))
+            if jugador_id is not None:
+                union += " AND p.jugador_id = ?"
+                parametros.append(jugador_id)
+            parametros.append(limite)
+            filas = conn.execute(f'''
+                SELECT w.palabra, w.categoria, w.dificultad,
+                       COUNT(p.id),
+                       COALESCE(SUM(p.victoria = 1), 0),
+                       COALESCE(SUM(CASE WHEN p.victoria = 1 THEN p.intentos ELSE 0 END), 0)
+                FROM ({coincidencias}) c
+                CROSS JOIN palabras w ON w.id = c.id
+                {"JOIN" if solo_jugadas else "LEFT JOIN"} partidas p ON {union}
+                GROUP BY w.id
+                ORDER BY 4 DESC, w.palabra
+                LIMIT ?
+            ''', parametros).fetchall()
+        
+        return [
+            {
+                "palabra": palabra,
+                "categoria": categoria,
+                "dificultad": dificultad,
+                "victorias": victorias,
+                "total": partidas,
+                "porcentaje": round(victorias / partidas * 100, 1) if partidas else 0,
+                "promedio_intentos": round(suma_intentos / victorias, 2) if victorias else 0
+            }
+            for palabra, categoria, dificultad, partidas, victorias, suma_intentos in filas
+        ]
+    
+    @staticmethod
+    def consulta_ranking(limite: int, dificultad: str = None,
+                         jugador_id: int = None, inicio: int = 0) -> Tuple[str, tuple]:
+        """Construye la consulta de ranking y sus parámetros (informe_kioscos la lanza en cada base)"""
+        condiciones = ["p.victoria = 1"]
+        parametros = []
+        if jugador_id is not None:
+            condiciones.insert(0, "p.jugador_id = ?")
+            parametros.append(jugador_id)
+        if dificultad:
+            condiciones.append("p.dificultad = ?")
+            parametros.append(CODIGOS_DIFICULTAD.get(dificultad, 0))
+        if inicio:
+            # El + impide que el rango de id compita con el índice de ranking
+            condiciones.append("+p.id >= ?")
+            parametros.append(inicio)
+        parametros.append(limite)
+        
+        return f'''
+            SELECT w.palabra, p.intentos, p.tiempo_segundos, {FECHA}, {DIFICULTAD}
+            FROM {PARTIDAS}
+            WHERE {" AND ".join(condiciones)}
+            ORDER BY p.intentos ASC, p.tiempo_segundos ASC 
+            LIMIT ?
+        ''', tuple(parametros)
+    
+    def obtener_ranking(self, limite: int = 10, dificultad: str = None, jugador_id: int = None):
+        """Obtiene el ranking de mejores partidas"""
+        self.sincronizar()
+        with self.conexiones.lector() as conn:
+            return conn.execute(
+                *self.consulta_ranking(limite, dificultad, jugador_id, inicio_epoca(conn))
+            ).fetchall()
+    
+    @staticmethod
+    def _filtros_partidas(dificultad: str = None, victoria: bool = None,
+                          desde: Union[str, datetime] = None, hasta: Union[str, datetime] = None,
+                          jugador_id: int = None, inicio: int = 0) -> Tuple[List[str], list]:
+        """Condiciones WHERE y parámetros comunes a historial y exportación"""
+        condiciones = []
+        parametros = []
+        if inicio:
+            condiciones.append("p.id >= ?")
+            parametros.append(inicio)
+        if jugador_id is not None:
+            condiciones.append("p.jugador_id = ?")
+            parametros.append(jugador_id)
+        if dificultad:
+            condiciones.append("p.dificultad = ?")
+            parametros.append(CODIGOS_DIFICULTAD.get(dificultad, 0))
+        if victoria is not None:
+            condiciones.append("p.victoria = ?")
+            parametros.append(1 if victoria else 0)
+        if desde:
+            condiciones.append("p.momento >= ?")
+            parametros.append(GestorBaseDatos._a_momento(desde))
+        if hasta:
+            condiciones.append("p.momento < ?")
+            parametros.append(GestorBaseDatos._a_momento(hasta))
+        return condiciones, parametros
+    
+    @staticmethod
+    def _a_momento(valor: Union[str, datetime]) -> int:
+        """Segundos Unix de una fecha local ('YYYY-MM-DD' o 'YYYY-MM-DD HH:MM:SS')"""
+        if not isinstance(valor, datetime):
+            valor = datetime.fromisoformat(valor)
+        return int(valor.timestamp())
+    
+    def iterar_partidas(self, desde: Union[str, datetime] = None, hasta: Union[str, datetime] = None,
+                        dificultad: str = None, jugador_id: int = None,
+                        tamano_lote: int = 1000) -> Iterator[Tuple]:
+        """Recorre el historial en orden de id, leyendo por lotes con fetchmany"""
+        self.sincronizar()
+        
+        with self.conexiones.lector() as conn:
+            inicio = inicio_epoca(conn)
+        condiciones, parametros = self._filtros_partidas(dificultad, None, desde, hasta, jugador_id, inicio)
+        sql = f'''
+            SELECT p.id, {FECHA}, w.palabra, p.intentos, p.victoria, p.tiempo_segundos, {DIFICULTAD}, p.jugador_id
+            FROM {PARTIDAS}
+        '''
+        if condiciones:
+            sql += " WHERE " + " AND ".join(condiciones)
+        sql += " ORDER BY p.id"
+        
+        # La conexión vuelve al pool cuando el generador termina o se cierra
+        with self.conexiones.lector() as conn:
+            cursor = conn.execute(sql, parametros)
+            try:
+                while True:
+                    lote = cursor.fetchmany(tamano_lote)
+                    if not lote:
+                        break
+                    yield from lote
+            finally:
+                cursor.close()
+    
+    def _consulta_historial(self, limite: int, antes_de_id: int = None, dificultad: str = None,
+                            victoria: bool = None, desde: Union[str, datetime] = None,
+                            hasta: Union[str, datetime] = None,
+                            jugador_id: int = None, inicio: int = 0) -> Tuple[str, list]:
+        """Construye la consulta paginada del historial y sus parámetros"""
+        condiciones, parametros = self._filtros_partidas(dificultad, victoria, desde, hasta, jugador_id, inicio)
+        if antes_de_id is not None:
+            condiciones.insert(0, "p.id < ?")
+            parametros.insert(0, antes_de_id)
+        
+        sql = f"SELECT p.id, {FECHA}, w.palabra, p.intentos, p.victoria, p.tiempo_segundos, {DIFICULTAD} FROM {PARTIDAS}"
+        if condiciones:
+            sql += " WHERE " + " AND ".join(condiciones)
+        sql += " ORDER BY p.id DESC LIMIT ?"
+        parametros.append(limite)
+        return sql, parametros
+    
+    def obtener_historial(self, limite: int = 50, antes_de_id: int = None, dificultad: str = None,
+                          victoria: bool = None, desde: Union[str, datetime] = None,
+                          hasta: Union[str, datetime] = None, jugador_id: int = None) -> List[Tuple]:
+        """Obtiene una página del historial, de la partida más reciente a la más antigua
+        
+        Paginación por clave: para la página siguiente se pasa como antes_de_id
+        el id de la última fila recibida, así cada página cuesta lo mismo.
+        """
+        self.sincronizar()
+        with self.conexiones.lector() as conn:
+            sql, parametros = self._consulta_historial(limite, antes_de_id, dificultad, victoria,
+                                                       desde, hasta, jugador_id, inicio_epoca(conn))
+            return conn.execute(sql, parametros).fetchall()
+    
+    def crear_jugador(self, nombre: str) -> int:
+        """Crea un perfil de jugador (o devuelve el existente con ese nombre)"""
+        nombre = " ".join(nombre.split()).upper()
+        if not nombre:
+            raise ValueError("El nombre del jugador no puede estar vacío")
+        
+        with self.conn:
             self.cursor.execute(
-                "SELECT COUNT(*) FROM estadisticas WHERE dificultad = ?",
-                (dificultad,)
+                "INSERT OR IGNORE INTO jugadores (nombre, creado) VALUES (?, ?)",
+                (nombre, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            )
+        self.cursor.execute("SELECT id FROM jugadores WHERE nombre = ?", (nombre,))
+        return self.cursor.fetchone()[0]
+    
+    def obtener_jugadores(self) -> List[Tuple[int, str]]:
+        """Lista de jugadores (id, nombre) por orden alfabético"""
+        with self.conexiones.lector() as conn:
+            return conn.execute("SELECT id, nombre FROM jugadores ORDER BY nombre").fetchall()
+    
+    def obtener_plan_ranking(self, dificultad: str = None, jugador_id: int = None) -> List[str]:
+        """Devuelve el EXPLAIN QUERY PLAN de la consulta de ranking"""
+        sql, parametros = self.consulta_ranking(10, dificultad, jugador_id, inicio_epoca(self.conn))
+        self.cursor.execute("EXPLAIN QUERY PLAN " + sql, parametros)
+        return [fila[3] for fila in self.cursor.fetchall()]
+    
+    @staticmethod
+    def obtener_metricas_sql() -> List[Dict]:
+        """Llamadas, tiempo total, p95 y filas por sentencia SQL desde que arrancó el proceso"""
+        return instrumentador.snapshot()
+    
+    def cerrar(self):
+        """Cierra la conexión a la base de datos"""
+        if self._cerrado:
+            return
+        self._cerrado = True
+        
+        # Confirmar primero todo lo que siga en la cola
+        try:
+            if self.escritor:
+                escritor, self.escritor = self.escritor, None
+                escritor.cerrar()
+        finally:
+            # La conexión se cierra de verdad cuando la suelta la última instancia
+            self.cursor.close()
+            liberar_conexiones(self.conexiones)
+    
+    
+    def obtener_estadisticas_extendidas(self, jugador_id: int = None) -> Dict:
+        """Obtiene estadísticas extendidas para análisis detallado"""
+        self.sincronizar()
+        
+        # Un único recorrido del índice de ranking: histograma por
+        # (victoria, dificultad, intentos, tiempo), sin ordenación temporal
+        with self.conexiones.lector() as conn:
+            condiciones, parametros = self._filtros_partidas(jugador_id=jugador_id, inicio=primer_id_vigente(conn))
+            filtro = "WHERE " + " AND ".join(condiciones) if condiciones else ""
+            filtro_victoria = "WHERE " + " AND ".join(condiciones + ["p.victoria = 1"])
+            
+            histograma = conn.execute(f'''
+                SELECT p.victoria, p.dificultad, p.intentos, p.tiempo_segundos, COUNT(*)
+                FROM partidas p
+                {filtro}
+                GROUP BY p.victoria, p.dificultad, p.intentos, p.tiempo_segundos
+            ''', parametros).fetchall()
+            
+            # Las partidas retenidas ya no están en partidas, pero su histograma sí
+            histograma += conn.execute('''
+                SELECT victoria, dificultad, intentos, NULLIF(tiempo_segundos, -1), SUM(partidas)
+                FROM retenido_histograma
+                WHERE jugador_id = ? AND epoca_inicio >= ?
+                GROUP BY victoria, dificultad, intentos, tiempo_segundos
+            ''', (jugador_id or 0, inicio_epoca(conn))).fetchall()
+            
+            # Última victoria: recorrido hacia atrás por clave primaria
+            ultima_victoria = conn.execute(f'''
+                SELECT w.palabra, p.intentos, p.tiempo_segundos, {FECHA}, {DIFICULTAD}
+                FROM {PARTIDAS}
+                {filtro_victoria}
+                ORDER BY p.id DESC
+                LIMIT 1
+            ''', parametros).fetchone()
+        
+        total = victorias = suma_intentos = 0
+        suma_tiempo = partidas_con_tiempo = 0
+        mejor_tiempo = peor_tiempo = None
+        distribucion_intentos: Dict[int, int] = {}
+        tiempos_victoria: Dict[int, int] = {}
+        por_dificultad = {
+            dificultad.lower(): {"victorias": 0, "total": 0, "suma_intentos": 0, "suma_tiempo": 0}
+            for dificultad in ["FACIL", "MEDIO", "DIFICIL"]
+        }
+        
+        for victoria, codigo, intentos, tiempo, cantidad in histograma:
+            dificultad = DIFICULTADES[codigo - 1] if 0 < codigo <= len(DIFICULTADES) else "?"
+            total += cantidad
+            datos_dif = por_dificultad.setdefault(
+                dificultad.lower(), {"victorias": 0, "total": 0, "suma_intentos": 0, "suma_tiempo": 0}
             )
-            total_dif = self.cursor.fetchone()[0]
+            datos_dif["total"] += cantidad
             
-            if total_dif > 0:
-                porcentaje = (victorias_dif / total_dif) * 100
-            else:
-                porcentaje = 0
+            if tiempo is not None:
+                suma_tiempo += tiempo * cantidad
+                partidas_con_tiempo += cantidad
+                datos_dif["suma_tiempo"] += tiempo * cantidad
+                mejor_tiempo = tiempo if mejor_tiempo is None else min(mejor_tiempo, tiempo)
+                peor_tiempo = tiempo if peor_tiempo is None else max(peor_tiempo, tiempo)
             
-            stats_dificultad[dificultad.lower()] = {
-                "victorias": victorias_dif,
-                "total": total_dif,
-                "porcentaje": round(porcentaje, 1)
+            if victoria == 1:
+                victorias += cantidad
+                suma_intentos += intentos * cantidad
+                datos_dif["victorias"] += cantidad
+                datos_dif["suma_intentos"] += intentos * cantidad
+                distribucion_intentos[intentos] = distribucion_intentos.get(intentos, 0) + cantidad
+                if tiempo is not None:
+                    tiempos_victoria[tiempo] = tiempos_victoria.get(tiempo, 0) + cantidad
+        
+        avg_intentos = suma_intentos / victorias if victorias else 0
+        avg_tiempo = suma_tiempo / partidas_con_tiempo if partidas_con_tiempo else 0
+        
+        # Desglose por dificultad con el mismo formato que obtener_estadisticas
+        stats_dificultad = {}
+        for dificultad, datos in por_dificultad.items():
+            stats_dificultad[dificultad] = {
+                "victorias": datos["victorias"],
+                "total": datos["total"],
+                "porcentaje": round(datos["victorias"] / datos["total"] * 100, 1) if datos["total"] else 0,
+                "promedio_intentos": round(datos["suma_intentos"] / datos["victorias"], 2) if datos["victorias"] else 0,
+                "promedio_tiempo": round(datos["suma_tiempo"] / datos["total"], 1) if datos["total"] else 0
             }
         
         return {
             "victorias": victorias,
-            "derrotas": derrotas,
+            "derrotas": total - victorias,
             "partidas_totales": total,
             "promedio_intentos": round(avg_intentos, 2) if avg_intentos else 0,
-            "por_dificultad": stats_dificultad
+            "por_dificultad": stats_dificultad,
+            "datos_extendidos": (total, victorias, avg_intentos or None, avg_tiempo or None,
+                                 mejor_tiempo, peor_tiempo),
+            "promedio_tiempo": round(avg_tiempo, 1),
+            "mejor_tiempo": mejor_tiempo,
+            "peor_tiempo": peor_tiempo,
+            "mediana_tiempo": self._percentil(tiempos_victoria, 50),
+            "p90_tiempo": self._percentil(tiempos_victoria, 90),
+            "distribucion_intentos": dict(sorted(distribucion_intentos.items())),
+            "ultima_victoria": ultima_victoria,
+            "total_metricas": len(distribucion_intentos)
         }
     
-    def obtener_palabra_aleatoria(self, dificultad: str) -> str:
-        """Obtiene una palabra aleatoria según la dificultad"""
-        self.cursor.execute(
-            "SELECT palabra FROM palabras WHERE dificultad = ? ORDER BY RANDOM() LIMIT 1",
-            (dificultad,)
-        )
-        resultado = self.cursor.fetchone()
-        return resultado[0] if resultado else self.obtener_palabra_alternativa(dificultad)
-    
-    def obtener_palabra_alternativa(self, dificultad: str) -> str:
-        """Obtiene una palabra alternativa si no hay para la dificultad"""
-        if dificultad == "FACIL":
-            return "PYTHON"
-        elif dificultad == "MEDIO":
-            return "PROGRAMACION"
-        else:
-            return "DESAFIANTE"
-    
-    def obtener_ranking(self, limite: int = 10, dificultad: str = None):
-        """Obtiene el ranking de mejores partidas"""
+    def obtener_tendencia(self, periodo: str = "dia", desde: Union[str, date] = None,
+                          hasta: Union[str, date] = None, dificultad: str = None,
+                          jugador_id: int = None) -> List[Dict]:
+        """Serie por día, semana o mes sacada del resumen diario (desde incluido, hasta excluido)
+        
+        Con desde y hasta la serie trae también los periodos sin partidas,
+        para poder dibujarla tal cual.
+        """
+        if periodo not in PERIODOS_TENDENCIA:
+            raise ValueError(f"Periodo de tendencia desconocido: {periodo}")
+        
+        condiciones = ["jugador_id = ?"]
+        parametros = [jugador_id or 0]
+        if desde:
+            condiciones.append("dia >= ?")
+            parametros.append(self._a_dia(desde))
+        if hasta:
+            condiciones.append("dia < ?")
+            parametros.append(self._a_dia(hasta))
         if dificultad:
-            self.cursor.execute('''
-                SELECT palabra, intentos, tiempo_segundos, fecha, dificultad 
-                FROM estadisticas 
-                WHERE victoria = 1 AND dificultad = ?
-                ORDER BY intentos ASC, tiempo_segundos ASC 
-                LIMIT ?
-            ''', (dificultad, limite))
-        else:
-            self.cursor.execute('''
-                SELECT palabra, intentos, tiempo_segundos, fecha, dificultad 
-                FROM estadisticas 
-                WHERE victoria = 1 
-                ORDER BY intentos ASC, tiempo_segundos ASC 
-                LIMIT ?
-            ''', (limite,))
+            condiciones.append("dificultad = ?")
+            parametros.append(dificultad)
+        
+        self.sincronizar()
+        with self.conexiones.lector() as conn:
+            acumulados = {
+                fila[0]: fila[1:] for fila in conn.execute(f'''
+                    SELECT {PERIODOS_TENDENCIA[periodo]} AS periodo, SUM(partidas), SUM(victorias),
+                           SUM(suma_intentos_victorias), SUM(suma_tiempo), SUM(partidas_con_tiempo)
+                    FROM resumen_diario
+                    WHERE {" AND ".join(condiciones)}
+                    GROUP BY periodo
+                    ORDER BY periodo
+                ''', parametros)
+            }
         
-        return self.cursor.fetchall()
+        periodos = list(acumulados)
+        if desde and hasta:
+            periodos = self._periodos(self._a_dia(desde), self._a_dia(hasta), periodo)
+        
+        serie = []
+        for inicio in periodos:
+            partidas, victorias, suma_intentos, suma_tiempo, con_tiempo = acumulados.get(inicio, (0, 0, 0, 0, 0))
+            serie.append({
+                "periodo": inicio,
+                "partidas": partidas,
+                "victorias": victorias,
+                "porcentaje": round(victorias / partidas * 100, 1) if partidas else 0,
+                "promedio_intentos": round(suma_intentos / victorias, 2) if victorias else 0,
+                "promedio_tiempo": round(suma_tiempo / con_tiempo, 1) if con_tiempo else 0
+            })
+        return serie
     
-    def cerrar(self):
-        """Cierra la conexión a la base de datos"""
-        self.conn.close()
+    @staticmethod
+    def _a_dia(valor: Union[str, date]) -> str:
+        """Día 'YYYY-MM-DD' de una fecha o de un texto que empieza por ella"""
+        if isinstance(valor, date):
+            return valor.strftime("%Y-%m-%d")
+        return valor[:10]
+    
+    @staticmethod
+    def _periodos(desde: str, hasta: str, periodo: str) -> List[str]:
+        """Inicios de todos los periodos que tocan el rango de días [desde, hasta)"""
+        dia = date.fromisoformat(desde)
+        fin = date.fromisoformat(hasta)
+        inicios = []
+        while dia < fin:
+            if periodo == "semana":
+                inicio = dia - timedelta(days=dia.weekday())
+            elif periodo == "mes":
+                inicio = dia.replace(day=1)
+            else:
+                inicio = dia
+            if not inicios or inicios[-1] != inicio.isoformat():
+                inicios.append(inicio.isoformat())
+            dia += timedelta(days=1)
+        return inicios
+    
+    @staticmethod
+    def _percentil(histograma: Dict[int, int], percentil: float):
+        """Percentil por rango más cercano sobre un histograma {valor: cantidad}"""
+        total = sum(histograma.values())
+        if total == 0:
+            return None
+        
+        objetivo = max(1, math.ceil(percentil / 100 * total))
+        acumulado = 0
+        for valor in sorted(histograma):
+            acumulado += histograma[valor]
+            if acumulado >= objetivo:
+                return valor
 
-    # En gestor_bd.py, dentro de la clase GestorBaseDatos, añade:
 
-def obtener_estadisticas_extendidas(self):
-    """Obtiene estadísticas extendidas para análisis detallado"""
-    stats = self.obtener_estadisticas()
-    
-    # Obtener datos adicionales
-    self.cursor.execute('''
-        SELECT 
-            COUNT(*) as total_partidas,
-            SUM(CASE WHEN victoria = 1 THEN 1 ELSE 0 END) as victorias,
-            AVG(CASE WHEN victoria = 1 THEN intentos ELSE NULL END) as avg_intentos_victorias,
-            AVG(tiempo_segundos) as avg_tiempo,
-            MIN(tiempo_segundos) as mejor_tiempo,
-            MAX(tiempo_segundos) as peor_tiempo
-        FROM estadisticas
-    ''')
-    
-    datos_extras = self.cursor.fetchone()
-    
-    # Obtener distribución de intentos
-    self.cursor.execute('''
-        SELECT intentos, COUNT(*) 
-        FROM estadisticas 
-        WHERE victoria = 1 
-        GROUP BY intentos 
-        ORDER BY intentos
-    ''')
-    
-    distribucion_intentos = dict(self.cursor.fetchall())
-    
-    # Obtener última victoria
-    self.cursor.execute('''
-        SELECT palabra, intentos, tiempo_segundos, fecha, dificultad
-        FROM estadisticas 
-        WHERE victoria = 1 
-        ORDER BY fecha DESC 
-        LIMIT 1
-    ''')
-    
-    ultima_victoria = self.cursor.fetchone()
-    
-    stats.update({
-        "datos_extendidos": datos_extras,
-        "distribucion_intentos": distribucion_intentos,
-        "ultima_victoria": ultima_victoria,
-        "total_metricas": len(distribucion_intentos)
-    })
-    
-    return stats
\ No newline at end of file
+if __name__ == "__main__":
+    import argparse
+    from epocas import activar_vacuum_incremental
+    
+    parser = argparse.ArgumentParser(description="Utilidades de mantenimiento de la base de datos del juego")
+    parser.add_argument("--db", default="juego_palabras.db", help="Ruta de la base de datos")
+    parser.add_argument("--reconstruir-resumen", action="store_true",
+                        help="Recalcula la tabla resumen_estadisticas desde estadisticas")
+    parser.add_argument("--reconstruir-rachas", action="store_true",
+                        help="Recalcula las rachas de victorias desde el historial")
+    parser.add_argument("--epocas", action="store_true",
+                        help="Lista las épocas de estadísticas (una por cada reseteo)")
+    parser.add_argument("--restaurar-epoca", type=int, metavar="ID",
+                        help="Deshace los reseteos posteriores a la época indicada")
+    parser.add_argument("--tendencia", choices=list(PERIODOS_TENDENCIA),
+                        help="Muestra partidas y porcentaje de victorias por día, semana o mes")
+    parser.add_argument("--categorias", action="store_true",
+                        help="Muestra el porcentaje de victorias por categoría de palabra")
+    parser.add_argument("--buscar", metavar="TEXTO",
+                        help="Palabras que contienen el texto, con sus victorias en la época actual")
+    parser.add_argument("--compactar", action="store_true",
+                        help="Activa auto_vacuum incremental en una base existente (reescribe el archivo)")
+    parser.add_argument("--depurar-sql", action="store_true",
+                        help="Muestra al salir las métricas de cada sentencia SQL")
+    parser.add_argument("--umbral-lento-ms", type=float, default=None,
+                        help="Muestra el EXPLAIN QUERY PLAN de las sentencias más lentas que este umbral")
+    args = parser.parse_args()
+    
+    gestor = GestorBaseDatos(args.db, depuracion_sql=args.depurar_sql, umbral_sql_lento_ms=args.umbral_lento_ms)
+    try:
+        if args.reconstruir_resumen:
+            gestor.reconstruir_resumen_estadisticas()
+            print("✅ Resumen de estadísticas reconstruido")
+        elif args.reconstruir_rachas:
+            gestor.reconstruir_rachas()
+            print("✅ Rachas reconstruidas")
+        elif args.epocas:
+            for epoca_id, inicio_id, fecha, partidas in gestor.obtener_epocas():
+                print(f"🗓️ Época {epoca_id}: desde {fecha} (id >= {inicio_id}), {partidas} partidas")
+        elif args.restaurar_epoca is not None:
+            gestor.restaurar_epoca(args.restaurar_epoca)
+            print(f"✅ Época {args.restaurar_epoca} restaurada")
+        elif args.tendencia:
+            for punto in gestor.obtener_tendencia(args.tendencia):
+                print(f"📆 {punto['periodo']}: {punto['partidas']} partidas, {punto['porcentaje']}% victorias, "
+                      f"{punto['promedio_intentos']} intentos de media")
+        elif args.categorias:
+            for categoria, datos in gestor.obtener_estadisticas_por_categoria().items():
+                print(f"🏷️ {categoria}: {datos['victorias']}/{datos['total']} victorias ({datos['porcentaje']}%)")
+        elif args.buscar:
+            for datos in gestor.buscar(args.buscar, en_categoria=True):
+                print(f"🔎 {datos['palabra']} ({datos['categoria']}, {datos['dificultad']}): "
+                      f"{datos['victorias']}/{datos['total']} victorias ({datos['porcentaje']}%)")
+        elif args.compactar:
+            gestor.sincronizar()
+            activar_vacuum_incremental(gestor.conn)
+            print("✅ Base compactada con auto_vacuum incremental")
+        else:
+            parser.print_help()
+    finally:
+        gestor.cerrar()
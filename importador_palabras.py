@@ -0,0 +1,198 @@
+# importador_palabras.py
+import csv
+import json
+import os
+import time
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from gestor_bd import GestorBaseDatos
+from repositorio import DIFICULTADES
+
+# Índices secundarios que se eliminan y reconstruyen en cargas grandes
+# (el índice UNIQUE de palabra se conserva: es el que descarta duplicados)
+INDICES_SECUNDARIOS = {
+    "idx_palabras_dificultad": "CREATE INDEX IF NOT EXISTS idx_palabras_dificultad ON palabras (dificultad, jugable)",
+}
+
+# Triggers de palabras que no se disparan fila a fila durante la importación:
+# la versión se sube una sola vez al final y el índice de búsqueda se reconstruye entero
+TRIGGER_VERSION = "trg_palabras_version_insert"
+TRIGGERS_BUSQUEDA = ("trg_palabras_fts_insert",)
+
+# A partir de este tamaño de archivo compensa reconstruir los índices al final
+UMBRAL_CARGA_GRANDE = 5 * 1024 * 1024
+
+
+def inferir_dificultad(palabra: str) -> str:
+    """Asigna una dificultad según la longitud de la palabra"""
+    if len(palabra) <= 5:
+        return "FACIL"
+    elif len(palabra) <= 8:
+        return "MEDIO"
+    return "DIFICIL"
+
+
+def _normalizar(palabra: str, dificultad: Optional[str], categoria: Optional[str],
+                dificultad_defecto: Optional[str], categoria_defecto: str) -> Optional[Tuple[str, str, str]]:
+    """Normaliza una entrada a (PALABRA, DIFICULTAD, CATEGORIA) o None si no es válida"""
+    palabra = " ".join((palabra or "").split()).upper()
+    if not palabra:
+        return None
+    
+    dificultad = (dificultad or dificultad_defecto or inferir_dificultad(palabra)).strip().upper()
+    if dificultad not in DIFICULTADES:
+        return None
+    
+    categoria = (categoria or categoria_defecto).strip().upper() or categoria_defecto
+    return palabra, dificultad, categoria
+
+
+def leer_palabras(ruta: str, dificultad_defecto: str = None,
+                  categoria_defecto: str = "GENERAL") -> Iterator[Tuple[str, str, str]]:
+    """Lee un archivo TXT, CSV o JSONL línea a línea y genera tuplas normalizadas"""
+    extension = os.path.splitext(ruta)[1].lower()
+    
+    with open(ruta, "r", encoding="utf-8", newline="") as archivo:
+        if extension == ".jsonl":
+            for linea in archivo:
+                if not linea.strip():
+                    continue
+                datos = json.loads(linea)
+                entrada = _normalizar(datos.get("palabra"), datos.get("dificultad"),
+                                      datos.get("categoria"), dificultad_defecto, categoria_defecto)
+                if entrada:
+                    yield entrada
+        
+        elif extension == ".csv":
+            for fila in csv.reader(archivo):
+                if not fila or fila[0].strip().lower() == "palabra":
+                    continue  # Fila vacía o encabezado
+                fila = fila + [None] * (3 - len(fila))
+                entrada = _normalizar(fila[0], fila[1], fila[2], dificultad_defecto, categoria_defecto)
+                if entrada:
+                    yield entrada
+        
+        else:
+            # TXT: una palabra por línea, opcionalmente "palabra<TAB>dificultad<TAB>categoria"
+            for linea in archivo:
+                campos = linea.rstrip("\r\n").split("\t") + [None, None]
+                entrada = _normalizar(campos[0], campos[1], campos[2], dificultad_defecto, categoria_defecto)
+                if entrada:
+                    yield entrada
+
+
+def _quitar_triggers(cursor, nombres) -> List[str]:
+    """Elimina los triggers indicados que existan y devuelve su SQL para volver a crearlos"""
+    marcas = ", ".join("?" * len(nombres))
+    sqls = [fila[0] for fila in cursor.execute(
+        f"SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name IN ({marcas})", tuple(nombres)
+    ).fetchall()]
+    for nombre in nombres:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+    return sqls
+
+
+def importar_palabras(gestor_db: GestorBaseDatos, ruta: str, tamano_lote: int = 10000,
+                      dificultad_defecto: str = None, categoria_defecto: str = "GENERAL",
+                      reconstruir_indices: bool = None,
+                      progreso: Callable[[Dict], None] = None) -> Dict:
+    """Importa un diccionario en lotes dentro de una única transacción"""
+    if reconstruir_indices is None:
+        reconstruir_indices = os.path.getsize(ruta) >= UMBRAL_CARGA_GRANDE
+    
+    conn = gestor_db.conn
+    cursor = conn.cursor()
+    palabras = leer_palabras(ruta, dificultad_defecto, categoria_defecto)
+    
+    resultado = {"leidas": 0, "insertadas": 0, "segundos": 0.0, "filas_por_segundo": 0.0}
+    inicio = time.perf_counter()
+    
+    if conn.in_transaction:
+        conn.commit()
+    cursor.execute("BEGIN")
+    try:
+        # Dentro de la transacción: si algo falla, el rollback devuelve también los triggers
+        triggers = [TRIGGER_VERSION] + (list(TRIGGERS_BUSQUEDA) if reconstruir_indices else [])
+        sql_triggers = _quitar_triggers(cursor, triggers)
+        if reconstruir_indices:
+            for nombre in INDICES_SECUNDARIOS:
+                cursor.execute(f"DROP INDEX IF EXISTS {nombre}")
+        
+        while True:
+            lote = list(islice(palabras, tamano_lote))
+            if not lote:
+                break
+            
+            # Cada lote es un savepoint dentro de la transacción exterior
+            cursor.execute("SAVEPOINT lote_palabras")
+            cursor.executemany(
+                "INSERT OR IGNORE INTO palabras (palabra, dificultad, categoria) VALUES (?, ?, ?)",
+                lote
+            )
+            resultado["insertadas"] += max(cursor.rowcount, 0)
+            # Las que ya estaban solo por haberse jugado pasan a ser del diccionario
+            cursor.executemany(
+                "UPDATE palabras SET dificultad = ?, categoria = ?, jugable = 1 WHERE palabra = ? AND jugable = 0",
+                [(dificultad, categoria, palabra) for palabra, dificultad, categoria in lote]
+            )
+            resultado["insertadas"] += max(cursor.rowcount, 0)
+            cursor.execute("RELEASE lote_palabras")
+            
+            resultado["leidas"] += len(lote)
+            resultado["segundos"] = time.perf_counter() - inicio
+            resultado["filas_por_segundo"] = resultado["leidas"] / resultado["segundos"] if resultado["segundos"] else 0.0
+            if progreso:
+                progreso(dict(resultado))
+        
+        if reconstruir_indices:
+            for sql in INDICES_SECUNDARIOS.values():
+                cursor.execute(sql)
+            if cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'palabras_fts'").fetchone():
+                cursor.execute("INSERT INTO palabras_fts (palabras_fts) VALUES ('rebuild')")
+        
+        # Un único cambio de versión: el pool de palabras se recarga una vez, no una por palabra
+        if resultado["insertadas"]:
+            cursor.execute("UPDATE contador_cambios SET version = version + 1 WHERE tabla = 'palabras'")
+        for sql in sql_triggers:
+            cursor.execute(sql)
+        
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    
+    resultado["segundos"] = time.perf_counter() - inicio
+    resultado["filas_por_segundo"] = resultado["leidas"] / resultado["segundos"] if resultado["segundos"] else 0.0
+    return resultado
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Importa un diccionario (TXT, CSV o JSONL) a la tabla palabras")
+    parser.add_argument("archivo", help="Archivo de palabras a importar")
+    parser.add_argument("--db", default="juego_palabras.db", help="Ruta de la base de datos")
+    parser.add_argument("--dificultad", choices=DIFICULTADES,
+                        help="Dificultad para entradas sin ella (por defecto, según la longitud)")
+    parser.add_argument("--categoria", default="GENERAL", help="Categoría para entradas sin ella")
+    parser.add_argument("--lote", type=int, default=10000, help="Filas por lote")
+    parser.add_argument("--reconstruir-indices", action="store_true", default=None,
+                        help="Elimina y reconstruye los índices secundarios aunque el archivo sea pequeño")
+    args = parser.parse_args()
+    
+    def mostrar_progreso(estado: Dict):
+        print(f"\r📥 {estado['leidas']:,} leídas | {estado['insertadas']:,} nuevas | "
+              f"{estado['filas_por_segundo']:,.0f} filas/s", end="", flush=True)
+    
+    gestor = GestorBaseDatos(args.db)
+    try:
+        resultado = importar_palabras(
+            gestor, args.archivo, args.lote, args.dificultad, args.categoria,
+            args.reconstruir_indices, mostrar_progreso
+        )
+        print(f"\n✅ Importación terminada: {resultado['insertadas']:,} palabras nuevas de "
+              f"{resultado['leidas']:,} en {resultado['segundos']:.1f}s")
+    finally:
+        gestor.cerrar()
@@ -0,0 +1,118 @@
+# informe_kioscos.py
+import heapq
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
+from pathlib import Path
+from typing import Dict, List, Tuple
+from epocas import inicio_epoca
+from gestor_bd import GestorBaseDatos
+from repositorio import RepositorioJuego
+
+
+def listar_bases(carpeta: str) -> List[str]:
+    """Bases del juego de una carpeta (sin los archivos de épocas anteriores)"""
+    return sorted(
+        str(ruta) for ruta in Path(carpeta).glob("*.db")
+        if not ruta.stem.endswith("_archivo")
+    )
+
+
+def parcial_base(ruta: str, limite: int = 10, dificultad: str = None) -> Dict:
+    """Agregados de una base: su resumen por dificultad y su top del ranking (se ejecuta en otro proceso)"""
+    try:
+        # Solo lectura y sin GestorBaseDatos: el informe no migra ni toca las bases recogidas
+        conn = sqlite3.connect(f"{Path(ruta).resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            resumen = {
+                fila[0]: fila[1:] for fila in conn.execute(
+                    "SELECT dificultad, partidas, victorias, suma_intentos_victorias FROM resumen_estadisticas"
+                )
+            }
+            sql, parametros = GestorBaseDatos.consulta_ranking(limite, dificultad, inicio=inicio_epoca(conn))
+            ranking = conn.execute(sql, parametros).fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        return {"ruta": ruta, "error": str(e)}
+    return {"ruta": ruta, "resumen": resumen, "ranking": ranking}
+
+
+def clave_ranking(fila: Tuple) -> Tuple:
+    """Mismo orden que el ORDER BY del ranking: intentos y luego tiempo, con NULL primero como en SQLite"""
+    return fila[1], fila[2] is not None, fila[2] or 0
+
+
+def combinar(parciales: List[Dict], limite: int = 10) -> Dict:
+    """Suma los resúmenes y mezcla los rankings de varias bases en un único informe"""
+    resumen: Dict[str, Tuple[int, int, int]] = {}
+    rankings = []
+    por_base = {}
+    errores = {}
+    for parcial in parciales:
+        if "error" in parcial:
+            errores[parcial["ruta"]] = parcial["error"]
+            continue
+        
+        # Partidas, victorias y suma de intentos se suman; los porcentajes salen luego del total
+        for dificultad, fila in parcial["resumen"].items():
+            acumulado = resumen.get(dificultad, (0, 0, 0))
+            resumen[dificultad] = tuple(a + b for a, b in zip(acumulado, fila))
+        kiosco = Path(parcial["ruta"]).stem
+        rankings.append([fila + (kiosco,) for fila in parcial["ranking"]])
+        por_base[kiosco] = sum(fila[0] for fila in parcial["resumen"].values())
+    
+    # Cada ranking ya viene ordenado: basta un merge por montículo de los k primeros de cada base
+    return {
+        "bases": len(por_base),
+        "estadisticas": RepositorioJuego.armar_estadisticas(resumen),
+        "ranking": list(islice(heapq.merge(*rankings, key=clave_ranking), limite)),
+        "partidas_por_base": por_base,
+        "errores": errores,
+    }
+
+
+def informe(rutas: List[str], limite: int = 10, dificultad: str = None, procesos: int = None) -> Dict:
+    """Informe combinado de varias bases, una por proceso (procesos=1 lo hace todo en este)"""
+    procesos = procesos or os.cpu_count() or 1
+    argumentos = (rutas, repeat(limite), repeat(dificultad))
+    if procesos == 1 or len(rutas) <= 1:
+        parciales = list(map(parcial_base, *argumentos))
+    else:
+        with ProcessPoolExecutor(max_workers=min(procesos, len(rutas))) as pool:
+            parciales = list(pool.map(parcial_base, *argumentos))
+    return combinar(parciales, limite)
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import time
+    
+    parser = argparse.ArgumentParser(description="Estadísticas y ranking combinados de todas las bases de una carpeta")
+    parser.add_argument("carpeta", help="Carpeta con las bases de los kioscos (*.db)")
+    parser.add_argument("--limite", type=int, default=10, help="Partidas del ranking combinado")
+    parser.add_argument("--dificultad", choices=["FACIL", "MEDIO", "DIFICIL"], default=None,
+                        help="Ranking solo de una dificultad")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos en paralelo (por defecto, uno por núcleo)")
+    parser.add_argument("--json", action="store_true", help="Escribe el informe como JSON")
+    args = parser.parse_args()
+    
+    rutas = listar_bases(args.carpeta)
+    inicio = time.perf_counter()
+    resultado = informe(rutas, args.limite, args.dificultad, args.procesos)
+    duracion = time.perf_counter() - inicio
+    
+    if args.json:
+        print(json.dumps(resultado, ensure_ascii=False, indent=2))
+    else:
+        estadisticas = resultado["estadisticas"]
+        print(f"📊 {resultado['bases']} bases en {duracion:.2f} s: {estadisticas['partidas_totales']:,} partidas, "
+              f"{estadisticas['victorias']:,} victorias, {estadisticas['promedio_intentos']} intentos de media")
+        for dificultad, datos in estadisticas["por_dificultad"].items():
+            print(f"   {dificultad}: {datos['victorias']}/{datos['total']} ({datos['porcentaje']}%)")
+        for posicion, (palabra, intentos, tiempo, fecha, dificultad, kiosco) in enumerate(resultado["ranking"], 1):
+            print(f"🏆 {posicion}. {palabra} ({dificultad}) en {intentos} intentos, {tiempo} s | {fecha} | {kiosco}")
+        for ruta, error in resultado["errores"].items():
+            print(f"⚠️ {ruta}: {error}")
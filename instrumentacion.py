@@ -0,0 +1,307 @@
+# instrumentacion.py
+import atexit
+import math
+import re
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+# Muestras de latencia que se guardan por sentencia para calcular el p95
+CAPACIDAD_MUESTRAS = 1024
+
+# Filas que se piden de cada vez al recorrer un cursor con for
+FILAS_POR_LOTE = 256
+
+_LITERALES = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_LISTAS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ESPACIOS = re.compile(r"\s+")
+_CON_PLAN = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+
+@lru_cache(maxsize=512)
+def huella_sql(sql: str) -> str:
+    """Normaliza una sentencia para agrupar las que solo cambian en literales o en el largo de un IN (...)"""
+    sql = _LITERALES.sub("?", sql)
+    sql = _LISTAS.sub("(?, ...)", sql)
+    return _ESPACIOS.sub(" ", sql).strip()
+
+
+class EstadisticaSentencia:
+    """Acumulados de una huella de sentencia"""
+    
+    __slots__ = ("llamadas", "tiempo_total", "filas", "muestras", "plan")
+    
+    def __init__(self):
+        self.llamadas = 0
+        self.tiempo_total = 0.0
+        self.filas = 0
+        self.muestras: List[List[float]] = []
+        self.plan = None
+
+
+class InstrumentadorSQL:
+    """Cuenta llamadas, latencias y filas por sentencia de todas las conexiones del juego"""
+    
+    def __init__(self, umbral_lento_ms: float = None):
+        self.umbral_lento_ms = umbral_lento_ms
+        self._sentencias: Dict[str, EstadisticaSentencia] = {}
+        self._bloqueo = threading.Lock()
+        self._volcado_registrado = False
+    
+    def registrar(self, sql: str, segundos: float, filas: int = 0) -> Tuple[EstadisticaSentencia, List[float]]:
+        """Anota una ejecución y devuelve su muestra para sumarle después el tiempo de lectura"""
+        huella = huella_sql(sql)
+        muestra = [segundos]
+        with self._bloqueo:
+            estadistica = self._sentencias.get(huella)
+            if estadistica is None:
+                estadistica = self._sentencias[huella] = EstadisticaSentencia()
+            estadistica.llamadas += 1
+            estadistica.tiempo_total += segundos
+            estadistica.filas += filas
+            if len(estadistica.muestras) < CAPACIDAD_MUESTRAS:
+                estadistica.muestras.append(muestra)
+            else:
+                estadistica.muestras[estadistica.llamadas % CAPACIDAD_MUESTRAS] = muestra
+        return estadistica, muestra
+    
+    def sumar_lectura(self, estadistica: EstadisticaSentencia, muestra: List[float], segundos: float, filas: int):
+        """Suma a la última ejecución el tiempo y las filas leídas con fetch"""
+        with self._bloqueo:
+            estadistica.tiempo_total += segundos
+            estadistica.filas += filas
+            muestra[0] += segundos
+    
+    def es_lenta(self, sql: str, segundos: float) -> bool:
+        """Indica si hay que capturar el plan de la sentencia (una vez por huella)"""
+        if self.umbral_lento_ms is None or segundos * 1000 < self.umbral_lento_ms:
+            return False
+        if not sql.lstrip().upper().startswith(_CON_PLAN):
+            return False
+        estadistica = self._sentencias.get(huella_sql(sql))
+        return estadistica is not None and estadistica.plan is None
+    
+    def registrar_plan(self, sql: str, segundos: float, plan: List[str]):
+        """Guarda y muestra el plan de una sentencia lenta"""
+        huella = huella_sql(sql)
+        with self._bloqueo:
+            estadistica = self._sentencias.get(huella)
+            if estadistica is not None:
+                estadistica.plan = plan
+        print(f"🐢 Sentencia lenta ({segundos * 1000:.1f} ms): {huella}")
+        for paso in plan:
+            print(f"   {paso}")
+    
+    def snapshot(self) -> List[Dict]:
+        """Copia de las métricas por sentencia, de mayor a menor tiempo total"""
+        with self._bloqueo:
+            copia = [
+                (huella, e.llamadas, e.tiempo_total, e.filas, sorted(m[0] for m in e.muestras), e.plan)
+                for huella, e in self._sentencias.items()
+            ]
+        
+        resultado = []
+        for huella, llamadas, tiempo_total, filas, muestras, plan in copia:
+            p95 = muestras[min(len(muestras) - 1, math.ceil(len(muestras) * 0.95) - 1)] if muestras else 0.0
+            resultado.append({
+                "sentencia": huella,
+                "llamadas": llamadas,
+                "tiempo_total_ms": round(tiempo_total * 1000, 3),
+                "p95_ms": round(p95 * 1000, 3),
+                "filas": filas,
+                "plan": plan,
+            })
+        resultado.sort(key=lambda fila: fila["tiempo_total_ms"], reverse=True)
+        return resultado
+    
+    def reiniciar(self):
+        """Borra todas las métricas acumuladas"""
+        with self._bloqueo:
+            self._sentencias.clear()
+    
+    def volcar(self, limite: int = 20):
+        """Imprime las sentencias más costosas"""
+        metricas = self.snapshot()
+        if not metricas:
+            return
+        
+        print(f"📊 Métricas SQL ({len(metricas)} sentencias distintas)")
+        print(f"{'llamadas':>9} {'total ms':>10} {'p95 ms':>9} {'filas':>9}  sentencia")
+        for fila in metricas[:limite]:
+            sentencia = fila["sentencia"]
+            if len(sentencia) > 100:
+                sentencia = sentencia[:97] + "..."
+            print(f"{fila['llamadas']:>9} {fila['tiempo_total_ms']:>10.1f} {fila['p95_ms']:>9.2f} "
+                  f"{fila['filas']:>9}  {sentencia}")
+    
+    def activar_volcado_al_salir(self):
+        """Vuelca las métricas al terminar el proceso"""
+        with self._bloqueo:
+            if self._volcado_registrado:
+                return
+            self._volcado_registrado = True
+        atexit.register(self.volcar)
+
+
+# Instrumentador compartido por todas las conexiones del proceso
+instrumentador = InstrumentadorSQL()
+
+
+class CursorInstrumentado(sqlite3.Cursor):
+    """Cursor que mide cada sentencia y las filas que se leen de ella"""
+    
+    _estadistica = None
+    _muestra = None
+    _sql = None
+    _parametros = None
+    # Lo leído iterando se acumula aquí y se anota una sola vez (al agotarse, cerrar o reejecutar)
+    _segundos_pendientes = 0.0
+    _filas_pendientes = 0
+    
+    def _medir(self, sql: str, segundos: float, parametros):
+        filas = self.rowcount if self.rowcount > 0 else 0
+        self._estadistica, self._muestra = instrumentador.registrar(sql, segundos, filas)
+        self._sql, self._parametros = sql, parametros
+        self._revisar_lentitud()
+    
+    def _revisar_lentitud(self):
+        # Con un generador en executemany no se pueden repetir los parámetros
+        if self._parametros is None:
+            return
+        if instrumentador.es_lenta(self._sql, self._muestra[0]):
+            self._capturar_plan(self._sql, self._muestra[0], self._parametros)
+    
+    def _capturar_plan(self, sql: str, segundos: float, parametros):
+        """Ejecuta EXPLAIN QUERY PLAN con los mismos parámetros en un cursor sin instrumentar"""
+        try:
+            filas = sqlite3.Cursor(self.connection).execute("EXPLAIN QUERY PLAN " + sql, parametros).fetchall()
+            instrumentador.registrar_plan(sql, segundos, [fila[-1] for fila in filas])
+        except sqlite3.Error as e:
+            print(f"⚠️ No se pudo obtener el plan de la sentencia: {e}")
+    
+    def _leer(self, segundos: float, filas: int):
+        if self._muestra is None:
+            return
+        instrumentador.sumar_lectura(self._estadistica, self._muestra, segundos, filas)
+        # El coste de muchas consultas está en recorrer las filas, no en el primer paso
+        self._revisar_lentitud()
+    
+    def _volcar_lectura(self):
+        """Anota en el instrumentador las filas recorridas con el iterador desde el último volcado"""
+        if not self._filas_pendientes and not self._segundos_pendientes:
+            return
+        segundos, filas = self._segundos_pendientes, self._filas_pendientes
+        self._segundos_pendientes, self._filas_pendientes = 0.0, 0
+        self._leer(segundos, filas)
+    
+    def execute(self, sql, parametros=()):
+        self._volcar_lectura()
+        inicio = time.perf_counter()
+        try:
+            return super().execute(sql, parametros)
+        finally:
+            self._medir(sql, time.perf_counter() - inicio, parametros)
+    
+    def executemany(self, sql, secuencia):
+        self._volcar_lectura()
+        parametros = secuencia[0] if isinstance(secuencia, (list, tuple)) and secuencia else None
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(sql, secuencia)
+        finally:
+            self._medir(sql, time.perf_counter() - inicio, parametros)
+    
+    def executescript(self, script):
+        self._volcar_lectura()
+        inicio = time.perf_counter()
+        try:
+            return super().executescript(script)
+        finally:
+            self._estadistica = self._muestra = self._sql = self._parametros = None
+            instrumentador.registrar(script, time.perf_counter() - inicio)
+    
+    def fetchone(self):
+        inicio = time.perf_counter()
+        fila = super().fetchone()
+        self._leer(time.perf_counter() - inicio, 0 if fila is None else 1)
+        return fila
+    
+    def fetchmany(self, size=None):
+        inicio = time.perf_counter()
+        filas = super().fetchmany(self.arraysize if size is None else size)
+        self._leer(time.perf_counter() - inicio, len(filas))
+        return filas
+    
+    def fetchall(self):
+        inicio = time.perf_counter()
+        filas = super().fetchall()
+        self._leer(time.perf_counter() - inicio, len(filas))
+        return filas
+    
+    def __iter__(self):
+        # Se lee por lotes: por fila no se llama a ningún método en Python ni se toma el bloqueo
+        leer = super().fetchmany
+        try:
+            while True:
+                inicio = time.perf_counter()
+                filas = leer(FILAS_POR_LOTE)
+                self._segundos_pendientes += time.perf_counter() - inicio
+                self._filas_pendientes += len(filas)
+                if not filas:
+                    return
+                yield from filas
+        finally:
+            # Al agotarse o al cortar el recorrido con break se anota todo de una vez
+            self._volcar_lectura()
+    
+    def __next__(self):
+        # next() directo: se acumula igual y se anota al agotarse, al cerrar o al reejecutar
+        inicio = time.perf_counter()
+        try:
+            fila = super().__next__()
+        except StopIteration:
+            self._segundos_pendientes += time.perf_counter() - inicio
+            self._volcar_lectura()
+            raise
+        self._segundos_pendientes += time.perf_counter() - inicio
+        self._filas_pendientes += 1
+        return fila
+    
+    def close(self):
+        self._volcar_lectura()
+        super().close()
+
+
+class ConexionInstrumentada(sqlite3.Connection):
+    """Conexión cuyos cursores (también los de execute directo) pasan por el instrumentador"""
+    
+    def cursor(self, factory=CursorInstrumentado):
+        return super().cursor(factory)
+    
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+    
+    def executemany(self, sql, secuencia):
+        return self.cursor().executemany(sql, secuencia)
+    
+    def executescript(self, script):
+        return self.cursor().executescript(script)
+    
+    def commit(self):
+        inicio = time.perf_counter()
+        try:
+            super().commit()
+        finally:
+            instrumentador.registrar("COMMIT", time.perf_counter() - inicio)
+    
+    def __exit__(self, tipo, valor, traza):
+        # with conn: confirma (o deshace) desde C, sin pasar por commit(): se mide aquí
+        if not self.in_transaction:
+            return super().__exit__(tipo, valor, traza)
+        inicio = time.perf_counter()
+        try:
+            return super().__exit__(tipo, valor, traza)
+        finally:
+            instrumentador.registrar("COMMIT" if tipo is None else "ROLLBACK", time.perf_counter() - inicio)
@@ -11,6 +11,7 @@ from juego_logica import JuegoLogica
 from panel_juego import PanelJuego
 from panel_estadisticas import PanelEstadisticas
 from panel_configuracion import PanelConfiguracion
+from ventana_copia_seguridad import VentanaCopiaSeguridad
 
 class JuegoPalabrasApp:
     """Clase principal que coordina todas las partes del juego"""
@@ -46,8 +47,13 @@ class JuegoPalabrasApp:
             pass
         
         # Inicializar componentes principales
-        self.gestor_db = GestorBaseDatos()
         self.config = Configuracion()
+        self.gestor_db = GestorBaseDatos(
+            escritura_diferida=self.config.obtener("escritura_diferida", False),
+            perfil_durabilidad=self.config.obtener("perfil_durabilidad", "normal"),
+            depuracion_sql=self.config.obtener("depuracion_sql", False),
+            umbral_sql_lento_ms=self.config.obtener("umbral_sql_lento_ms")
+        )
         self.juego_logica = JuegoLogica(self.gestor_db, self.config)
         
         # Configurar interfaz
@@ -60,9 +66,22 @@ class JuegoPalabrasApp:
         # Configurar cierre de ventana
         self.root.protocol("WM_DELETE_WINDOW", self.salir)
         
+        # Cerrar la base de datos (vaciando la cola de guardado) al destruir la ventana
+        self.root.bind("<Destroy>", self.al_destruir_ventana, add="+")
+        
         # Centrar ventana
         self.centrar_ventana()
     
+    def partida_en_curso(self) -> bool:
+        """Indica si el jugador está a mitad de una partida (para no hacer mantenimiento entonces)"""
+        return self.juego_logica.partida_en_curso()
+    
+    def al_destruir_ventana(self, event):
+        """Libera la conexión cuando se destruye la ventana del juego"""
+        # <Destroy> también llega por cada widget hijo
+        if event.widget is self.root:
+            self.gestor_db.cerrar()
+    
     def centrar_ventana(self):
         """Centra la ventana en la pantalla"""
         self.root.update_idletasks()
@@ -82,6 +101,7 @@ class JuegoPalabrasApp:
                            fg=self.colores["texto_principal"], activebackground=self.colores["acento_principal"])
         menubar.add_cascade(label="Archivo", menu=menu_archivo)
         menu_archivo.add_command(label="Nuevo Juego", command=self.nuevo_juego, accelerator="Ctrl+N")
+        menu_archivo.add_command(label="Copia de Seguridad...", command=self.hacer_copia_seguridad)
         menu_archivo.add_separator()
         menu_archivo.add_command(label="Volver al Menú Principal", command=self.volver_menu_principal)
         menu_archivo.add_command(label="Salir", command=self.salir, accelerator="Ctrl+Q")
@@ -110,6 +130,7 @@ class JuegoPalabrasApp:
         menu_juego.add_separator()
         menu_juego.add_command(label="Ver Ranking", command=self.mostrar_ranking)
         menu_juego.add_command(label="Estadísticas Completas", command=self.mostrar_estadisticas_completas)
+        menu_juego.add_command(label="Historial de Partidas", command=self.mostrar_historial)
         
         # Menú Ayuda
         menu_ayuda = Menu(menubar, tearoff=0, bg=self.colores["fondo_secundario"], 
@@ -203,7 +224,8 @@ class JuegoPalabrasApp:
         stats_container.pack_propagate(False)
         stats_container.config(height=400)
 
-        self.panel_estadisticas = PanelEstadisticas(stats_container, self.gestor_db, self.colores)
+        self.panel_estadisticas = PanelEstadisticas(stats_container, self.gestor_db, self.colores,
+                                                    self.config.obtener("jugador_actual"))
         self.panel_estadisticas.pack(fill=tk.BOTH, expand=True)
         
         # Panel de configuración
@@ -473,10 +495,18 @@ class JuegoPalabrasApp:
         """Muestra el ranking de mejores partidas"""
         self.panel_estadisticas.mostrar_ranking()
     
+    def mostrar_historial(self):
+        """Muestra el historial completo de partidas"""
+        self.panel_estadisticas.mostrar_historial()
+    
+    def hacer_copia_seguridad(self):
+        """Hace una copia de seguridad en caliente mostrando su avance"""
+        VentanaCopiaSeguridad(self.root, self.gestor_db, conservar=self.config.obtener("copias_conservar", 7))
+    
     def mostrar_estadisticas_completas(self):
         """Muestra estadísticas completas en una ventana aparte"""
         try:
-            stats = self.gestor_db.obtener_estadisticas()
+            stats = self.gestor_db.obtener_estadisticas(self.config.obtener("jugador_actual"))
             
             # Crear texto detallado
             texto_estadisticas = f"""
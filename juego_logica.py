@@ -1,13 +1,13 @@
 # juego_logica.py
 from datetime import datetime
 from typing import Dict, List, Optional
-from gestor_bd import GestorBaseDatos
+from repositorio import RepositorioJuego
 from configuracion import Configuracion
 
 class JuegoLogica:
     """Clase que maneja la lógica principal del juego"""
     
-    def __init__(self, gestor_db: GestorBaseDatos, config: Configuracion):
+    def __init__(self, gestor_db: RepositorioJuego, config: Configuracion):
         self.gestor_db = gestor_db
         self.config = config
         self.reiniciar_juego()
@@ -116,7 +116,8 @@ class JuegoLogica:
             self.intentos,
             True,
             self.tiempo_final,
-            self.config.obtener("dificultad")
+            self.config.obtener("dificultad"),
+            self.config.obtener("jugador_actual")
         )
         
         return {
@@ -139,7 +140,8 @@ class JuegoLogica:
             self.intentos,
             False,
             tiempo,
-            self.config.obtener("dificultad")
+            self.config.obtener("dificultad"),
+            self.config.obtener("jugador_actual")
         )
         
         return {
@@ -174,13 +176,9 @@ class JuegoLogica:
         # Pista después de 1 intento: categoría
         if self.intentos >= 1:
             # Obtener categoría de la base de datos
-            self.gestor_db.cursor.execute(
-                "SELECT categoria FROM palabras WHERE palabra = ?",
-                (self.palabra_secreta,)
-            )
-            resultado = self.gestor_db.cursor.fetchone()
-            if resultado:
-                pistas.append(f"Categoría: {resultado[0]}")
+            categoria = self.gestor_db.obtener_categoria(self.palabra_secreta)
+            if categoria:
+                pistas.append(f"Categoría: {categoria}")
         
         # Pista después de 2 intentos: primera letra
         if self.intentos >= 2:
@@ -207,6 +205,11 @@ class JuegoLogica:
             return (datetime.now() - self.inicio_tiempo).seconds
         return self.tiempo_final if self.victoria else (datetime.now() - self.inicio_tiempo).seconds
     
+    def partida_en_curso(self) -> bool:
+        """Hay una partida empezada (con algún intento) y sin terminar"""
+        return not self.game_over and bool(self.letras_adivinadas or self.letras_incorrectas
+                                           or self.palabras_intentadas)
+    
     def obtener_estado_actual(self) -> Dict:
         """Obtiene el estado actual del juego"""
         return {
@@ -0,0 +1,287 @@
+# mantenimiento.py
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+from copias_seguridad import CopiaSeguridad
+from retencion import RetencionPartidas
+
+# Cada cuánto toca cada tarea (segundos desde la última vez que terminó)
+PERIODOS_MANTENIMIENTO = {
+    "checkpoint": 5 * 60,
+    "vacuum_incremental": 30 * 60,
+    "optimize": 6 * 3600,
+    "quick_check": 24 * 3600,
+}
+
+# Filas que mira ANALYZE por índice cuando PRAGMA optimize decide analizar una tabla
+LIMITE_ANALISIS = 400
+
+# Periodo de la copia de seguridad programada (solo si se pasa en 'periodos')
+PERIODO_COPIA_SEGURIDAD = 24 * 3600
+
+# Periodo de la retención de partidas antiguas (solo si se pasa en 'periodos')
+PERIODO_RETENCION = 24 * 3600
+
+
+class MantenimientoInactivo:
+    """Mantenimiento de la base en porciones pequeñas, en los ratos libres del bucle de Tk"""
+    
+    def __init__(self, root, gestor_db, partida_en_curso: Callable[[], bool] = None,
+                 intervalo_ms: int = 5000, presupuesto_ms: float = 20, reintento_ms: int = 200,
+                 periodos: Dict[str, int] = None, copias_conservar: int = 7,
+                 retencion_dias: int = 0):
+        self.root = root
+        self.gestor_db = gestor_db
+        self.conexiones = gestor_db.conexiones
+        self.partida_en_curso = partida_en_curso or (lambda: False)
+        self.intervalo_ms = intervalo_ms
+        self.presupuesto_ms = presupuesto_ms
+        self.reintento_ms = reintento_ms
+        self.periodos = dict(PERIODOS_MANTENIMIENTO, **(periodos or {}))
+        self.copias_conservar = copias_conservar
+        self.retencion_dias = retencion_dias
+        
+        # Páginas por porción de vacuum: se ajustan para caber en el presupuesto
+        self.paginas_vacuum = 64
+        self.ultima_porcion: Optional[Tuple[str, float]] = None
+        self._hilo_check = None
+        self._resultado_check = None
+        self._copia = None
+        self._retencion = None
+        self._programada = None
+        self._detenido = False
+        
+        self._tareas = {
+            "checkpoint": self.checkpoint,
+            "vacuum_incremental": self.vacuum_incremental,
+            "optimize": self.optimize,
+            "quick_check": self.quick_check,
+            "copia_seguridad": self.copia_seguridad,
+            "retencion": self.retencion,
+        }
+    
+    def iniciar(self):
+        """Empieza a programar porciones (no hace nada con bases en memoria)"""
+        if self.conexiones.en_memoria or self._programada:
+            return
+        self._detenido = False
+        self._programar(self.intervalo_ms)
+    
+    def detener(self):
+        """Cancela la porción programada, la copia y la retención en marcha (llamar antes de cerrar el gestor)"""
+        self._detenido = True
+        if self._copia and self._copia.is_alive():
+            self._copia.cancelar()
+            self._copia.join()
+        if self._retencion:
+            # Se reanuda en la siguiente: lo ya plegado queda anotado en la tabla retenciones
+            self._retencion.detener()
+        if self._programada:
+            try:
+                self.root.after_cancel(self._programada)
+            except Exception:
+                pass
+            self._programada = None
+    
+    def _programar(self, espera_ms: int):
+        # after espera el intervalo y after_idle espera además a que Tk no tenga eventos pendientes
+        def cuando_libre():
+            self._programada = self.root.after_idle(self.ejecutar_porcion)
+        self._programada = self.root.after(espera_ms, cuando_libre)
+    
+    def tarea_pendiente(self) -> Optional[str]:
+        """La tarea que más tiempo lleva vencida (None si no toca ninguna)"""
+        ultimas = self.ultimas_ejecuciones()
+        ahora = time.time()
+        vencidas = [
+            (ahora - ultimas.get(tarea, 0) - periodo, tarea)
+            for tarea, periodo in self.periodos.items()
+            if ahora - ultimas.get(tarea, 0) >= periodo
+        ]
+        return max(vencidas)[1] if vencidas else None
+    
+    def ultimas_ejecuciones(self) -> Dict[str, float]:
+        """Momento (segundos Unix) en que terminó cada tarea por última vez"""
+        return {
+            tarea: ultima for tarea, ultima in
+            self.gestor_db.conn.execute("SELECT tarea, ultima FROM mantenimiento")
+        }
+    
+    def ejecutar_porcion(self):
+        """Ejecuta una porción de la tarea vencida si no hay partida en curso y reprograma la siguiente"""
+        self._programada = None
+        if self._detenido:
+            return
+        
+        tarea = None
+        terminada = True
+        try:
+            tarea = None if self.partida_en_curso() else self.tarea_pendiente()
+            if tarea is None:
+                return
+            terminada = self.ejecutar_tarea(tarea)
+        except Exception as e:
+            print(f"⚠️ Error en el mantenimiento de la base de datos: {e}")
+        finally:
+            # Solo el vacuum avanza por porciones seguidas; el resto espera al siguiente intervalo
+            if not self._detenido:
+                seguir = tarea == "vacuum_incremental" and not terminada
+                self._programar(self.reintento_ms if seguir else self.intervalo_ms)
+    
+    def ejecutar_tarea(self, tarea: str) -> bool:
+        """Una porción acotada por el presupuesto; True si la tarea quedó terminada"""
+        conn = self.gestor_db.conn
+        inicio = time.perf_counter()
+        limite = inicio + self.presupuesto_ms / 1000
+        
+        # Sin esperas por bloqueos y cortando la sentencia si se pasa del presupuesto
+        conn.execute("PRAGMA busy_timeout = 0")
+        conn.set_progress_handler(lambda: time.perf_counter() > limite, 1000)
+        try:
+            terminada, resultado = self._tareas[tarea](conn)
+        except sqlite3.OperationalError as e:
+            mensaje = str(e).lower()
+            if "interrupted" not in mensaje and "locked" not in mensaje and "busy" not in mensaje:
+                raise
+            # Se reintenta en la siguiente porción (el vacuum, con menos páginas)
+            if tarea == "vacuum_incremental":
+                self.paginas_vacuum = max(1, self.paginas_vacuum // 2)
+            terminada, resultado = False, None
+        finally:
+            conn.set_progress_handler(None, 0)
+            conn.execute(f"PRAGMA busy_timeout = {int(self.conexiones.timeout_ms)}")
+        
+        self.ultima_porcion = (tarea, (time.perf_counter() - inicio) * 1000)
+        if terminada:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO mantenimiento (tarea, ultima, resultado) VALUES (?, ?, ?)",
+                    (tarea, int(time.time()), resultado)
+                )
+        return terminada
+    
+    def checkpoint(self, conn: sqlite3.Connection) -> Tuple[bool, str]:
+        """Pasa el WAL a la base sin esperar a lectores ni escritores (PASSIVE)"""
+        if self._modo_diario(conn) != "wal":
+            return True, "sin WAL"
+        ocupada, marcos, copiados = conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+        return True, f"{copiados}/{marcos} páginas"
+    
+    def vacuum_incremental(self, conn: sqlite3.Connection) -> Tuple[bool, str]:
+        """Libera unas pocas páginas; la tarea sigue hasta vaciar la lista de páginas libres"""
+        if conn.execute("PRAGMA main.auto_vacuum").fetchone()[0] != 2:
+            return True, "auto_vacuum desactivado"
+        if conn.execute("PRAGMA main.freelist_count").fetchone()[0] == 0:
+            return True, "sin páginas libres"
+        
+        # Con execute el pragma solo libera una página (ver epocas.ArchivadorEpocas.compactar)
+        inicio = time.perf_counter()
+        conn.executescript(f"PRAGMA main.incremental_vacuum({self.paginas_vacuum})")
+        duracion_ms = (time.perf_counter() - inicio) * 1000
+        if duracion_ms > self.presupuesto_ms:
+            self.paginas_vacuum = max(1, self.paginas_vacuum // 2)
+        elif duracion_ms < self.presupuesto_ms / 4:
+            self.paginas_vacuum = min(self.paginas_vacuum * 2, 1024)
+        
+        libres = conn.execute("PRAGMA main.freelist_count").fetchone()[0]
+        return libres == 0, f"{libres} páginas libres"
+    
+    def optimize(self, conn: sqlite3.Connection) -> Tuple[bool, str]:
+        """PRAGMA optimize con ANALYZE aproximado para que quepa en el presupuesto"""
+        conn.execute(f"PRAGMA analysis_limit = {LIMITE_ANALISIS}")
+        conn.executescript("PRAGMA optimize")
+        return True, "ok"
+    
+    def quick_check(self, conn: sqlite3.Connection) -> Tuple[bool, str]:
+        """Lanza quick_check en un hilo con conexión de lectura y recoge el resultado en otra porción"""
+        # Recorre toda la base: no cabe en una porción, pero un lector no bloquea al juego
+        if self._hilo_check is None:
+            self._resultado_check = None
+            self._hilo_check = threading.Thread(target=self._comprobar_integridad,
+                                                name="quick-check", daemon=True)
+            self._hilo_check.start()
+            return False, None
+        if self._hilo_check.is_alive():
+            return False, None
+        
+        self._hilo_check = None
+        resultado = self._resultado_check
+        if resultado != "ok":
+            print(f"❌ quick_check de la base de datos: {resultado}")
+        return True, resultado
+    
+    def copia_seguridad(self, conn: sqlite3.Connection) -> Tuple[bool, str]:
+        """Lanza la copia en caliente en su hilo y la da por terminada cuando el hilo acaba"""
+        if self._copia is None:
+            self._copia = CopiaSeguridad(self.conexiones, conservar=self.copias_conservar)
+            self._copia.start()
+            return False, None
+        if self._copia.is_alive():
+            return False, None
+        
+        copia, self._copia = self._copia, None
+        # Un error también cuenta como ejecución: se reintenta en el siguiente periodo, no en bucle
+        return True, f"error: {copia.error}" if copia.error else copia.ruta
+    
+    def retencion(self, conn: sqlite3.Connection) -> Tuple[bool, str]:
+        """Lanza la retención de partidas antiguas en su hilo y la da por terminada cuando acaba"""
+        if self.retencion_dias <= 0:
+            return True, "desactivada"
+        if self._retencion is None:
+            self._retencion = RetencionPartidas(self.conexiones, self.retencion_dias)
+            self._retencion.start()
+            return False, None
+        if self._retencion.is_alive():
+            return False, None
+        
+        retencion, self._retencion = self._retencion, None
+        if retencion.ultimo_error:
+            return True, f"error: {retencion.ultimo_error}"
+        return True, f"{retencion.retenidas} partidas plegadas"
+    
+    def _comprobar_integridad(self):
+        try:
+            lector = self.conexiones.conectar(solo_lectura=True)
+            try:
+                filas = lector.execute("PRAGMA quick_check").fetchall()
+            finally:
+                lector.close()
+            self._resultado_check = "; ".join(fila[0] for fila in filas)
+        except sqlite3.Error as e:
+            self._resultado_check = f"error: {e}"
+    
+    @staticmethod
+    def _modo_diario(conn: sqlite3.Connection) -> str:
+        return conn.execute("PRAGMA journal_mode").fetchone()[0].lower()
+
+
+if __name__ == "__main__":
+    import argparse
+    from gestor_bd import GestorBaseDatos
+    
+    parser = argparse.ArgumentParser(description="Ejecuta ahora todo el mantenimiento, porción a porción")
+    parser.add_argument("--db", default="juego_palabras.db", help="Ruta de la base de datos")
+    parser.add_argument("--presupuesto-ms", type=float, default=20, help="Tiempo máximo de cada porción")
+    args = parser.parse_args()
+    
+    gestor = GestorBaseDatos(args.db)
+    try:
+        # Sin Tk: las porciones se ejecutan seguidas y se mide la más larga
+        mantenimiento = MantenimientoInactivo(None, gestor, presupuesto_ms=args.presupuesto_ms)
+        for tarea in PERIODOS_MANTENIMIENTO:
+            porciones, peor_ms = 0, 0.0
+            while True:
+                terminada = mantenimiento.ejecutar_tarea(tarea)
+                porciones += 1
+                peor_ms = max(peor_ms, mantenimiento.ultima_porcion[1])
+                if terminada:
+                    break
+                if tarea == "quick_check":
+                    time.sleep(0.05)
+            resultado = gestor.conn.execute(
+                "SELECT resultado FROM mantenimiento WHERE tarea = ?", (tarea,)
+            ).fetchone()[0]
+            print(f"🧹 {tarea}: {resultado} ({porciones} porciones, la más larga {peor_ms:.1f} ms)")
+    finally:
+        gestor.cerrar()
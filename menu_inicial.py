@@ -1,11 +1,12 @@
 # menu_inicial.py
 import tkinter as tk
-from tkinter import messagebox, PhotoImage
+from tkinter import ttk, messagebox, simpledialog, PhotoImage
 import sys
 import os
 from juego_app import JuegoPalabrasApp
 from gestor_bd import GestorBaseDatos
 from configuracion import Configuracion
+from mantenimiento import PERIODO_COPIA_SEGURIDAD, PERIODO_RETENCION, MantenimientoInactivo
 
 class MenuInicial:
     """Clase que maneja el menú inicial del juego"""
@@ -21,10 +22,16 @@ class MenuInicial:
         
         # Cargar configuración y base de datos
         self.config = Configuracion()
-        self.gestor_db = GestorBaseDatos()
+        self.gestor_db = GestorBaseDatos(
+            perfil_durabilidad=self.config.obtener("perfil_durabilidad", "normal"),
+            depuracion_sql=self.config.obtener("depuracion_sql", False),
+            umbral_sql_lento_ms=self.config.obtener("umbral_sql_lento_ms")
+        )
         
-        # Cargar estadísticas iniciales
-        self.estadisticas = self.gestor_db.obtener_estadisticas()
+        # Cargar estadísticas iniciales del jugador activo
+        self.jugador_id = self.config.obtener("jugador_actual")
+        self.estadisticas = self.gestor_db.obtener_estadisticas(self.jugador_id)
+        self.rachas = self.gestor_db.obtener_rachas(self.jugador_id)
         
         # Intentar cargar íconos
         self.iconos = {}
@@ -38,6 +45,38 @@ class MenuInicial:
         
         # Configurar cierre
         self.root.protocol("WM_DELETE_WINDOW", self.salir)
+        self.root.bind("<Destroy>", self.al_destruir_ventana, add="+")
+        
+        # Mantenimiento de la base en los ratos libres, nunca a mitad de partida
+        self.juego_app = None
+        self.mantenimiento = None
+        if self.config.obtener("mantenimiento_automatico", True):
+            periodos = {}
+            if self.config.obtener("copias_automaticas", False):
+                periodos["copia_seguridad"] = PERIODO_COPIA_SEGURIDAD
+            retencion_dias = self.config.obtener("retencion_dias", 0)
+            if retencion_dias > 0:
+                periodos["retencion"] = PERIODO_RETENCION
+            self.mantenimiento = MantenimientoInactivo(
+                self.root, self.gestor_db, self.partida_en_curso, periodos=periodos,
+                copias_conservar=self.config.obtener("copias_conservar", 7),
+                retencion_dias=retencion_dias
+            )
+            self.mantenimiento.iniciar()
+    
+    def partida_en_curso(self) -> bool:
+        """Indica si la ventana de juego está abierta con una partida a medias"""
+        if self.juego_app is None or not self.juego_app.root.winfo_exists():
+            return False
+        return self.juego_app.partida_en_curso()
+    
+    def al_destruir_ventana(self, event):
+        """Libera la conexión cuando se destruye la ventana principal"""
+        # <Destroy> también llega por cada widget hijo
+        if event.widget is self.root:
+            if self.mantenimiento:
+                self.mantenimiento.detener()
+            self.gestor_db.cerrar()
     
     def cargar_iconos(self):
         """Intenta cargar íconos para los botones"""
@@ -122,19 +161,27 @@ class MenuInicial:
             pady=10
         ).pack()
         
+        # Selector de perfil
+        self.crear_selector_jugador(stats_frame)
+        
         # Grid para estadísticas
         stats_grid = tk.Frame(stats_frame, bg="#16213e")
         stats_grid.pack(pady=(0, 15), padx=20)
         
         # Estadísticas en 2 columnas
         stats_data = [
-            ("🎮 Partidas totales:", f"{self.estadisticas['partidas_totales']}", "#4cc9f0"),
-            ("✅ Victorias:", f"{self.estadisticas['victorias']}", "#4ade80"),
-            ("❌ Derrotas:", f"{self.estadisticas['derrotas']}", "#f87171"),
-            ("🎯 Promedio intentos:", f"{self.estadisticas['promedio_intentos']}", "#fbbf24"),
+            ("partidas_totales", "🎮 Partidas totales:", "#4cc9f0"),
+            ("victorias", "✅ Victorias:", "#4ade80"),
+            ("derrotas", "❌ Derrotas:", "#f87171"),
+            ("promedio_intentos", "🎯 Promedio intentos:", "#fbbf24"),
+            ("racha_actual", "🔥 Racha actual:", "#ec4899"),
+            ("mejor_racha", "🏆 Mejor racha:", "#8b5cf6"),
         ]
         
-        for i, (label, value, color) in enumerate(stats_data):
+        valores = self.obtener_valores_estadisticas()
+        self.labels_estadisticas = {}
+        
+        for i, (clave, label, color) in enumerate(stats_data):
             row = i // 2
             col = i % 2
             
@@ -149,13 +196,15 @@ class MenuInicial:
                 bg="#16213e"
             ).pack(side=tk.LEFT)
             
-            tk.Label(
+            label_valor = tk.Label(
                 frame,
-                text=value,
+                text=valores[clave],
                 font=("Arial", 12, "bold"),
                 fg=color,
                 bg="#16213e"
-            ).pack(side=tk.LEFT, padx=(10, 0))
+            )
+            label_valor.pack(side=tk.LEFT, padx=(10, 0))
+            self.labels_estadisticas[clave] = label_valor
         
         # Dificultad actual
         dif_frame = tk.Frame(stats_frame, bg="#16213e")
@@ -180,6 +229,82 @@ class MenuInicial:
             bg="#16213e"
         ).pack(side=tk.LEFT, padx=(10, 0))
     
+    def obtener_valores_estadisticas(self):
+        """Textos de las estadísticas rápidas del jugador activo"""
+        return {
+            "partidas_totales": f"{self.estadisticas['partidas_totales']}",
+            "victorias": f"{self.estadisticas['victorias']}",
+            "derrotas": f"{self.estadisticas['derrotas']}",
+            "promedio_intentos": f"{self.estadisticas['promedio_intentos']}",
+            "racha_actual": f"{self.rachas['actual']}",
+            "mejor_racha": f"{self.rachas['mejor']}",
+        }
+    
+    def crear_selector_jugador(self, parent):
+        """Crea el selector de perfil de jugador"""
+        perfil_frame = tk.Frame(parent, bg="#16213e")
+        perfil_frame.pack(pady=(0, 5))
+        
+        tk.Label(
+            perfil_frame,
+            text="👤 Jugador:",
+            font=("Arial", 11),
+            fg="#a5b4cb",
+            bg="#16213e"
+        ).pack(side=tk.LEFT)
+        
+        self.var_jugador = tk.StringVar()
+        self.combo_jugador = ttk.Combobox(
+            perfil_frame,
+            textvariable=self.var_jugador,
+            state="readonly",
+            width=22,
+            font=("Arial", 11)
+        )
+        self.combo_jugador.pack(side=tk.LEFT, padx=(10, 0))
+        self.combo_jugador.bind("<<ComboboxSelected>>", self.cambiar_jugador)
+        
+        tk.Button(
+            perfil_frame,
+            text="➕ NUEVO",
+            font=("Arial", 9, "bold"),
+            bg="#3b82f6",
+            fg="white",
+            command=self.crear_jugador,
+            cursor="hand2"
+        ).pack(side=tk.LEFT, padx=(10, 0))
+        
+        self.cargar_jugadores()
+    
+    def cargar_jugadores(self):
+        """Rellena el selector con los perfiles y marca el activo"""
+        self.jugadores = [(None, "👥 INVITADO")] + self.gestor_db.obtener_jugadores()
+        self.combo_jugador["values"] = [nombre for _, nombre in self.jugadores]
+        
+        nombres = dict(self.jugadores)
+        self.var_jugador.set(nombres.get(self.jugador_id, "👥 INVITADO"))
+    
+    def cambiar_jugador(self, event=None):
+        """Activa el perfil elegido en el selector"""
+        indice = self.combo_jugador.current()
+        if indice < 0:
+            return
+        
+        self.jugador_id = self.jugadores[indice][0]
+        self.config.establecer("jugador_actual", self.jugador_id)
+        self.actualizar_estadisticas()
+    
+    def crear_jugador(self):
+        """Pide un nombre, crea el perfil y lo activa"""
+        nombre = simpledialog.askstring("➕ Nuevo Jugador", "Nombre del jugador:", parent=self.root)
+        if not nombre or not nombre.strip():
+            return
+        
+        self.jugador_id = self.gestor_db.crear_jugador(nombre)
+        self.config.establecer("jugador_actual", self.jugador_id)
+        self.cargar_jugadores()
+        self.actualizar_estadisticas()
+    
     def crear_panel_botones(self, parent):
         """Crea el panel con los botones principales"""
         buttons_frame = tk.Frame(parent, bg="#1a1a2e")
@@ -282,9 +407,11 @@ class MenuInicial:
         
         # Configurar juego
         juego_app = JuegoPalabrasApp(juego_window)
+        self.juego_app = juego_app
         
         # Configurar qué pasa cuando se cierra el juego
         def on_juego_close():
+            self.juego_app = None
             juego_window.destroy()
             self.actualizar_estadisticas()
             self.root.deiconify()  # Mostrar menú principal nuevamente
@@ -691,7 +818,13 @@ class MenuInicial:
     
     def actualizar_estadisticas(self):
         """Actualiza las estadísticas desde la base de datos"""
-        self.estadisticas = self.gestor_db.obtener_estadisticas()
+        self.estadisticas = self.gestor_db.obtener_estadisticas(self.jugador_id)
+        self.rachas = self.gestor_db.obtener_rachas(self.jugador_id)
+        
+        # Refrescar el panel de estadísticas rápidas si ya está creado
+        if hasattr(self, "labels_estadisticas"):
+            for clave, valor in self.obtener_valores_estadisticas().items():
+                self.labels_estadisticas[clave].config(text=valor)
     
     def salir(self):
         """Sale del juego con confirmación"""
@@ -705,7 +838,9 @@ class MenuInicial:
             # Guardar configuración
             self.config.guardar_configuracion()
             
-            # Cerrar base de datos
+            # Cerrar base de datos (parando antes el mantenimiento)
+            if self.mantenimiento:
+                self.mantenimiento.detener()
             self.gestor_db.cerrar()
             
             # Cerrar aplicación
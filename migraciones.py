@@ -0,0 +1,1175 @@
+# migraciones.py
+import sqlite3
+import uuid
+from collections import deque
+from typing import Callable, List, Tuple
+from epocas import inicio_epoca, primer_id_vigente
+from repositorio import CATEGORIA_SIN_DICCIONARIO, CODIGOS_DIFICULTAD
+
+# Cada migración es (versión, descripción, función que recibe el cursor).
+# Las funciones deben ser idempotentes: si una migración se interrumpe a medias
+# se vuelve a ejecutar completa en el siguiente arranque.
+
+
+def _m001_indices_ranking(cursor: sqlite3.Cursor):
+    """Índices cubrientes para obtener_ranking (con y sin dificultad)"""
+    # Ranking filtrado: WHERE victoria = 1 AND dificultad = ? ORDER BY intentos, tiempo_segundos
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_estadisticas_ranking_dificultad
+        ON estadisticas (victoria, dificultad, intentos, tiempo_segundos, palabra, fecha)
+    ''')
+    
+    # Ranking global: WHERE victoria = 1 ORDER BY intentos, tiempo_segundos
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_estadisticas_ranking
+        ON estadisticas (victoria, intentos, tiempo_segundos, dificultad, palabra, fecha)
+    ''')
+
+
+def _m002_indice_palabras_dificultad(cursor: sqlite3.Cursor):
+    """Índice de palabras por dificultad"""
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_palabras_dificultad
+        ON palabras (dificultad)
+    ''')
+
+
+def _m003_contador_cambios_palabras(cursor: sqlite3.Cursor):
+    """Contador de versión de palabras mantenido por triggers"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS contador_cambios (
+            tabla TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute("INSERT OR IGNORE INTO contador_cambios (tabla) VALUES ('palabras')")
+    
+    for evento in ("INSERT", "UPDATE", "DELETE"):
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_palabras_version_{evento.lower()}
+            AFTER {evento} ON palabras
+            BEGIN
+                UPDATE contador_cambios SET version = version + 1 WHERE tabla = 'palabras';
+            END
+        ''')
+
+
+def _m004_indices_historial(cursor: sqlite3.Cursor):
+    """Índices para paginar el historial por id con filtros de dificultad y resultado"""
+    # El rowid va implícito al final de cada índice, así que sirven para ORDER BY id DESC
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_estadisticas_dificultad
+        ON estadisticas (dificultad)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_estadisticas_victoria
+        ON estadisticas (victoria)
+    ''')
+
+
+def sql_nombre_dificultad(columna: str) -> str:
+    """Expresión SQL que traduce un código de dificultad a su nombre"""
+    casos = " ".join(f"WHEN {codigo} THEN '{nombre}'" for nombre, codigo in CODIGOS_DIFICULTAD.items())
+    return f"CASE {columna} {casos} ELSE '?' END"
+
+
+def sql_codigo_dificultad(columna: str) -> str:
+    """Expresión SQL que traduce un nombre de dificultad a su código (0 si es desconocida)"""
+    casos = " ".join(f"WHEN '{nombre}' THEN {codigo}" for nombre, codigo in CODIGOS_DIFICULTAD.items())
+    return f"CASE {columna} {casos} ELSE 0 END"
+
+
+def _columnas(cursor: sqlite3.Cursor, tabla: str) -> set:
+    """Nombres de las columnas actuales de una tabla"""
+    return {fila[1] for fila in cursor.execute(f"PRAGMA table_info({tabla})").fetchall()}
+
+
+def _existe_tabla(cursor: sqlite3.Cursor, tabla: str) -> bool:
+    """Indica si la tabla existe (los recálculos se llaman también desde migraciones antiguas)"""
+    return cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (tabla,)
+    ).fetchone() is not None
+
+
+def ambitos_racha(dificultad: str, jugador_id: int = None) -> Tuple[str, ...]:
+    """Claves de la tabla rachas que actualiza una partida"""
+    if jugador_id is None:
+        return ("GLOBAL", dificultad)
+    return ("GLOBAL", dificultad, f"J{jugador_id}", f"J{jugador_id}:{dificultad}")
+
+
+# Tramo de partidas para las rachas: (victorias del principio, racha al final, mejor racha, todo victorias)
+TRAMO_VACIO = (0, 0, 0, True)
+
+
+def tramo_partida(victoria: int) -> Tuple[int, int, int, bool]:
+    """Tramo de una sola partida"""
+    return (1, 1, 1, True) if victoria == 1 else (0, 0, 0, False)
+
+
+def componer_tramos(antes: Tuple[int, int, int, bool], despues: Tuple[int, int, int, bool]) -> Tuple[int, int, int, bool]:
+    """Une dos tramos consecutivos; la racha que cruza la unión también cuenta para la mejor"""
+    inicial_a, actual_a, mejor_a, completo_a = antes
+    inicial_b, actual_b, mejor_b, completo_b = despues
+    return (
+        inicial_a + inicial_b if completo_a else inicial_a,
+        actual_a + actual_b if completo_b else actual_b,
+        max(mejor_a, mejor_b, actual_a + inicial_b),
+        bool(completo_a and completo_b),
+    )
+
+
+def recalcular_rachas(cursor: sqlite3.Cursor):
+    """Recalcula las rachas actuales y máximas con un único recorrido ordenado por id"""
+    # Las migraciones antiguas llaman aquí antes de que exista jugador_id
+    columna_jugador = "jugador_id" if "jugador_id" in _columnas(cursor, "estadisticas") else "NULL"
+    conn = cursor.connection
+    
+    # Tramos de las partidas ya retenidas (ver retencion.py), cada uno en el sitio de sus ids
+    retenidos = deque()
+    if _existe_tabla(cursor, "retenido_rachas"):
+        epocas_retenidas = conn.execute('''
+            SELECT epoca_inicio, MAX(plegado_hasta) FROM retenciones
+            WHERE epoca_inicio >= ?
+            GROUP BY epoca_inicio
+            ORDER BY epoca_inicio
+        ''', (inicio_epoca(conn),)).fetchall()
+        for epoca_inicio, plegado_hasta in epocas_retenidas:
+            tramos = conn.execute(
+                "SELECT ambito, inicial, actual, mejor, completo FROM retenido_rachas WHERE epoca_inicio = ?",
+                (epoca_inicio,)
+            ).fetchall()
+            retenidos.append((plegado_hasta, {fila[0]: fila[1:] for fila in tramos}))
+    
+    # Solo cuenta la época actual (las anteriores se archivan al resetear)
+    rachas = {}
+    
+    def sumar_retenidos(antes_de_id: int = None):
+        while retenidos and (antes_de_id is None or retenidos[0][0] < antes_de_id):
+            for ambito, tramo in retenidos.popleft()[1].items():
+                rachas[ambito] = componer_tramos(rachas.get(ambito, TRAMO_VACIO), tramo)
+    
+    filas = conn.execute(
+        f"SELECT id, victoria, dificultad, {columna_jugador} FROM estadisticas WHERE id >= ? ORDER BY id",
+        (primer_id_vigente(conn),)
+    )
+    for id_partida, victoria, dificultad, jugador_id in filas:
+        sumar_retenidos(id_partida)
+        for ambito in ambitos_racha(dificultad, jugador_id):
+            rachas[ambito] = componer_tramos(rachas.get(ambito, TRAMO_VACIO), tramo_partida(victoria))
+    sumar_retenidos()
+    
+    cursor.execute("DELETE FROM rachas")
+    cursor.executemany(
+        "INSERT INTO rachas (ambito, actual, mejor) VALUES (?, ?, ?)",
+        [(ambito, actual, mejor) for ambito, (_, actual, mejor, _) in rachas.items()]
+    )
+
+
+def _m005_rachas(cursor: sqlite3.Cursor):
+    """Rachas de victorias (global y por dificultad) mantenidas al insertar"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS rachas (
+            ambito TEXT PRIMARY KEY,
+            actual INTEGER NOT NULL DEFAULT 0,
+            mejor INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    
+    # En el UPDATE las expresiones ven los valores anteriores de la fila
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_rachas_insert
+        AFTER INSERT ON estadisticas
+        BEGIN
+            INSERT OR IGNORE INTO rachas (ambito) VALUES ('GLOBAL'), (NEW.dificultad);
+            UPDATE rachas SET
+                actual = CASE WHEN NEW.victoria = 1 THEN actual + 1 ELSE 0 END,
+                mejor = MAX(mejor, CASE WHEN NEW.victoria = 1 THEN actual + 1 ELSE 0 END)
+            WHERE ambito IN ('GLOBAL', NEW.dificultad);
+        END
+    ''')
+    
+    # Historiales existentes
+    recalcular_rachas(cursor)
+
+
+def _m006_jugadores(cursor: sqlite3.Cursor):
+    """Perfiles de jugador con estadísticas, rachas e índices particionados por jugador"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS jugadores (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre TEXT UNIQUE NOT NULL,
+            creado TEXT NOT NULL
+        )
+    ''')
+    
+    # NULL = partida anónima (invitado)
+    if "jugador_id" not in _columnas(cursor, "estadisticas"):
+        cursor.execute("ALTER TABLE estadisticas ADD COLUMN jugador_id INTEGER REFERENCES jugadores (id)")
+    
+    # Ranking por jugador (con y sin dificultad) e historial por jugador
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_estadisticas_jugador_ranking_dificultad
+        ON estadisticas (jugador_id, victoria, dificultad, intentos, tiempo_segundos, palabra, fecha)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_estadisticas_jugador_ranking
+        ON estadisticas (jugador_id, victoria, intentos, tiempo_segundos, dificultad, palabra, fecha)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_estadisticas_jugador
+        ON estadisticas (jugador_id)
+    ''')
+    
+    # Resumen por jugador y dificultad, igual que resumen_estadisticas
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS resumen_jugadores (
+            jugador_id INTEGER NOT NULL,
+            dificultad TEXT NOT NULL,
+            partidas INTEGER NOT NULL DEFAULT 0,
+            victorias INTEGER NOT NULL DEFAULT 0,
+            suma_intentos_victorias INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (jugador_id, dificultad)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_resumen_jugador_insert
+        AFTER INSERT ON estadisticas
+        WHEN NEW.jugador_id IS NOT NULL
+        BEGIN
+            INSERT OR IGNORE INTO resumen_jugadores (jugador_id, dificultad)
+            VALUES (NEW.jugador_id, NEW.dificultad);
+            UPDATE resumen_jugadores SET
+                partidas = partidas + 1,
+                victorias = victorias + (NEW.victoria = 1),
+                suma_intentos_victorias = suma_intentos_victorias
+                    + CASE WHEN NEW.victoria = 1 THEN NEW.intentos ELSE 0 END
+            WHERE jugador_id = NEW.jugador_id AND dificultad = NEW.dificultad;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_resumen_jugador_delete
+        AFTER DELETE ON estadisticas
+        WHEN OLD.jugador_id IS NOT NULL
+        BEGIN
+            UPDATE resumen_jugadores SET
+                partidas = partidas - 1,
+                victorias = victorias - (OLD.victoria = 1),
+                suma_intentos_victorias = suma_intentos_victorias
+                    - CASE WHEN OLD.victoria = 1 THEN OLD.intentos ELSE 0 END
+            WHERE jugador_id = OLD.jugador_id AND dificultad = OLD.dificultad;
+        END
+    ''')
+    
+    # Las rachas también se llevan por jugador (ver ambitos_racha)
+    cursor.execute("DROP TRIGGER IF EXISTS trg_rachas_insert")
+    cursor.execute('''
+        CREATE TRIGGER trg_rachas_insert
+        AFTER INSERT ON estadisticas
+        BEGIN
+            INSERT OR IGNORE INTO rachas (ambito) VALUES ('GLOBAL'), (NEW.dificultad);
+            INSERT OR IGNORE INTO rachas (ambito)
+                SELECT 'J' || NEW.jugador_id WHERE NEW.jugador_id IS NOT NULL
+                UNION ALL
+                SELECT 'J' || NEW.jugador_id || ':' || NEW.dificultad WHERE NEW.jugador_id IS NOT NULL;
+            UPDATE rachas SET
+                actual = CASE WHEN NEW.victoria = 1 THEN actual + 1 ELSE 0 END,
+                mejor = MAX(mejor, CASE WHEN NEW.victoria = 1 THEN actual + 1 ELSE 0 END)
+            WHERE ambito IN ('GLOBAL', NEW.dificultad,
+                             'J' || NEW.jugador_id, 'J' || NEW.jugador_id || ':' || NEW.dificultad);
+        END
+    ''')
+
+
+def _m007_epocas(cursor: sqlite3.Cursor):
+    """Épocas de estadísticas: resetear solo anota desde qué id empiezan las partidas vigentes"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS epocas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            inicio_id INTEGER NOT NULL,
+            fecha TEXT NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        INSERT INTO epocas (inicio_id, fecha)
+        SELECT 0, datetime('now', 'localtime')
+        WHERE NOT EXISTS (SELECT 1 FROM epocas)
+    ''')
+    
+    # Archivar partidas de épocas anteriores no debe tocar los resúmenes de la actual
+    cursor.execute("DROP TRIGGER IF EXISTS trg_resumen_delete")
+    cursor.execute('''
+        CREATE TRIGGER trg_resumen_delete
+        AFTER DELETE ON estadisticas
+        WHEN OLD.id >= (SELECT inicio_id FROM epocas ORDER BY id DESC LIMIT 1)
+        BEGIN
+            UPDATE resumen_estadisticas SET
+                partidas = partidas - 1,
+                victorias = victorias - (OLD.victoria = 1),
+                suma_intentos_victorias = suma_intentos_victorias
+                    - CASE WHEN OLD.victoria = 1 THEN OLD.intentos ELSE 0 END
+            WHERE dificultad = OLD.dificultad;
+        END
+    ''')
+    cursor.execute("DROP TRIGGER IF EXISTS trg_resumen_jugador_delete")
+    cursor.execute('''
+        CREATE TRIGGER trg_resumen_jugador_delete
+        AFTER DELETE ON estadisticas
+        WHEN OLD.jugador_id IS NOT NULL
+            AND OLD.id >= (SELECT inicio_id FROM epocas ORDER BY id DESC LIMIT 1)
+        BEGIN
+            UPDATE resumen_jugadores SET
+                partidas = partidas - 1,
+                victorias = victorias - (OLD.victoria = 1),
+                suma_intentos_victorias = suma_intentos_victorias
+                    - CASE WHEN OLD.victoria = 1 THEN OLD.intentos ELSE 0 END
+            WHERE jugador_id = OLD.jugador_id AND dificultad = OLD.dificultad;
+        END
+    ''')
+
+
+def _m008_partidas_compactas(cursor: sqlite3.Cursor):
+    """Partidas en formato compacto (ids y enteros) con estadisticas como vista compatible"""
+    # Ya migrada: estadisticas es la vista
+    if cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'view' AND name = 'estadisticas'"
+    ).fetchone():
+        return
+    
+    # Fila de rowid: el id entero ya es la clave, WITHOUT ROWID no ahorraría nada
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS partidas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            momento INTEGER NOT NULL,
+            palabra_id INTEGER NOT NULL REFERENCES palabras (id),
+            intentos INTEGER NOT NULL,
+            victoria INTEGER NOT NULL,
+            tiempo_segundos INTEGER,
+            dificultad INTEGER NOT NULL,
+            jugador_id INTEGER REFERENCES jugadores (id)
+        )
+    ''')
+    
+    # Palabras jugadas que no estaban en el diccionario (p. ej. las alternativas): entran para
+    # poder referirlas, pero no se sirven en partidas nuevas (ver _m016_palabras_jugables)
+    if "jugable" not in _columnas(cursor, "palabras"):
+        cursor.execute("ALTER TABLE palabras ADD COLUMN jugable INTEGER NOT NULL DEFAULT 1")
+    cursor.execute(f'''
+        INSERT OR IGNORE INTO palabras (palabra, dificultad, categoria, jugable)
+        SELECT DISTINCT palabra, dificultad, '{CATEGORIA_SIN_DICCIONARIO}', 0 FROM estadisticas
+    ''')
+    
+    # momento: segundos Unix; fecha se guardaba en hora local
+    cursor.execute(f'''
+        INSERT INTO partidas (id, momento, palabra_id, intentos, victoria, tiempo_segundos, dificultad, jugador_id)
+        SELECT
+            e.id,
+            CAST(strftime('%s', e.fecha, 'utc') AS INTEGER),
+            p.id,
+            e.intentos,
+            e.victoria,
+            e.tiempo_segundos,
+            {sql_codigo_dificultad("e.dificultad")},
+            e.jugador_id
+        FROM estadisticas e
+        JOIN palabras p ON p.palabra = e.palabra
+        ORDER BY e.id
+    ''')
+    
+    # Los ids nuevos siguen donde iba estadisticas (puede haber huecos por archivado)
+    cursor.execute('''
+        INSERT OR IGNORE INTO sqlite_sequence (name, seq) VALUES ('partidas', 0)
+    ''')
+    cursor.execute('''
+        UPDATE sqlite_sequence SET seq = MAX(seq, COALESCE(
+            (SELECT seq FROM sqlite_sequence WHERE name = 'estadisticas'), 0
+        ))
+        WHERE name = 'partidas'
+    ''')
+    
+    # Se van también sus índices y triggers
+    cursor.execute("DROP TABLE estadisticas")
+    
+    nombre_dificultad = sql_nombre_dificultad("p.dificultad")
+    cursor.execute(f'''
+        CREATE VIEW estadisticas AS
+        SELECT
+            p.id AS id,
+            datetime(p.momento, 'unixepoch', 'localtime') AS fecha,
+            w.palabra AS palabra,
+            p.intentos AS intentos,
+            p.victoria AS victoria,
+            p.tiempo_segundos AS tiempo_segundos,
+            {nombre_dificultad} AS dificultad,
+            p.jugador_id AS jugador_id
+        FROM partidas p
+        LEFT JOIN palabras w ON w.id = p.palabra_id
+    ''')
+    
+    # Quien sigue escribiendo en estadisticas (escritor diferido, restaurar épocas) escribe en partidas
+    cursor.execute(f'''
+        CREATE TRIGGER trg_estadisticas_insert
+        INSTEAD OF INSERT ON estadisticas
+        BEGIN
+            INSERT OR IGNORE INTO palabras (palabra, dificultad, categoria)
+            VALUES (NEW.palabra, NEW.dificultad, 'GENERAL');
+            INSERT INTO partidas (id, momento, palabra_id, intentos, victoria, tiempo_segundos, dificultad, jugador_id)
+            VALUES (
+                NEW.id,
+                CAST(strftime('%s', COALESCE(NEW.fecha, 'now'), 'utc') AS INTEGER),
+                (SELECT id FROM palabras WHERE palabra = NEW.palabra),
+                NEW.intentos,
+                NEW.victoria,
+                NEW.tiempo_segundos,
+                {sql_codigo_dificultad("NEW.dificultad")},
+                NEW.jugador_id
+            );
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER trg_estadisticas_delete
+        INSTEAD OF DELETE ON estadisticas
+        BEGIN
+            DELETE FROM partidas WHERE id = OLD.id;
+        END
+    ''')
+    
+    # Índices de ranking, historial y jugador, con enteros en lugar de textos
+    indices = {
+        "idx_partidas_ranking_dificultad": "victoria, dificultad, intentos, tiempo_segundos, palabra_id, momento",
+        "idx_partidas_ranking": "victoria, intentos, tiempo_segundos, dificultad, palabra_id, momento",
+        "idx_partidas_jugador_ranking_dificultad":
+            "jugador_id, victoria, dificultad, intentos, tiempo_segundos, palabra_id, momento",
+        "idx_partidas_jugador_ranking":
+            "jugador_id, victoria, intentos, tiempo_segundos, dificultad, palabra_id, momento",
+        "idx_partidas_dificultad": "dificultad",
+        "idx_partidas_victoria": "victoria",
+        "idx_partidas_jugador": "jugador_id",
+    }
+    for nombre, columnas in indices.items():
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {nombre} ON partidas ({columnas})")
+    
+    # Los mismos triggers de resúmenes y rachas, ahora sobre partidas
+    nuevo = sql_nombre_dificultad("NEW.dificultad")
+    viejo = sql_nombre_dificultad("OLD.dificultad")
+    epoca_actual = "(SELECT inicio_id FROM epocas ORDER BY id DESC LIMIT 1)"
+    cursor.execute(f'''
+        CREATE TRIGGER trg_resumen_insert
+        AFTER INSERT ON partidas
+        BEGIN
+            INSERT OR IGNORE INTO resumen_estadisticas (dificultad) VALUES ({nuevo});
+            UPDATE resumen_estadisticas SET
+                partidas = partidas + 1,
+                victorias = victorias + (NEW.victoria = 1),
+                suma_intentos_victorias = suma_intentos_victorias
+                    + CASE WHEN NEW.victoria = 1 THEN NEW.intentos ELSE 0 END
+            WHERE dificultad = {nuevo};
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_resumen_delete
+        AFTER DELETE ON partidas
+        WHEN OLD.id >= {epoca_actual}
+        BEGIN
+            UPDATE resumen_estadisticas SET
+                partidas = partidas - 1,
+                victorias = victorias - (OLD.victoria = 1),
+                suma_intentos_victorias = suma_intentos_victorias
+                    - CASE WHEN OLD.victoria = 1 THEN OLD.intentos ELSE 0 END
+            WHERE dificultad = {viejo};
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_resumen_jugador_insert
+        AFTER INSERT ON partidas
+        WHEN NEW.jugador_id IS NOT NULL
+        BEGIN
+            INSERT OR IGNORE INTO resumen_jugadores (jugador_id, dificultad)
+            VALUES (NEW.jugador_id, {nuevo});
+            UPDATE resumen_jugadores SET
+                partidas = partidas + 1,
+                victorias = victorias + (NEW.victoria = 1),
+                suma_intentos_victorias = suma_intentos_victorias
+                    + CASE WHEN NEW.victoria = 1 THEN NEW.intentos ELSE 0 END
+            WHERE jugador_id = NEW.jugador_id AND dificultad = {nuevo};
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_resumen_jugador_delete
+        AFTER DELETE ON partidas
+        WHEN OLD.jugador_id IS NOT NULL AND OLD.id >= {epoca_actual}
+        BEGIN
+            UPDATE resumen_jugadores SET
+                partidas = partidas - 1,
+                victorias = victorias - (OLD.victoria = 1),
+                suma_intentos_victorias = suma_intentos_victorias
+                    - CASE WHEN OLD.victoria = 1 THEN OLD.intentos ELSE 0 END
+            WHERE jugador_id = OLD.jugador_id AND dificultad = {viejo};
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_rachas_insert
+        AFTER INSERT ON partidas
+        BEGIN
+            INSERT OR IGNORE INTO rachas (ambito) VALUES ('GLOBAL'), ({nuevo});
+            INSERT OR IGNORE INTO rachas (ambito)
+                SELECT 'J' || NEW.jugador_id WHERE NEW.jugador_id IS NOT NULL
+                UNION ALL
+                SELECT 'J' || NEW.jugador_id || ':' || {nuevo} WHERE NEW.jugador_id IS NOT NULL;
+            UPDATE rachas SET
+                actual = CASE WHEN NEW.victoria = 1 THEN actual + 1 ELSE 0 END,
+                mejor = MAX(mejor, CASE WHEN NEW.victoria = 1 THEN actual + 1 ELSE 0 END)
+            WHERE ambito IN ('GLOBAL', {nuevo},
+                             'J' || NEW.jugador_id, 'J' || NEW.jugador_id || ':' || {nuevo});
+        END
+    ''')
+
+
+
+def recalcular_resumen_diario(cursor: sqlite3.Cursor):
+    """Recalcula el resumen diario de la época actual con un único recorrido de partidas"""
+    cursor.execute("DELETE FROM resumen_diario")
+    cursor.execute(f'''
+        INSERT INTO resumen_diario (jugador_id, dia, dificultad, partidas, victorias,
+                                    suma_intentos_victorias, suma_tiempo, partidas_con_tiempo)
+        SELECT
+            COALESCE(jugador_id, 0),
+            date(momento, 'unixepoch', 'localtime') AS dia,
+            {sql_nombre_dificultad("dificultad")},
+            COUNT(*),
+            SUM(victoria = 1),
+            SUM(CASE WHEN victoria = 1 THEN intentos ELSE 0 END),
+            COALESCE(SUM(tiempo_segundos), 0),
+            COUNT(tiempo_segundos)
+        FROM partidas
+        WHERE id >= ?
+        GROUP BY jugador_id, dia, dificultad
+    ''', (primer_id_vigente(cursor.connection),))
+    
+    # La fila de todos los jugadores (jugador_id 0) suma las de cada jugador y las de invitados
+    cursor.execute('''
+        INSERT INTO resumen_diario (jugador_id, dia, dificultad, partidas, victorias,
+                                    suma_intentos_victorias, suma_tiempo, partidas_con_tiempo)
+        SELECT 0, dia, dificultad, SUM(partidas), SUM(victorias),
+               SUM(suma_intentos_victorias), SUM(suma_tiempo), SUM(partidas_con_tiempo)
+        FROM resumen_diario
+        WHERE jugador_id <> 0
+        GROUP BY dia, dificultad
+        ON CONFLICT (jugador_id, dia, dificultad) DO UPDATE SET
+            partidas = partidas + excluded.partidas,
+            victorias = victorias + excluded.victorias,
+            suma_intentos_victorias = suma_intentos_victorias + excluded.suma_intentos_victorias,
+            suma_tiempo = suma_tiempo + excluded.suma_tiempo,
+            partidas_con_tiempo = partidas_con_tiempo + excluded.partidas_con_tiempo
+    ''')
+    
+    # Más los días de las partidas ya retenidas, que solo quedan en su resumen
+    if _existe_tabla(cursor, "retenido_diario"):
+        cursor.execute('''
+            INSERT INTO resumen_diario (jugador_id, dia, dificultad, partidas, victorias,
+                                        suma_intentos_victorias, suma_tiempo, partidas_con_tiempo)
+            SELECT jugador_id, dia, dificultad, SUM(partidas), SUM(victorias),
+                   SUM(suma_intentos_victorias), SUM(suma_tiempo), SUM(partidas_con_tiempo)
+            FROM retenido_diario
+            WHERE epoca_inicio >= ?
+            GROUP BY jugador_id, dia, dificultad
+            ON CONFLICT (jugador_id, dia, dificultad) DO UPDATE SET
+                partidas = partidas + excluded.partidas,
+                victorias = victorias + excluded.victorias,
+                suma_intentos_victorias = suma_intentos_victorias + excluded.suma_intentos_victorias,
+                suma_tiempo = suma_tiempo + excluded.suma_tiempo,
+                partidas_con_tiempo = partidas_con_tiempo + excluded.partidas_con_tiempo
+        ''', (inicio_epoca(cursor.connection),))
+
+
+def _m009_resumen_diario(cursor: sqlite3.Cursor):
+    """Resumen por día, jugador y dificultad para las tendencias (coste por día, no por partida)"""
+    # jugador_id 0 = todos los jugadores, invitados incluidos
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS resumen_diario (
+            jugador_id INTEGER NOT NULL,
+            dia TEXT NOT NULL,
+            dificultad TEXT NOT NULL,
+            partidas INTEGER NOT NULL DEFAULT 0,
+            victorias INTEGER NOT NULL DEFAULT 0,
+            suma_intentos_victorias INTEGER NOT NULL DEFAULT 0,
+            suma_tiempo INTEGER NOT NULL DEFAULT 0,
+            partidas_con_tiempo INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (jugador_id, dia, dificultad)
+        ) WITHOUT ROWID
+    ''')
+    
+    # Cada partida suma a su día en la fila general y, si tiene jugador, en la suya
+    dia = "date(NEW.momento, 'unixepoch', 'localtime')"
+    nuevo = sql_nombre_dificultad("NEW.dificultad")
+    cursor.execute("DROP TRIGGER IF EXISTS trg_resumen_diario_insert")
+    cursor.execute(f'''
+        CREATE TRIGGER trg_resumen_diario_insert
+        AFTER INSERT ON partidas
+        BEGIN
+            INSERT OR IGNORE INTO resumen_diario (jugador_id, dia, dificultad)
+                SELECT 0, {dia}, {nuevo}
+                UNION ALL
+                SELECT NEW.jugador_id, {dia}, {nuevo} WHERE NEW.jugador_id IS NOT NULL;
+            UPDATE resumen_diario SET
+                partidas = partidas + 1,
+                victorias = victorias + (NEW.victoria = 1),
+                suma_intentos_victorias = suma_intentos_victorias
+                    + CASE WHEN NEW.victoria = 1 THEN NEW.intentos ELSE 0 END,
+                suma_tiempo = suma_tiempo + COALESCE(NEW.tiempo_segundos, 0),
+                partidas_con_tiempo = partidas_con_tiempo + (NEW.tiempo_segundos IS NOT NULL)
+            WHERE jugador_id IN (0, NEW.jugador_id) AND dia = {dia} AND dificultad = {nuevo};
+        END
+    ''')
+    
+    # Igual que los demás resúmenes, archivar épocas anteriores no resta nada
+    dia = "date(OLD.momento, 'unixepoch', 'localtime')"
+    viejo = sql_nombre_dificultad("OLD.dificultad")
+    cursor.execute("DROP TRIGGER IF EXISTS trg_resumen_diario_delete")
+    cursor.execute(f'''
+        CREATE TRIGGER trg_resumen_diario_delete
+        AFTER DELETE ON partidas
+        WHEN OLD.id >= (SELECT inicio_id FROM epocas ORDER BY id DESC LIMIT 1)
+        BEGIN
+            UPDATE resumen_diario SET
+                partidas = partidas - 1,
+                victorias = victorias - (OLD.victoria = 1),
+                suma_intentos_victorias = suma_intentos_victorias
+                    - CASE WHEN OLD.victoria = 1 THEN OLD.intentos ELSE 0 END,
+                suma_tiempo = suma_tiempo - COALESCE(OLD.tiempo_segundos, 0),
+                partidas_con_tiempo = partidas_con_tiempo - (OLD.tiempo_segundos IS NOT NULL)
+            WHERE jugador_id IN (0, OLD.jugador_id) AND dia = {dia} AND dificultad = {viejo};
+        END
+    ''')
+    
+    # Historiales existentes
+    recalcular_resumen_diario(cursor)
+
+
+def recalcular_resumen_categorias(cursor: sqlite3.Cursor):
+    """Recalcula el resumen por categoría de la época actual con un único recorrido de partidas"""
+    cursor.execute("DELETE FROM resumen_categorias")
+    cursor.execute('''
+        INSERT INTO resumen_categorias (jugador_id, categoria, partidas, victorias, suma_intentos_victorias)
+        SELECT
+            COALESCE(p.jugador_id, 0),
+            COALESCE(w.categoria, 'GENERAL') AS categoria_partida,
+            COUNT(*),
+            SUM(p.victoria = 1),
+            SUM(CASE WHEN p.victoria = 1 THEN p.intentos ELSE 0 END)
+        FROM partidas p LEFT JOIN palabras w ON w.id = p.palabra_id
+        WHERE p.id >= ?
+        GROUP BY p.jugador_id, categoria_partida
+    ''', (primer_id_vigente(cursor.connection),))
+    
+    # La fila de todos los jugadores (jugador_id 0) suma las de cada jugador y las de invitados
+    cursor.execute('''
+        INSERT INTO resumen_categorias (jugador_id, categoria, partidas, victorias, suma_intentos_victorias)
+        SELECT 0, categoria, SUM(partidas), SUM(victorias), SUM(suma_intentos_victorias)
+        FROM resumen_categorias
+        WHERE jugador_id <> 0
+        GROUP BY categoria
+        ON CONFLICT (jugador_id, categoria) DO UPDATE SET
+            partidas = partidas + excluded.partidas,
+            victorias = victorias + excluded.victorias,
+            suma_intentos_victorias = suma_intentos_victorias + excluded.suma_intentos_victorias
+    ''')
+    
+    # Más las partidas ya retenidas
+    if _existe_tabla(cursor, "retenido_categorias"):
+        cursor.execute('''
+            INSERT INTO resumen_categorias (jugador_id, categoria, partidas, victorias, suma_intentos_victorias)
+            SELECT jugador_id, categoria, SUM(partidas), SUM(victorias), SUM(suma_intentos_victorias)
+            FROM retenido_categorias
+            WHERE epoca_inicio >= ?
+            GROUP BY jugador_id, categoria
+            ON CONFLICT (jugador_id, categoria) DO UPDATE SET
+                partidas = partidas + excluded.partidas,
+                victorias = victorias + excluded.victorias,
+                suma_intentos_victorias = suma_intentos_victorias + excluded.suma_intentos_victorias
+        ''', (inicio_epoca(cursor.connection),))
+
+
+def _m010_resumen_categorias(cursor: sqlite3.Cursor):
+    """Contadores por categoría de palabra, para no cruzar partidas con palabras al consultar"""
+    # jugador_id 0 = todos los jugadores, invitados incluidos
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS resumen_categorias (
+            jugador_id INTEGER NOT NULL,
+            categoria TEXT NOT NULL,
+            partidas INTEGER NOT NULL DEFAULT 0,
+            victorias INTEGER NOT NULL DEFAULT 0,
+            suma_intentos_victorias INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (jugador_id, categoria)
+        ) WITHOUT ROWID
+    ''')
+    
+    # La categoría sale de palabras por clave primaria (las importaciones nunca la cambian)
+    categoria = "COALESCE((SELECT categoria FROM palabras WHERE id = NEW.palabra_id), 'GENERAL')"
+    cursor.execute("DROP TRIGGER IF EXISTS trg_resumen_categorias_insert")
+    cursor.execute(f'''
+        CREATE TRIGGER trg_resumen_categorias_insert
+        AFTER INSERT ON partidas
+        BEGIN
+            INSERT OR IGNORE INTO resumen_categorias (jugador_id, categoria)
+                SELECT 0, {categoria}
+                UNION ALL
+                SELECT NEW.jugador_id, {categoria} WHERE NEW.jugador_id IS NOT NULL;
+            UPDATE resumen_categorias SET
+                partidas = partidas + 1,
+                victorias = victorias + (NEW.victoria = 1),
+                suma_intentos_victorias = suma_intentos_victorias
+                    + CASE WHEN NEW.victoria = 1 THEN NEW.intentos ELSE 0 END
+            WHERE jugador_id IN (0, NEW.jugador_id) AND categoria = {categoria};
+        END
+    ''')
+    
+    categoria = "COALESCE((SELECT categoria FROM palabras WHERE id = OLD.palabra_id), 'GENERAL')"
+    cursor.execute("DROP TRIGGER IF EXISTS trg_resumen_categorias_delete")
+    cursor.execute(f'''
+        CREATE TRIGGER trg_resumen_categorias_delete
+        AFTER DELETE ON partidas
+        WHEN OLD.id >= (SELECT inicio_id FROM epocas ORDER BY id DESC LIMIT 1)
+        BEGIN
+            UPDATE resumen_categorias SET
+                partidas = partidas - 1,
+                victorias = victorias - (OLD.victoria = 1),
+                suma_intentos_victorias = suma_intentos_victorias
+                    - CASE WHEN OLD.victoria = 1 THEN OLD.intentos ELSE 0 END
+            WHERE jugador_id IN (0, OLD.jugador_id) AND categoria = {categoria};
+        END
+    ''')
+    
+    # Historiales existentes
+    recalcular_resumen_categorias(cursor)
+
+
+def _m011_mantenimiento(cursor: sqlite3.Cursor):
+    """Última ejecución de cada tarea de mantenimiento (ver mantenimiento.py)"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS mantenimiento (
+            tarea TEXT PRIMARY KEY,
+            ultima INTEGER NOT NULL,
+            resultado TEXT
+        )
+    ''')
+
+
+# Primer id de la época actual que no se ha plegado todavía en los resúmenes de retención
+SQL_PRIMER_ID_VIGENTE = '''(
+    SELECT MAX(e.inicio_id, COALESCE(
+        (SELECT MAX(r.plegado_hasta) + 1 FROM retenciones r WHERE r.epoca_inicio = e.inicio_id), 0
+    ))
+    FROM epocas e
+    ORDER BY e.id DESC
+    LIMIT 1
+)'''
+
+
+def _m012_retencion(cursor: sqlite3.Cursor):
+    """Retención: las partidas antiguas se pliegan en resúmenes por época, se archivan y se borran"""
+    # Una fila por pasada: ids archivados [desde_id, hasta_id] y hasta dónde se han plegado ya
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS retenciones (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            epoca_inicio INTEGER NOT NULL,
+            desde_id INTEGER NOT NULL,
+            hasta_id INTEGER NOT NULL,
+            plegado_hasta INTEGER NOT NULL,
+            partidas INTEGER NOT NULL DEFAULT 0,
+            fecha TEXT NOT NULL,
+            archivo TEXT NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_retenciones_epoca
+        ON retenciones (epoca_inicio, plegado_hasta)
+    ''')
+    
+    # Lo que aportaban las partidas retenidas, por época (jugador_id 0 = todos, como en los resúmenes).
+    # Histograma para las estadísticas extendidas (tiempo_segundos -1 = sin tiempo)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS retenido_histograma (
+            epoca_inicio INTEGER NOT NULL,
+            jugador_id INTEGER NOT NULL,
+            victoria INTEGER NOT NULL,
+            dificultad INTEGER NOT NULL,
+            intentos INTEGER NOT NULL,
+            tiempo_segundos INTEGER NOT NULL,
+            partidas INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (epoca_inicio, jugador_id, victoria, dificultad, intentos, tiempo_segundos)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS retenido_diario (
+            epoca_inicio INTEGER NOT NULL,
+            jugador_id INTEGER NOT NULL,
+            dia TEXT NOT NULL,
+            dificultad TEXT NOT NULL,
+            partidas INTEGER NOT NULL DEFAULT 0,
+            victorias INTEGER NOT NULL DEFAULT 0,
+            suma_intentos_victorias INTEGER NOT NULL DEFAULT 0,
+            suma_tiempo INTEGER NOT NULL DEFAULT 0,
+            partidas_con_tiempo INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (epoca_inicio, jugador_id, dia, dificultad)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS retenido_categorias (
+            epoca_inicio INTEGER NOT NULL,
+            jugador_id INTEGER NOT NULL,
+            categoria TEXT NOT NULL,
+            partidas INTEGER NOT NULL DEFAULT 0,
+            victorias INTEGER NOT NULL DEFAULT 0,
+            suma_intentos_victorias INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (epoca_inicio, jugador_id, categoria)
+        ) WITHOUT ROWID
+    ''')
+    
+    # Tramo de rachas (ver componer_tramos) de lo retenido en cada época
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS retenido_rachas (
+            epoca_inicio INTEGER NOT NULL,
+            ambito TEXT NOT NULL,
+            inicial INTEGER NOT NULL,
+            actual INTEGER NOT NULL,
+            mejor INTEGER NOT NULL,
+            completo INTEGER NOT NULL,
+            PRIMARY KEY (epoca_inicio, ambito)
+        ) WITHOUT ROWID
+    ''')
+    
+    # Borrar partidas ya plegadas no resta nada de los resúmenes, igual que archivar épocas
+    viejo = sql_nombre_dificultad("OLD.dificultad")
+    dia = "date(OLD.momento, 'unixepoch', 'localtime')"
+    categoria = "COALESCE((SELECT categoria FROM palabras WHERE id = OLD.palabra_id), 'GENERAL')"
+    for nombre in ("trg_resumen_delete", "trg_resumen_jugador_delete",
+                   "trg_resumen_diario_delete", "trg_resumen_categorias_delete"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+    cursor.execute(f'''
+        CREATE TRIGGER trg_resumen_delete
+        AFTER DELETE ON partidas
+        WHEN OLD.id >= {SQL_PRIMER_ID_VIGENTE}
+        BEGIN
+            UPDATE resumen_estadisticas SET
+                partidas = partidas - 1,
+                victorias = victorias - (OLD.victoria = 1),
+                suma_intentos_victorias = suma_intentos_victorias
+                    - CASE WHEN OLD.victoria = 1 THEN OLD.intentos ELSE 0 END
+            WHERE dificultad = {viejo};
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_resumen_jugador_delete
+        AFTER DELETE ON partidas
+        WHEN OLD.jugador_id IS NOT NULL AND OLD.id >= {SQL_PRIMER_ID_VIGENTE}
+        BEGIN
+            UPDATE resumen_jugadores SET
+                partidas = partidas - 1,
+                victorias = victorias - (OLD.victoria = 1),
+                suma_intentos_victorias = suma_intentos_victorias
+                    - CASE WHEN OLD.victoria = 1 THEN OLD.intentos ELSE 0 END
+            WHERE jugador_id = OLD.jugador_id AND dificultad = {viejo};
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_resumen_diario_delete
+        AFTER DELETE ON partidas
+        WHEN OLD.id >= {SQL_PRIMER_ID_VIGENTE}
+        BEGIN
+            UPDATE resumen_diario SET
+                partidas = partidas - 1,
+                victorias = victorias - (OLD.victoria = 1),
+                suma_intentos_victorias = suma_intentos_victorias
+                    - CASE WHEN OLD.victoria = 1 THEN OLD.intentos ELSE 0 END,
+                suma_tiempo = suma_tiempo - COALESCE(OLD.tiempo_segundos, 0),
+                partidas_con_tiempo = partidas_con_tiempo - (OLD.tiempo_segundos IS NOT NULL)
+            WHERE jugador_id IN (0, OLD.jugador_id) AND dia = {dia} AND dificultad = {viejo};
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_resumen_categorias_delete
+        AFTER DELETE ON partidas
+        WHEN OLD.id >= {SQL_PRIMER_ID_VIGENTE}
+        BEGIN
+            UPDATE resumen_categorias SET
+                partidas = partidas - 1,
+                victorias = victorias - (OLD.victoria = 1),
+                suma_intentos_victorias = suma_intentos_victorias
+                    - CASE WHEN OLD.victoria = 1 THEN OLD.intentos ELSE 0 END
+            WHERE jugador_id IN (0, OLD.jugador_id) AND categoria = {categoria};
+        END
+    ''')
+
+def crear_indice_busqueda(cursor: sqlite3.Cursor) -> bool:
+    """Índice FTS5 (trigram) de palabra y categoría sincronizado por triggers; False si SQLite no lo admite"""
+    try:
+        # Tabla de contenido externo: el texto sigue solo en palabras, el índice guarda los trigramas
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS palabras_fts USING fts5(
+                palabra, categoria,
+                content = 'palabras', content_rowid = 'id',
+                tokenize = 'trigram'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        # Sin FTS5 o con SQLite anterior a 3.34 (sin trigram): buscar() recorre palabras con LIKE
+        print(f"⚠️ Búsqueda sin índice de texto completo: {e}")
+        return False
+    
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_palabras_fts_insert
+        AFTER INSERT ON palabras
+        BEGIN
+            INSERT INTO palabras_fts (rowid, palabra, categoria) VALUES (NEW.id, NEW.palabra, NEW.categoria);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_palabras_fts_delete
+        AFTER DELETE ON palabras
+        BEGIN
+            INSERT INTO palabras_fts (palabras_fts, rowid, palabra, categoria)
+            VALUES ('delete', OLD.id, OLD.palabra, OLD.categoria);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_palabras_fts_update
+        AFTER UPDATE OF palabra, categoria ON palabras
+        BEGIN
+            INSERT INTO palabras_fts (palabras_fts, rowid, palabra, categoria)
+            VALUES ('delete', OLD.id, OLD.palabra, OLD.categoria);
+            INSERT INTO palabras_fts (rowid, palabra, categoria) VALUES (NEW.id, NEW.palabra, NEW.categoria);
+        END
+    ''')
+    cursor.execute("INSERT INTO palabras_fts (palabras_fts) VALUES ('rebuild')")
+    return True
+
+
+def _m013_busqueda(cursor: sqlite3.Cursor):
+    """Búsqueda por subcadena en palabras y resultados agregados de las partidas de cada palabra"""
+    # Las palabras jugadas están todas en palabras (partidas guarda palabra_id), basta un índice
+    crear_indice_busqueda(cursor)
+    
+    # Partidas de una palabra sin recorrer la tabla: cubre los agregados de buscar()
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_partidas_palabra
+        ON partidas (palabra_id, jugador_id, victoria, intentos)
+    ''')
+
+
+def _m014_sincronizacion(cursor: sqlite3.Cursor):
+    """Identidad de kiosco, id global de cada partida y marcas de sincronización por destino"""
+    # Una fila por kiosco conocido; la marcada como local es esta base
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS kioscos (
+            id INTEGER PRIMARY KEY,
+            uuid TEXT UNIQUE NOT NULL,
+            local INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    if not cursor.execute("SELECT 1 FROM kioscos WHERE local = 1").fetchone():
+        cursor.execute("INSERT INTO kioscos (uuid, local) VALUES (?, 1)", (uuid.uuid4().hex,))
+    
+    # Id global = (kiosco de origen, secuencia allí); NULL en las dos = partida jugada aquí, con su id
+    columnas = _columnas(cursor, "partidas")
+    if "origen" not in columnas:
+        cursor.execute("ALTER TABLE partidas ADD COLUMN origen INTEGER REFERENCES kioscos (id)")
+    if "secuencia" not in columnas:
+        cursor.execute("ALTER TABLE partidas ADD COLUMN secuencia INTEGER")
+    
+    # Importar dos veces el mismo cambio no duplica partidas (índice parcial: las locales no ocupan)
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_partidas_origen
+        ON partidas (origen, secuencia)
+        WHERE origen IS NOT NULL
+    ''')
+    
+    # Hasta qué id de partidas se ha exportado ya a cada destino
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sincronizaciones (
+            destino TEXT PRIMARY KEY,
+            hasta_id INTEGER NOT NULL,
+            fecha TEXT NOT NULL
+        )
+    ''')
+
+
+def _m015_partidas_recibidas(cursor: sqlite3.Cursor):
+    """Ids globales de las partidas importadas que sobreviven al archivado, y origen en la vista estadisticas"""
+    # Lo que ya se recibió no se vuelve a importar aunque la retención o un reseteo
+    # hayan sacado la partida de partidas: el índice parcial solo ve las filas vigentes
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS partidas_recibidas (
+            origen INTEGER NOT NULL,
+            secuencia INTEGER NOT NULL,
+            PRIMARY KEY (origen, secuencia)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        INSERT OR IGNORE INTO partidas_recibidas (origen, secuencia)
+        SELECT origen, secuencia FROM partidas WHERE origen IS NOT NULL
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_partidas_recibidas
+        AFTER INSERT ON partidas
+        WHEN NEW.origen IS NOT NULL
+        BEGIN
+            INSERT OR IGNORE INTO partidas_recibidas (origen, secuencia) VALUES (NEW.origen, NEW.secuencia);
+        END
+    ''')
+    
+    # origen y secuencia viajan con la partida al archivo de épocas y a los de retención,
+    # que leen y restauran a través de la vista (sus triggers INSTEAD OF se van con ella)
+    cursor.execute("DROP VIEW IF EXISTS estadisticas")
+    cursor.execute(f'''
+        CREATE VIEW estadisticas AS
+        SELECT
+            p.id AS id,
+            datetime(p.momento, 'unixepoch', 'localtime') AS fecha,
+            w.palabra AS palabra,
+            p.intentos AS intentos,
+            p.victoria AS victoria,
+            p.tiempo_segundos AS tiempo_segundos,
+            {sql_nombre_dificultad("p.dificultad")} AS dificultad,
+            p.jugador_id AS jugador_id,
+            p.origen AS origen,
+            p.secuencia AS secuencia
+        FROM partidas p
+        LEFT JOIN palabras w ON w.id = p.palabra_id
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_estadisticas_insert
+        INSTEAD OF INSERT ON estadisticas
+        BEGIN
+            INSERT OR IGNORE INTO palabras (palabra, dificultad, categoria)
+            VALUES (NEW.palabra, NEW.dificultad, 'GENERAL');
+            INSERT INTO partidas (id, momento, palabra_id, intentos, victoria, tiempo_segundos, dificultad,
+                                  jugador_id, origen, secuencia)
+            VALUES (
+                NEW.id,
+                CAST(strftime('%s', COALESCE(NEW.fecha, 'now'), 'utc') AS INTEGER),
+                (SELECT id FROM palabras WHERE palabra = NEW.palabra),
+                NEW.intentos,
+                NEW.victoria,
+                NEW.tiempo_segundos,
+                {sql_codigo_dificultad("NEW.dificultad")},
+                NEW.jugador_id,
+                NEW.origen,
+                NEW.secuencia
+            );
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER trg_estadisticas_delete
+        INSTEAD OF DELETE ON estadisticas
+        BEGIN
+            DELETE FROM partidas WHERE id = OLD.id;
+        END
+    ''')
+
+
+def _m016_palabras_jugables(cursor: sqlite3.Cursor):
+    """Las palabras que solo se jugaron quedan en palabras pero fuera del sorteo
+    
+    Una partida necesita su palabra en palabras (palabra_id), aunque sea una alternativa o
+    llegue de otro kiosco. Se marcan con jugable = 0 en vez de ir a una tabla aparte: partidas,
+    búsqueda y resúmenes siguen uniendo con palabras por id como hasta ahora, y solo el sorteo
+    (y su versión) las filtra. Las que entraron antes de esta versión como 'GENERAL' no se
+    distinguen de las del diccionario y siguen siendo jugables.
+    """
+    if "jugable" not in _columnas(cursor, "palabras"):
+        cursor.execute("ALTER TABLE palabras ADD COLUMN jugable INTEGER NOT NULL DEFAULT 1")
+    
+    # El sorteo (WHERE dificultad = ? AND jugable = 1) sale entero del índice
+    cursor.execute("DROP INDEX IF EXISTS idx_palabras_dificultad")
+    cursor.execute("CREATE INDEX idx_palabras_dificultad ON palabras (dificultad, jugable)")
+    
+    # Una palabra no jugable nueva no cambia el pool: no hay que recargarlo
+    cursor.execute("DROP TRIGGER IF EXISTS trg_palabras_version_insert")
+    cursor.execute('''
+        CREATE TRIGGER trg_palabras_version_insert
+        AFTER INSERT ON palabras
+        WHEN NEW.jugable = 1
+        BEGIN
+            UPDATE contador_cambios SET version = version + 1 WHERE tabla = 'palabras';
+        END
+    ''')
+    
+    cursor.execute("DROP TRIGGER IF EXISTS trg_estadisticas_insert")
+    cursor.execute(f'''
+        CREATE TRIGGER trg_estadisticas_insert
+        INSTEAD OF INSERT ON estadisticas
+        BEGIN
+            INSERT OR IGNORE INTO palabras (palabra, dificultad, categoria, jugable)
+            VALUES (NEW.palabra, NEW.dificultad, '{CATEGORIA_SIN_DICCIONARIO}', 0);
+            INSERT INTO partidas (id, momento, palabra_id, intentos, victoria, tiempo_segundos, dificultad,
+                                  jugador_id, origen, secuencia)
+            VALUES (
+                NEW.id,
+                CAST(strftime('%s', COALESCE(NEW.fecha, 'now'), 'utc') AS INTEGER),
+                (SELECT id FROM palabras WHERE palabra = NEW.palabra),
+                NEW.intentos,
+                NEW.victoria,
+                NEW.tiempo_segundos,
+                {sql_codigo_dificultad("NEW.dificultad")},
+                NEW.jugador_id,
+                NEW.origen,
+                NEW.secuencia
+            );
+        END
+    ''')
+
+
+MIGRACIONES: List[Tuple[int, str, Callable[[sqlite3.Cursor], None]]] = [
+    (1, "Índices cubrientes para el ranking", _m001_indices_ranking),
+    (2, "Índice de palabras por dificultad", _m002_indice_palabras_dificultad),
+    (3, "Contador de cambios de palabras", _m003_contador_cambios_palabras),
+    (4, "Índices para el historial paginado", _m004_indices_historial),
+    (5, "Rachas de victorias", _m005_rachas),
+    (6, "Perfiles de jugador", _m006_jugadores),
+    (7, "Épocas de estadísticas", _m007_epocas),
+    (8, "Partidas en formato compacto", _m008_partidas_compactas),
+    (9, "Resumen diario para tendencias", _m009_resumen_diario),
+    (10, "Resumen por categoría", _m010_resumen_categorias),
+    (11, "Registro de mantenimiento", _m011_mantenimiento),
+    (12, "Retención de partidas antiguas", _m012_retencion),
+    (13, "Búsqueda de palabras por subcadena", _m013_busqueda),
+    (14, "Sincronización entre kioscos", _m014_sincronizacion),
+    (15, "Partidas recibidas de otros kioscos", _m015_partidas_recibidas),
+    (16, "Palabras jugadas fuera del diccionario", _m016_palabras_jugables),
+]
+
+
+def version_actual(conn: sqlite3.Connection) -> int:
+    """Devuelve la versión de esquema guardada en PRAGMA user_version"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def aplicar_migraciones(conn: sqlite3.Connection, hasta: int = None) -> int:
+    """Aplica en orden las migraciones pendientes (hasta la versión indicada) y devuelve la versión final"""
+    if conn.in_transaction:
+        conn.commit()
+    
+    version = version_actual(conn)
+    cursor = conn.cursor()
+    
+    for numero, descripcion, migracion in MIGRACIONES:
+        if numero <= version:
+            continue
+        if hasta is not None and numero > hasta:
+            break
+        
+        # Cada migración y su número de versión van en la misma transacción
+        cursor.execute("BEGIN")
+        try:
+            migracion(cursor)
+            cursor.execute(f"PRAGMA user_version = {numero}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            print(f"⚠️ Error aplicando migración {numero} ({descripcion})")
+            raise
+        
+        version = numero
+    
+    return version
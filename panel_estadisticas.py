@@ -2,15 +2,18 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, font
 from gestor_bd import GestorBaseDatos
+from ventana_historial import VentanaHistorial
 from typing import Dict
+from datetime import date, timedelta
 import math
 
 class PanelEstadisticas(tk.Frame):
     """Panel que muestra las estadísticas del juego con mejor visualización"""
     
-    def __init__(self, parent, gestor_db: GestorBaseDatos, colores: Dict = None):
+    def __init__(self, parent, gestor_db: GestorBaseDatos, colores: Dict = None, jugador_id: int = None):
         super().__init__(parent)
         self.gestor_db = gestor_db
+        self.jugador_id = jugador_id  # None = estadísticas de todos los jugadores
         
         # Colores del menú inicial
         self.colores = colores or {
@@ -108,13 +111,19 @@ class PanelEstadisticas(tk.Frame):
         # Sección 2: Estadísticas por Dificultad
         self.crear_seccion_dificultad()
         
+        # Sección 3: Estadísticas por Categoría
+        self.crear_seccion_categorias()
+        
         # Separador
         self.crear_separador("🎯 RENDIMIENTO")
         
-        # Sección 3: Métricas de Rendimiento
+        # Sección 4: Métricas de Rendimiento
         self.crear_seccion_rendimiento()
         
-        # Sección 4: Botones de Acción
+        # Sección 5: Tendencia en el tiempo
+        self.crear_seccion_tendencia()
+        
+        # Sección 6: Botones de Acción
         self.crear_seccion_botones()
         
         # Espacio final
@@ -340,6 +349,72 @@ class PanelEstadisticas(tk.Frame):
                 "porcentaje": label_porcentaje_det
             }
     
+    def crear_seccion_categorias(self):
+        """Crea la sección de estadísticas por categoría de palabra"""
+        seccion_frame = tk.LabelFrame(
+            self.contenido_principal,
+            text="🏷️ RENDIMIENTO POR CATEGORÍA",
+            font=self.fuente_titulo,
+            bg=self.colores["fondo_terciario"],
+            fg=self.colores["texto_principal"],
+            padx=20,
+            pady=15,
+            relief=tk.RAISED,
+            bd=2
+        )
+        seccion_frame.pack(fill=tk.X, padx=10, pady=(0, 15))
+        
+        # Las filas dependen de las categorías jugadas: se recrean al actualizar
+        self.frame_categorias = tk.Frame(seccion_frame, bg=self.colores["fondo_terciario"])
+        self.frame_categorias.pack(fill=tk.X, pady=(5, 0))
+    
+    def actualizar_categorias(self, limite: int = 8):
+        """Rellena la sección de categorías con las más jugadas"""
+        for hijo in self.frame_categorias.winfo_children():
+            hijo.destroy()
+        
+        categorias = self.gestor_db.obtener_estadisticas_por_categoria(self.jugador_id)
+        if not categorias:
+            tk.Label(
+                self.frame_categorias,
+                text="Todavía no hay partidas",
+                font=("Arial", 9, "italic"),
+                bg=self.colores["fondo_terciario"],
+                fg=self.colores["texto_secundario"]
+            ).pack(anchor=tk.W)
+            return
+        
+        self.frame_categorias.grid_columnconfigure(1, weight=1)
+        for fila, (categoria, datos) in enumerate(list(categorias.items())[:limite]):
+            color = self.colores["verde"] if datos["porcentaje"] >= 50 else self.colores["rojo"]
+            
+            # Nombre de la categoría
+            tk.Label(
+                self.frame_categorias,
+                text=categoria,
+                font=("Arial", 9, "bold"),
+                bg=self.colores["fondo_terciario"],
+                fg=self.colores["acento_secundario"],
+                width=14,
+                anchor=tk.W
+            ).grid(row=fila, column=0, sticky="w", pady=3)
+            
+            # Barra de porcentaje
+            barra_frame = tk.Frame(self.frame_categorias, bg="#2a2a4e", height=14,
+                                   relief=tk.SUNKEN, bd=1)
+            barra_frame.grid(row=fila, column=1, sticky="ew", padx=10, pady=3)
+            barra_frame.pack_propagate(False)
+            tk.Frame(barra_frame, bg=color, width=int(datos["porcentaje"] * 2)).pack(side=tk.LEFT, fill=tk.Y)
+            
+            # Victorias sobre total
+            tk.Label(
+                self.frame_categorias,
+                text=f"{datos['victorias']}/{datos['total']} ({datos['porcentaje']:.0f}%)",
+                font=("Arial", 9),
+                bg=self.colores["fondo_terciario"],
+                fg=self.colores["texto_secundario"]
+            ).grid(row=fila, column=2, sticky="e", pady=3)
+    
     def crear_seccion_rendimiento(self):
         """Crea la sección de métricas de rendimiento"""
         seccion_frame = tk.LabelFrame(
@@ -428,6 +503,105 @@ class PanelEstadisticas(tk.Frame):
             
             self.labels_rendimiento[metrica["key"]] = label_valor
     
+    def crear_seccion_tendencia(self):
+        """Crea la sección con el porcentaje de victorias por día, semana o mes"""
+        seccion_frame = tk.LabelFrame(
+            self.contenido_principal,
+            text="📆 TENDENCIA DE VICTORIAS",
+            font=self.fuente_titulo,
+            bg=self.colores["fondo_terciario"],
+            fg=self.colores["texto_principal"],
+            padx=20,
+            pady=15,
+            relief=tk.RAISED,
+            bd=2
+        )
+        seccion_frame.pack(fill=tk.X, padx=10, pady=(0, 15))
+        
+        # Selector de periodo
+        selector_frame = tk.Frame(seccion_frame, bg=self.colores["fondo_terciario"])
+        selector_frame.pack(fill=tk.X)
+        
+        self.periodo_tendencia = tk.StringVar(value="dia")
+        for valor, texto in [("dia", "Últimos 14 días"), ("semana", "12 semanas"), ("mes", "12 meses")]:
+            tk.Radiobutton(
+                selector_frame,
+                text=texto,
+                value=valor,
+                variable=self.periodo_tendencia,
+                command=self.dibujar_tendencia,
+                font=("Arial", 9),
+                bg=self.colores["fondo_terciario"],
+                fg=self.colores["texto_principal"],
+                selectcolor=self.colores["fondo_secundario"],
+                activebackground=self.colores["fondo_terciario"],
+                activeforeground=self.colores["acento_secundario"]
+            ).pack(side=tk.LEFT, padx=(0, 10))
+        
+        # Gráfico de barras (altura = porcentaje de victorias)
+        self.canvas_tendencia = tk.Canvas(
+            seccion_frame,
+            height=150,
+            bg="#2a2a4e",
+            highlightthickness=0
+        )
+        self.canvas_tendencia.pack(fill=tk.X, pady=(10, 0))
+        self.canvas_tendencia.bind("<Configure>", lambda e: self.dibujar_tendencia())
+    
+    def rango_tendencia(self, periodo: str):
+        """Días [desde, hasta) de los últimos 14 días, 12 semanas o 12 meses"""
+        hoy = date.today()
+        hasta = hoy + timedelta(days=1)
+        if periodo == "semana":
+            desde = hoy - timedelta(days=hoy.weekday(), weeks=11)
+        elif periodo == "mes":
+            desde = hoy.replace(day=1)
+            for _ in range(11):
+                desde = (desde - timedelta(days=1)).replace(day=1)
+        else:
+            desde = hoy - timedelta(days=13)
+        return desde, hasta
+    
+    def dibujar_tendencia(self):
+        """Dibuja la tendencia a partir del resumen diario (el coste depende de los días, no de las partidas)"""
+        periodo = self.periodo_tendencia.get()
+        desde, hasta = self.rango_tendencia(periodo)
+        try:
+            serie = self.gestor_db.obtener_tendencia(periodo, desde, hasta, jugador_id=self.jugador_id)
+        except Exception as e:
+            print(f"⚠️ Error cargando la tendencia: {e}")
+            return
+        
+        canvas = self.canvas_tendencia
+        canvas.delete("all")
+        ancho = max(canvas.winfo_width(), 300)
+        alto = int(canvas.cget("height"))
+        arriba, abajo = 18, 20
+        alto_barras = alto - arriba - abajo
+        paso = ancho / len(serie)
+        
+        # Línea del 50%
+        medio = arriba + alto_barras / 2
+        canvas.create_line(0, medio, ancho, medio, fill=self.colores["texto_secundario"], dash=(2, 4))
+        
+        for i, punto in enumerate(serie):
+            x0 = i * paso + paso * 0.2
+            x1 = (i + 1) * paso - paso * 0.2
+            centro = (x0 + x1) / 2
+            
+            if punto["partidas"]:
+                y = arriba + alto_barras * (1 - punto["porcentaje"] / 100)
+                color = self.colores["verde"] if punto["porcentaje"] >= 50 else self.colores["rojo"]
+                canvas.create_rectangle(x0, y, x1, arriba + alto_barras, fill=color, outline="")
+                canvas.create_text(centro, y - 8, text=f"{punto['porcentaje']:.0f}%",
+                                   font=("Arial", 7), fill="white")
+            
+            # Etiqueta del periodo: día/mes o mes/año
+            anio, mes, dia = punto["periodo"].split("-")
+            etiqueta = f"{mes}/{anio[2:]}" if periodo == "mes" else f"{dia}/{mes}"
+            canvas.create_text(centro, alto - abajo / 2, text=etiqueta,
+                               font=("Arial", 7), fill=self.colores["texto_secundario"])
+    
     def crear_seccion_botones(self):
         """Crea la sección de botones de acción"""
         seccion_frame = tk.Frame(self.contenido_principal, 
@@ -438,7 +612,7 @@ class PanelEstadisticas(tk.Frame):
         botones_frame = tk.Frame(seccion_frame, bg=self.colores["fondo_secundario"])
         botones_frame.pack(fill=tk.X)
         
-        # Botones (2 filas x 2 columnas)
+        # Botones (3 filas x 2 columnas)
         botones_info = [
             {
                 "text": "🔄 ACTUALIZAR",
@@ -458,6 +632,12 @@ class PanelEstadisticas(tk.Frame):
                 "color": self.colores["morado"],
                 "tooltip": "Ver estadísticas detalladas"
             },
+            {
+                "text": "📜 HISTORIAL",
+                "command": self.mostrar_historial,
+                "color": self.colores["cyan"],
+                "tooltip": "Ver todas las partidas"
+            },
             {
                 "text": "🗑️ RESETEAR",
                 "command": self.resetear_estadisticas,
@@ -530,7 +710,7 @@ class PanelEstadisticas(tk.Frame):
     def actualizar_estadisticas(self):
         """Actualiza todas las estadísticas mostradas"""
         try:
-            stats = self.gestor_db.obtener_estadisticas()
+            stats = self.gestor_db.obtener_estadisticas(self.jugador_id)
             
             # Calcular métricas adicionales
             total_partidas = stats["partidas_totales"]
@@ -568,9 +748,9 @@ class PanelEstadisticas(tk.Frame):
                 text=f"{porcentaje_victorias:.1f}%"
             )
             
-            # Calcular mejor racha (simulación)
-            mejor_racha = min(victorias, 10)  # Esto es una simulación
-            self.labels_stats["mejor_racha"].config(text=f"{mejor_racha}")
+            # Mejor racha guardada en la tabla de rachas
+            rachas = self.gestor_db.obtener_rachas(self.jugador_id)
+            self.labels_stats["mejor_racha"].config(text=f"{rachas['mejor']}")
             
             # Actualizar estadísticas por dificultad
             for dificultad, datos in stats["por_dificultad"].items():
@@ -595,6 +775,9 @@ class PanelEstadisticas(tk.Frame):
                         text=f"({porcentaje:.1f}%)"
                     )
             
+            # Categorías desde sus contadores (sin recorrer el historial)
+            self.actualizar_categorias()
+            
             # Actualizar métricas de rendimiento
             self.labels_rendimiento["eficiencia"].config(
                 text=f"{eficiencia:.2f}" if eficiencia > 0 else "--"
@@ -608,13 +791,10 @@ class PanelEstadisticas(tk.Frame):
                 text=mejor_dificultad
             )
             
-            # Calcular rendimiento últimas 10 partidas
-            ultimas_10 = "0/0"
+            # Rendimiento en las últimas 10 partidas (buffer en memoria)
             try:
-                ranking = self.gestor_db.obtener_ranking(10)
-                if ranking:
-                    victorias_ultimas = len([r for r in ranking if r[0]])
-                    ultimas_10 = f"{victorias_ultimas}/10"
+                recientes = self.gestor_db.obtener_metricas_recientes(10, self.jugador_id)
+                ultimas_10 = f"{recientes['victorias']}/{recientes['partidas']}"
             except:
                 ultimas_10 = "N/A"
             
@@ -622,6 +802,9 @@ class PanelEstadisticas(tk.Frame):
                 text=ultimas_10
             )
             
+            # Tendencia desde el resumen diario
+            self.dibujar_tendencia()
+            
             # Mostrar mensaje de éxito
             self.mostrar_notificacion("✅ Estadísticas actualizadas")
             
@@ -666,7 +849,7 @@ class PanelEstadisticas(tk.Frame):
     def mostrar_detalles_completos(self):
         """Muestra estadísticas detalladas en ventana aparte"""
         try:
-            stats = self.gestor_db.obtener_estadisticas()
+            stats = self.gestor_db.obtener_estadisticas(self.jugador_id)
             
             # Crear ventana emergente
             detalles_window = tk.Toplevel(self)
@@ -787,10 +970,10 @@ class PanelEstadisticas(tk.Frame):
     def crear_texto_historial(self):
         """Crea texto para historial reciente"""
         try:
-            ranking = self.gestor_db.obtener_ranking(5)
-            if ranking:
+            victorias = self.gestor_db.obtener_historial(5, victoria=True, jugador_id=self.jugador_id)
+            if victorias:
                 texto = "Últimas 5 victorias:\n"
-                for i, (palabra, intentos, tiempo, fecha, dificultad) in enumerate(ranking, 1):
+                for i, (_, fecha, palabra, intentos, _, tiempo, dificultad) in enumerate(victorias, 1):
                     texto += f"            {i}. {palabra} ({intentos} intentos, {tiempo}s, {dificultad})\n"
             else:
                 texto = "No hay victorias recientes."
@@ -833,7 +1016,7 @@ class PanelEstadisticas(tk.Frame):
     def mostrar_ranking(self):
         """Muestra el ranking de mejores partidas (versión mejorada)"""
         try:
-            ranking = self.gestor_db.obtener_ranking(15)  # Mostrar 15 en lugar de 10
+            ranking = self.gestor_db.obtener_ranking(15, jugador_id=self.jugador_id)  # Mostrar 15 en lugar de 10
             
             if ranking:
                 # Crear ventana emergente más grande
@@ -987,12 +1170,22 @@ class PanelEstadisticas(tk.Frame):
         except Exception as e:
             messagebox.showerror("Error", f"⚠️ No se pudo cargar el ranking:\n{e}")
     
+    def mostrar_historial(self):
+        """Abre la ventana de historial completo"""
+        VentanaHistorial(self, self.gestor_db, self.colores, self.jugador_id)
+    
     def resetear_estadisticas(self):
         """Pregunta al usuario si quiere resetear las estadísticas"""
+        # El reseteo abre una época nueva para toda la base: no hay reseteo por jugador
+        aviso_jugadores = (
+            "• Se resetean las de TODOS LOS JUGADORES, no solo las de este perfil\n"
+            if self.jugador_id is not None else ""
+        )
         respuesta = messagebox.askyesno(
             "⚠️ Confirmar Reseteo de Estadísticas",
             "¿Estás seguro de que quieres RESETEAR TODAS LAS ESTADÍSTICAS?\n\n"
             "⚠️ ADVERTENCIA:\n"
+            f"{aviso_jugadores}"
             "• Se eliminarán TODOS los registros de partidas\n"
             "• Se borrará el COMPLETO historial de ranking\n"
             "• Se perderán TODAS las métricas acumuladas\n"
@@ -1006,17 +1199,16 @@ class PanelEstadisticas(tk.Frame):
                 "⚠️ ÚLTIMA CONFIRMACIÓN",
                 "¿ESTÁS ABSOLUTAMENTE SEGURO?\n\n"
                 "Esta eliminará permanentemente:\n"
-                "✅ Todas tus victorias\n"
-                "✅ Todas tus derrotas\n"
-                "✅ Todo tu progreso\n"
+                "✅ Todas las victorias\n"
+                "✅ Todas las derrotas\n"
+                "✅ El progreso de todos los jugadores\n"
                 "✅ Todo el ranking\n\n"
                 "¿CONFIRMAR ELIMINACIÓN TOTAL?"
             )
             
             if confirmacion:
                 try:
-                    self.gestor_db.cursor.execute("DELETE FROM estadisticas")
-                    self.gestor_db.conn.commit()
+                    self.gestor_db.borrar_estadisticas()
                     self.actualizar_estadisticas()
                     
                     messagebox.showinfo(
@@ -0,0 +1,160 @@
+# repositorio.py
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Tuple
+
+# Palabras iniciales (palabra, dificultad, categoria) de cualquier almacenamiento nuevo
+PALABRAS_FACIL = [
+    ("SOL", "FACIL", "NATURALEZA"),
+    ("LUNA", "FACIL", "NATURALEZA"),
+    ("MESA", "FACIL", "OBJETOS"),
+    ("SILLA", "FACIL", "OBJETOS"),
+    ("CASA", "FACIL", "LUGARES"),
+    ("PERRO", "FACIL", "ANIMALES"),
+    ("GATO", "FACIL", "ANIMALES"),
+    ("AGUA", "FACIL", "ELEMENTOS"),
+    ("FUEGO", "FACIL", "ELEMENTOS"),
+    ("LIBRO", "FACIL", "OBJETOS"),
+    ("LAPIZ", "FACIL", "OBJETOS"),
+    ("FLOR", "FACIL", "NATURALEZA"),
+    ("ARBOL", "FACIL", "NATURALEZA"),
+    ("RIO", "FACIL", "NATURALEZA"),
+    ("PLAYA", "FACIL", "LUGARES"),
+    ("CIELO", "FACIL", "NATURALEZA"),
+    ("ESTRELLA", "FACIL", "NATURALEZA"),
+    ("MANO", "FACIL", "CUERPO"),
+    ("PIE", "FACIL", "CUERPO"),
+    ("CABEZA", "FACIL", "CUERPO")
+]
+
+PALABRAS_MEDIO = [
+    ("PYTHON", "MEDIO", "PROGRAMACION"),
+    ("JAVA", "MEDIO", "PROGRAMACION"),
+    ("HTML", "MEDIO", "TECNOLOGIA"),
+    ("CSS", "MEDIO", "TECNOLOGIA"),
+    ("MYSQL", "MEDIO", "BASE_DATOS"),
+    ("LINUX", "MEDIO", "SISTEMA"),
+    ("WINDOWS", "MEDIO", "SISTEMA"),
+    ("OFFICE", "MEDIO", "SOFTWARE"),
+    ("GOOGLE", "MEDIO", "INTERNET"),
+    ("FACEBOOK", "MEDIO", "REDES"),
+    ("TWITTER", "MEDIO", "REDES"),
+    ("YOUTUBE", "MEDIO", "VIDEO"),
+    ("CAMARA", "MEDIO", "TECNOLOGIA"),
+    ("CELULAR", "MEDIO", "TECNOLOGIA"),
+    ("COMPUTADORA", "MEDIO", "TECNOLOGIA"),
+    ("TECLADO", "MEDIO", "HARDWARE"),
+    ("MONITOR", "MEDIO", "HARDWARE"),
+    ("IMPRESORA", "MEDIO", "HARDWARE"),
+    ("ESCANER", "MEDIO", "HARDWARE"),
+    ("AURICULARES", "MEDIO", "HARDWARE")
+]
+
+PALABRAS_DIFICIL = [
+    ("JAVASCRIPT", "DIFICIL", "PROGRAMACION"),
+    ("REACT", "DIFICIL", "PROGRAMACION"),
+    ("ANGULAR", "DIFICIL", "PROGRAMACION"),
+    ("VUE", "DIFICIL", "PROGRAMACION"),
+    ("DOCKER", "DIFICIL", "DEVOPS"),
+    ("KUBERNETES", "DIFICIL", "DEVOPS"),
+    ("MICROSERVICIOS", "DIFICIL", "ARQUITECTURA"),
+    ("INTELIGENCIA", "DIFICIL", "IA"),
+    ("ARTIFICIAL", "DIFICIL", "IA"),
+    ("ALGORITMO", "DIFICIL", "PROGRAMACION"),
+    ("CRIPTOCURRENCY", "DIFICIL", "FINANZAS"),
+    ("BLOCKCHAIN", "DIFICIL", "TECNOLOGIA"),
+    ("CIBERSEGURIDAD", "DIFICIL", "SEGURIDAD"),
+    ("VULNERABILIDAD", "DIFICIL", "SEGURIDAD"),
+    ("ENCRIPTACION", "DIFICIL", "SEGURIDAD"),
+    ("BIGDATA", "DIFICIL", "DATOS"),
+    ("DATA SCIENCE", "DIFICIL", "CIENCIA"),
+    ("MACHINE LEARNING", "DIFICIL", "IA"),
+    ("DEEP LEARNING", "DIFICIL", "IA"),
+    ("NEURAL NETWORK", "DIFICIL", "IA")
+]
+
+PALABRAS_POR_DEFECTO = PALABRAS_FACIL + PALABRAS_MEDIO + PALABRAS_DIFICIL
+
+DIFICULTADES = ["FACIL", "MEDIO", "DIFICIL"]
+
+# Código entero con el que se guarda cada dificultad en la tabla partidas
+CODIGOS_DIFICULTAD = {nombre: codigo for codigo, nombre in enumerate(DIFICULTADES, 1)}
+
+# Categoría de las palabras que solo se conocen porque se jugaron (no son del diccionario)
+CATEGORIA_SIN_DICCIONARIO = "SIN CATEGORIA"
+
+
+class RepositorioJuego(ABC):
+    """Operaciones de almacenamiento que usa la lógica del juego, independientes del motor"""
+    
+    @abstractmethod
+    def guardar_partida(self, palabra: str, intentos: int, victoria: bool, tiempo: int, dificultad: str,
+                        jugador_id: int = None):
+        """Guarda los resultados de una partida (jugador_id None = invitado)"""
+    
+    @abstractmethod
+    def obtener_estadisticas(self, jugador_id: int = None) -> Dict:
+        """Obtiene estadísticas generales del juego (de todos o de un jugador)"""
+    
+    @abstractmethod
+    def obtener_ranking(self, limite: int = 10, dificultad: str = None,
+                        jugador_id: int = None) -> List[Tuple]:
+        """Mejores victorias (palabra, intentos, tiempo, fecha, dificultad) por intentos y tiempo"""
+    
+    @abstractmethod
+    def obtener_palabra_aleatoria(self, dificultad: str) -> str:
+        """Obtiene una palabra aleatoria según la dificultad"""
+    
+    @abstractmethod
+    def obtener_categoria(self, palabra: str) -> str:
+        """Categoría de una palabra (None si no está guardada)"""
+    
+    @abstractmethod
+    def cerrar(self):
+        """Libera los recursos del almacenamiento"""
+    
+    def sincronizar(self):
+        """Barrera de lectura: espera a que se guarden las partidas pendientes"""
+    
+    def obtener_palabra_alternativa(self, dificultad: str) -> str:
+        """Obtiene una palabra alternativa si no hay para la dificultad"""
+        if dificultad == "FACIL":
+            return "PYTHON"
+        elif dificultad == "MEDIO":
+            return "PROGRAMACION"
+        else:
+            return "DESAFIANTE"
+    
+    @staticmethod
+    def armar_estadisticas(resumen: Dict[str, Tuple[int, int, int]]) -> Dict:
+        """Construye el diccionario de estadísticas desde {dificultad: (partidas, victorias, suma_intentos)}"""
+        victorias = sum(fila[1] for fila in resumen.values())
+        total = sum(fila[0] for fila in resumen.values())
+        derrotas = total - victorias
+        
+        # Promedio de intentos en victorias
+        suma_intentos = sum(fila[2] for fila in resumen.values())
+        avg_intentos = suma_intentos / victorias if victorias else 0
+        
+        # Estadísticas por dificultad
+        stats_dificultad = {}
+        for dificultad in DIFICULTADES:
+            total_dif, victorias_dif, _ = resumen.get(dificultad, (0, 0, 0))
+            
+            if total_dif > 0:
+                porcentaje = (victorias_dif / total_dif) * 100
+            else:
+                porcentaje = 0
+            
+            stats_dificultad[dificultad.lower()] = {
+                "victorias": victorias_dif,
+                "total": total_dif,
+                "porcentaje": round(porcentaje, 1)
+            }
+        
+        return {
+            "victorias": victorias,
+            "derrotas": derrotas,
+            "partidas_totales": total,
+            "promedio_intentos": round(avg_intentos, 2) if avg_intentos else 0,
+            "por_dificultad": stats_dificultad
+        }
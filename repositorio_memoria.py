@@ -0,0 +1,103 @@
+# repositorio_memoria.py
+import heapq
+import random
+from array import array
+from datetime import datetime
+from typing import Dict, List, Tuple
+from repositorio import CATEGORIA_SIN_DICCIONARIO, CODIGOS_DIFICULTAD, PALABRAS_POR_DEFECTO, RepositorioJuego
+
+
+class RepositorioMemoria(RepositorioJuego):
+    """Almacenamiento en memoria, sin SQLite, para pruebas y benchmarks de la lógica del juego"""
+    
+    def __init__(self, palabras=PALABRAS_POR_DEFECTO):
+        # palabra -> (id, dificultad, categoria) y palabras por dificultad para el sorteo
+        self.palabras: Dict[str, Tuple[int, str, str]] = {}
+        self._pool_palabras: Dict[str, List[str]] = {}
+        for palabra, dificultad, categoria in palabras:
+            self.agregar_palabra(palabra, dificultad, categoria)
+        
+        # Partidas por columnas, en orden de guardado
+        self.fechas: List[str] = []
+        self.palabras_jugadas: List[str] = []
+        self.intentos = array("q")
+        self.victorias = array("b")
+        self.tiempos: List[int] = []
+        self.dificultades: List[str] = []
+        self.jugadores: List[int] = []
+        
+        # Resumen por ámbito (None = todos) y dificultad: [partidas, victorias, suma_intentos_victorias]
+        self._resumen: Dict[int, Dict[str, List[int]]] = {None: {}}
+    
+    def agregar_palabra(self, palabra: str, dificultad: str, categoria: str, jugable: bool = True):
+        """Añade una palabra (se ignora si ya existe, como INSERT OR IGNORE)"""
+        if palabra in self.palabras:
+            return
+        self.palabras[palabra] = (len(self.palabras) + 1, dificultad, categoria)
+        if jugable:
+            self._pool_palabras.setdefault(dificultad, []).append(palabra)
+    
+    def guardar_partida(self, palabra: str, intentos: int, victoria: bool, tiempo: int, dificultad: str,
+                        jugador_id: int = None):
+        """Guarda los resultados de una partida (jugador_id None = invitado)"""
+        victoria = 1 if victoria else 0
+        # Igual que SQLite: una palabra jugada que no estaba se guarda, pero fuera del sorteo
+        self.agregar_palabra(palabra, dificultad, CATEGORIA_SIN_DICCIONARIO, jugable=False)
+        self.fechas.append(datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        self.palabras_jugadas.append(palabra)
+        self.intentos.append(intentos)
+        self.victorias.append(victoria)
+        self.tiempos.append(tiempo)
+        self.dificultades.append(dificultad)
+        self.jugadores.append(jugador_id)
+        
+        ambitos = [None] if jugador_id is None else [None, jugador_id]
+        for ambito in ambitos:
+            fila = self._resumen.setdefault(ambito, {}).setdefault(dificultad, [0, 0, 0])
+            fila[0] += 1
+            fila[1] += victoria
+            fila[2] += intentos if victoria else 0
+    
+    def obtener_estadisticas(self, jugador_id: int = None) -> Dict:
+        """Obtiene estadísticas generales del juego (de todos o de un jugador)"""
+        resumen = self._resumen.get(jugador_id, {})
+        return self.armar_estadisticas({dificultad: tuple(fila) for dificultad, fila in resumen.items()})
+    
+    def obtener_ranking(self, limite: int = 10, dificultad: str = None,
+                        jugador_id: int = None) -> List[Tuple]:
+        """Obtiene el ranking de mejores partidas"""
+        candidatas = (
+            i for i in range(len(self.victorias))
+            if self.victorias[i]
+            and (dificultad is None or self.dificultades[i] == dificultad)
+            and (jugador_id is None or self.jugadores[i] == jugador_id)
+        )
+        
+        # Mismo orden que los índices de ranking de SQLite (NULL antes que cualquier número)
+        def clave(i):
+            tiempo = self.tiempos[i]
+            desempate = (self.palabras[self.palabras_jugadas[i]][0], self.fechas[i], i)
+            if dificultad is None:
+                # El índice guarda el código de la dificultad, no su nombre
+                desempate = (CODIGOS_DIFICULTAD.get(self.dificultades[i], 0),) + desempate
+            return (self.intentos[i], tiempo is not None, tiempo or 0) + desempate
+        
+        return [
+            (self.palabras_jugadas[i], self.intentos[i], self.tiempos[i], self.fechas[i], self.dificultades[i])
+            for i in heapq.nsmallest(limite, candidatas, key=clave)
+        ]
+    
+    def obtener_palabra_aleatoria(self, dificultad: str) -> str:
+        """Obtiene una palabra aleatoria según la dificultad"""
+        pool = self._pool_palabras.get(dificultad)
+        if not pool:
+            return self.obtener_palabra_alternativa(dificultad)
+        return random.choice(pool)
+    
+    def obtener_categoria(self, palabra: str) -> str:
+        """Categoría de una palabra (None si no está guardada)"""
+        datos = self.palabras.get(palabra)
+        return datos[2] if datos else None
+    
+    def cerrar(self):
+        """No hay nada que liberar"""
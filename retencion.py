@@ -0,0 +1,301 @@
+# retencion.py
+import json
+import lzma
+import os
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+from epocas import COLUMNAS_ARCHIVO, ArchivadorEpocas, inicio_epoca, primer_id_vigente
+from migraciones import TRAMO_VACIO, ambitos_racha, componer_tramos, sql_nombre_dificultad, tramo_partida
+
+# Cada partida suma en la fila de todos los jugadores (0) y, si tiene jugador, en la suya
+AMBITOS = "JOIN (SELECT 1 AS general UNION ALL SELECT 0) a ON a.general = 1 OR p.jugador_id IS NOT NULL"
+JUGADOR_AMBITO = "CASE a.general WHEN 1 THEN 0 ELSE p.jugador_id END"
+
+# Filas leídas de cada vez al escribir el archivo comprimido
+LOTE_LECTURA = 5000
+
+# Con el preset 6 de lzma el archivo ocupa un 30 % menos pero se tarda siete veces más
+PRESET_LZMA = 3
+
+
+def carpeta_retencion(nombre_db: str) -> str:
+    """Carpeta de los archivos de partidas retenidas: '<base>_retenidas' junto a la base"""
+    ruta = Path(nombre_db).resolve()
+    return str(ruta.with_name(f"{ruta.stem}_retenidas"))
+
+
+def leer_retenidas(ruta: str) -> Iterator[Dict]:
+    """Partidas de un archivo de retención (JSONL comprimido con lzma), una por línea"""
+    with lzma.open(ruta, "rt", encoding="utf-8") as entrada:
+        for linea in entrada:
+            yield json.loads(linea)
+
+
+class RetencionPartidas(ArchivadorEpocas):
+    """Pliega en resúmenes, archiva y borra por lotes las partidas de más de 'dias' días
+    
+    Los resúmenes (estadísticas, tendencias, categorías y rachas) no cambian: las
+    partidas plegadas dejan de restar al borrarse (ver migraciones._m012_retencion)
+    y sus totales quedan en las tablas retenido_* para cuando hay que recalcular.
+    """
+    
+    def __init__(self, conexiones, dias: int, carpeta: str = None, tamano_lote: int = 1000,
+                 paginas_vacuum: int = 256, pausa: float = 0.01):
+        super().__init__(conexiones, tamano_lote, paginas_vacuum, pausa)
+        self.name = "retencion-partidas"
+        self.dias = dias
+        self.carpeta = carpeta or carpeta_retencion(conexiones.nombre_db)
+        self.retenidas = 0
+        self.borradas = 0
+        self.archivo = None
+    
+    def run(self):
+        conn = self.conexiones.conectar()
+        try:
+            if self.retener(conn):
+                self.compactar(conn)
+        except (sqlite3.Error, OSError) as e:
+            self.ultimo_error = e
+            print(f"⚠️ Error reteniendo partidas antiguas: {e}")
+        finally:
+            conn.close()
+    
+    def retener(self, conn: sqlite3.Connection) -> bool:
+        """Termina las pasadas interrumpidas y hace una nueva; False si se detuvo antes de acabar"""
+        # Pasadas de la época actual que se cortaron a medio plegar
+        for (pasada_id,) in conn.execute(
+            "SELECT id FROM retenciones WHERE epoca_inicio = ? AND plegado_hasta < hasta_id ORDER BY id",
+            (inicio_epoca(conn),)
+        ).fetchall():
+            if not self.plegar(conn, pasada_id):
+                return False
+        
+        # Partidas ya plegadas que se quedaron sin borrar
+        for desde, hasta in conn.execute("SELECT desde_id, plegado_hasta FROM retenciones").fetchall():
+            if not self.borrar_plegadas(conn, desde, hasta):
+                return False
+        
+        pasada_id = self.archivar_antiguas(conn)
+        if pasada_id is None:
+            return not self._detener.is_set()
+        return self.plegar(conn, pasada_id)
+    
+    def archivar_antiguas(self, conn: sqlite3.Connection) -> Optional[int]:
+        """Escribe en un JSONL con lzma las partidas antiguas y anota la pasada (None si no hay o se detuvo)"""
+        desde = primer_id_vigente(conn)
+        limite = int(time.time()) - self.dias * 86400
+        # Solo el tramo antiguo contiguo: una partida importada o con el reloj atrasado no
+        # arrastra a las recientes que tengan un id menor que ella
+        reciente = conn.execute(
+            "SELECT MIN(id) FROM partidas WHERE id >= ? AND momento >= ?", (desde, limite)
+        ).fetchone()[0]
+        if reciente is not None:
+            hasta = reciente - 1
+        else:
+            hasta = conn.execute(
+                "SELECT MAX(id) FROM partidas WHERE id >= ? AND momento < ?", (desde, limite)
+            ).fetchone()[0]
+        if hasta is None or hasta < desde:
+            return None
+        
+        # El nombre solo depende de desde: si se corta antes de anotarla, la siguiente pasada lo reescribe
+        Path(self.carpeta).mkdir(parents=True, exist_ok=True)
+        ruta = Path(self.carpeta) / f"{Path(self.conexiones.nombre_db).stem}_partidas_{desde:010d}.jsonl.xz"
+        parcial = ruta.with_name(ruta.name + ".parcial")
+        columnas = COLUMNAS_ARCHIVO.split(", ")
+        escritas = 0
+        try:
+            with lzma.open(parcial, "wt", preset=PRESET_LZMA, encoding="utf-8") as salida:
+                ultimo_id = desde - 1
+                while True:
+                    if self._detener.is_set():
+                        return None
+                    filas = conn.execute(f'''
+                        SELECT {COLUMNAS_ARCHIVO} FROM estadisticas
+                        WHERE id > ? AND id <= ?
+                        ORDER BY id
+                        LIMIT ?
+                    ''', (ultimo_id, hasta, LOTE_LECTURA)).fetchall()
+                    if not filas:
+                        break
+                    for fila in filas:
+                        salida.write(json.dumps(dict(zip(columnas, fila)), ensure_ascii=False))
+                        salida.write("\n")
+                    escritas += len(filas)
+                    ultimo_id = filas[-1][0]
+            with open(parcial, "rb") as archivo:
+                os.fsync(archivo.fileno())
+            os.replace(parcial, ruta)
+        finally:
+            if parcial.exists():
+                parcial.unlink()
+        
+        # Hasta aquí nada ha cambiado en la base; a partir de ahora la pasada se puede reanudar
+        def anotar():
+            with conn:
+                cursor = conn.execute('''
+                    INSERT INTO retenciones (epoca_inicio, desde_id, hasta_id, plegado_hasta, partidas, fecha, archivo)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (inicio_epoca(conn), desde, hasta, desde - 1, escritas,
+                      datetime.now().strftime("%Y-%m-%d %H:%M:%S"), str(ruta)))
+            return cursor.lastrowid
+        
+        self.archivo = str(ruta)
+        return self.conexiones.ejecutar_con_reintentos(anotar)
+    
+    def plegar(self, conn: sqlite3.Connection, pasada_id: int) -> bool:
+        """Pliega y borra por lotes las partidas de una pasada; False si se detuvo o cambió la época"""
+        epoca, hasta = conn.execute(
+            "SELECT epoca_inicio, hasta_id FROM retenciones WHERE id = ?", (pasada_id,)
+        ).fetchone()
+        
+        while not self._detener.is_set():
+            plegado_hasta = conn.execute(
+                "SELECT plegado_hasta FROM retenciones WHERE id = ?", (pasada_id,)
+            ).fetchone()[0]
+            ids = conn.execute(
+                "SELECT id FROM partidas WHERE id > ? AND id <= ? ORDER BY id LIMIT ?",
+                (plegado_hasta, hasta, self.tamano_lote)
+            ).fetchall()
+            desde_lote, hasta_lote = (ids[0][0], ids[-1][0]) if ids else (plegado_hasta + 1, hasta)
+            
+            if not self.conexiones.ejecutar_con_reintentos(self.plegar_lote, conn, pasada_id, epoca,
+                                                           desde_lote, hasta_lote):
+                # Un reseteo a mitad: lo que falta se archiva con su época como cualquier otra partida
+                return False
+            self.retenidas += len(ids)
+            if not ids:
+                return True
+            if not self.borrar_plegadas(conn, desde_lote, hasta_lote):
+                return False
+        return False
+    
+    def plegar_lote(self, conn: sqlite3.Connection, pasada_id: int, epoca: int,
+                    desde: int, hasta: int) -> bool:
+        """Suma a los resúmenes retenidos las partidas [desde, hasta] en una sola transacción"""
+        with conn:
+            # Primero la escritura: con el bloqueo tomado nadie puede empezar otra época entretanto
+            conn.execute("UPDATE retenciones SET plegado_hasta = ? WHERE id = ?", (hasta, pasada_id))
+            if inicio_epoca(conn) != epoca:
+                conn.rollback()
+                return False
+            
+            conn.execute(f'''
+                INSERT INTO retenido_histograma (epoca_inicio, jugador_id, victoria, dificultad, intentos,
+                                                 tiempo_segundos, partidas)
+                SELECT ?, {JUGADOR_AMBITO}, p.victoria, p.dificultad, p.intentos,
+                       COALESCE(p.tiempo_segundos, -1), COUNT(*)
+                FROM partidas p {AMBITOS}
+                WHERE p.id BETWEEN ? AND ?
+                GROUP BY 2, 3, 4, 5, 6
+                ON CONFLICT (epoca_inicio, jugador_id, victoria, dificultad, intentos, tiempo_segundos)
+                DO UPDATE SET partidas = partidas + excluded.partidas
+            ''', (epoca, desde, hasta))
+            conn.execute(f'''
+                INSERT INTO retenido_diario (epoca_inicio, jugador_id, dia, dificultad, partidas, victorias,
+                                             suma_intentos_victorias, suma_tiempo, partidas_con_tiempo)
+                SELECT ?, {JUGADOR_AMBITO}, date(p.momento, 'unixepoch', 'localtime'),
+                       {sql_nombre_dificultad("p.dificultad")},
+                       COUNT(*),
+                       SUM(p.victoria = 1),
+                       SUM(CASE WHEN p.victoria = 1 THEN p.intentos ELSE 0 END),
+                       COALESCE(SUM(p.tiempo_segundos), 0),
+                       COUNT(p.tiempo_segundos)
+                FROM partidas p {AMBITOS}
+                WHERE p.id BETWEEN ? AND ?
+                GROUP BY 2, 3, 4
+                ON CONFLICT (epoca_inicio, jugador_id, dia, dificultad) DO UPDATE SET
+                    partidas = partidas + excluded.partidas,
+                    victorias = victorias + excluded.victorias,
+                    suma_intentos_victorias = suma_intentos_victorias + excluded.suma_intentos_victorias,
+                    suma_tiempo = suma_tiempo + excluded.suma_tiempo,
+                    partidas_con_tiempo = partidas_con_tiempo + excluded.partidas_con_tiempo
+            ''', (epoca, desde, hasta))
+            conn.execute(f'''
+                INSERT INTO retenido_categorias (epoca_inicio, jugador_id, categoria, partidas, victorias,
+                                                 suma_intentos_victorias)
+                SELECT ?, {JUGADOR_AMBITO}, COALESCE(w.categoria, 'GENERAL'),
+                       COUNT(*),
+                       SUM(p.victoria = 1),
+                       SUM(CASE WHEN p.victoria = 1 THEN p.intentos ELSE 0 END)
+                FROM partidas p {AMBITOS}
+                LEFT JOIN palabras w ON w.id = p.palabra_id
+                WHERE p.id BETWEEN ? AND ?
+                GROUP BY 2, 3
+                ON CONFLICT (epoca_inicio, jugador_id, categoria) DO UPDATE SET
+                    partidas = partidas + excluded.partidas,
+                    victorias = victorias + excluded.victorias,
+                    suma_intentos_victorias = suma_intentos_victorias + excluded.suma_intentos_victorias
+            ''', (epoca, desde, hasta))
+            
+            # Rachas: el tramo de la época se alarga con las partidas del lote, en orden
+            tramos = {
+                fila[0]: fila[1:] for fila in conn.execute(
+                    "SELECT ambito, inicial, actual, mejor, completo FROM retenido_rachas WHERE epoca_inicio = ?",
+                    (epoca,)
+                )
+            }
+            for victoria, dificultad, jugador_id in conn.execute(f'''
+                SELECT victoria, {sql_nombre_dificultad("dificultad")}, jugador_id
+                FROM partidas
+                WHERE id BETWEEN ? AND ?
+                ORDER BY id
+            ''', (desde, hasta)).fetchall():
+                for ambito in ambitos_racha(dificultad, jugador_id):
+                    tramos[ambito] = componer_tramos(tramos.get(ambito, TRAMO_VACIO), tramo_partida(victoria))
+            conn.executemany('''
+                INSERT OR REPLACE INTO retenido_rachas (epoca_inicio, ambito, inicial, actual, mejor, completo)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', [(epoca, ambito, *tramo) for ambito, tramo in tramos.items()])
+        return True
+    
+    def borrar_plegadas(self, conn: sqlite3.Connection, desde: int, hasta: int) -> bool:
+        """Borra por lotes las partidas [desde, hasta], ya plegadas; False si se detuvo antes de acabar"""
+        def borrar(primero: int, ultimo: int):
+            with conn:
+                conn.execute("DELETE FROM partidas WHERE id BETWEEN ? AND ?", (primero, ultimo))
+        
+        while not self._detener.is_set():
+            ids = conn.execute(
+                "SELECT id FROM partidas WHERE id BETWEEN ? AND ? ORDER BY id LIMIT ?",
+                (desde, hasta, self.tamano_lote)
+            ).fetchall()
+            if not ids:
+                return True
+            
+            self.conexiones.ejecutar_con_reintentos(borrar, ids[0][0], ids[-1][0])
+            self.borradas += len(ids)
+            
+            # Deja hueco al escritor del juego entre lote y lote
+            time.sleep(self.pausa)
+        return False
+
+
+if __name__ == "__main__":
+    import argparse
+    from conexiones import liberar_conexiones, obtener_conexiones
+    
+    parser = argparse.ArgumentParser(description="Archiva y borra las partidas más antiguas que N días")
+    parser.add_argument("--db", default="juego_palabras.db", help="Ruta de la base de datos")
+    parser.add_argument("--dias", type=int, required=True, help="Días de partidas que se conservan con detalle")
+    parser.add_argument("--carpeta", default=None, help="Carpeta de los archivos (por defecto, '<base>_retenidas')")
+    parser.add_argument("--lote", type=int, default=1000, help="Partidas por transacción")
+    args = parser.parse_args()
+    
+    conexiones = obtener_conexiones(args.db)
+    try:
+        inicio = time.perf_counter()
+        retencion = RetencionPartidas(conexiones, args.dias, args.carpeta, args.lote)
+        retencion.start()
+        retencion.join()
+        if retencion.ultimo_error:
+            raise SystemExit(1)
+        print(f"🗄️ {retencion.retenidas:,} partidas plegadas y {retencion.borradas:,} borradas "
+              f"en {time.perf_counter() - inicio:.1f} s")
+        if retencion.archivo:
+            print(f"📦 Archivo: {retencion.archivo} ({os.path.getsize(retencion.archivo) / 2**20:.1f} MB)")
+    finally:
+        liberar_conexiones(conexiones)
@@ -0,0 +1,312 @@
+# sincronizacion.py
+import heapq
+import json
+import lzma
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+from epocas import adjuntar_archivo, ruta_archivo
+from migraciones import sql_nombre_dificultad
+from repositorio import CODIGOS_DIFICULTAD
+from retencion import PRESET_LZMA, leer_retenidas
+
+# Versión del formato de los archivos de cambios
+FORMATO = 1
+
+# Orden de los valores de cada partida en el archivo (una lista JSON por línea)
+COLUMNAS = ["kiosco", "secuencia", "momento", "palabra", "categoria", "dificultad",
+            "intentos", "victoria", "tiempo_segundos", "jugador"]
+
+# Partidas leídas de cada vez al exportar e insertadas de cada vez al importar
+LOTE = 5000
+
+
+def identidad_kiosco(conn: sqlite3.Connection) -> str:
+    """uuid de esta base (lo crea la migración de sincronización)"""
+    return conn.execute("SELECT uuid FROM kioscos WHERE local = 1").fetchone()[0]
+
+
+def _filas_partidas(conn: sqlite3.Connection, local: str, desde: int) -> Iterator[Tuple]:
+    """Partidas vigentes con id mayor que 'desde', en orden de id y por lotes"""
+    # Las importadas también viajan, con el id global de su kiosco de origen.
+    # Con LEFT JOIN partidas queda por fuera: se recorre su clave desde la marca, sin ordenar nada,
+    # y una partida cuya palabra ya no existe llega como NULL en vez de desaparecer sin aviso
+    consulta = f'''
+        SELECT p.id, COALESCE(k.uuid, ?), COALESCE(p.secuencia, p.id), p.momento, w.palabra, w.categoria,
+               {sql_nombre_dificultad("p.dificultad")}, p.intentos, p.victoria, p.tiempo_segundos, j.nombre
+        FROM partidas p
+        LEFT JOIN palabras w ON w.id = p.palabra_id
+        LEFT JOIN kioscos k ON k.id = p.origen
+        LEFT JOIN jugadores j ON j.id = p.jugador_id
+        WHERE p.id > ?
+        ORDER BY p.id
+        LIMIT ?
+    '''
+    while True:
+        filas = conn.execute(consulta, (local, desde, LOTE)).fetchall()
+        if not filas:
+            return
+        # La marca no puede pasar por encima de una partida sin exportar
+        huerfanas = [fila[0] for fila in filas if fila[4] is None]
+        if huerfanas:
+            raise ValueError(f"Partidas sin palabra (id {', '.join(map(str, huerfanas[:10]))}): "
+                             f"no se exporta nada hasta repararlas")
+        yield from filas
+        desde = filas[-1][0]
+
+
+def _filas_archivo_epocas(gestor, local: str, desde: int) -> Iterator[Tuple]:
+    """Partidas de épocas anteriores ya movidas al archivo, con id mayor que 'desde'"""
+    if gestor.conexiones.en_memoria or not os.path.exists(ruta_archivo(gestor.nombre_db)):
+        return
+    
+    # Conexión propia: la del gestor no puede tener el archivo adjunto mientras el juego escribe
+    conn = gestor.conexiones.conectar()
+    try:
+        adjuntar_archivo(conn, gestor.nombre_db)
+        consulta = '''
+            SELECT a.id, COALESCE(k.uuid, ?), COALESCE(a.secuencia, a.id),
+                   CAST(strftime('%s', a.fecha, 'utc') AS INTEGER), a.palabra, COALESCE(w.categoria, 'GENERAL'),
+                   a.dificultad, a.intentos, a.victoria, a.tiempo_segundos, j.nombre
+            FROM archivo.estadisticas a
+            LEFT JOIN main.palabras w ON w.palabra = a.palabra
+            LEFT JOIN main.kioscos k ON k.id = a.origen
+            LEFT JOIN main.jugadores j ON j.id = a.jugador_id
+            WHERE a.id > ?
+            ORDER BY a.id
+            LIMIT ?
+        '''
+        while True:
+            filas = conn.execute(consulta, (local, desde, LOTE)).fetchall()
+            if not filas:
+                return
+            yield from filas
+            desde = filas[-1][0]
+    finally:
+        conn.close()
+
+
+def _filas_retenidas(conn: sqlite3.Connection, local: str, desde: int) -> Iterator[Tuple]:
+    """Partidas ya plegadas por la retención (de sus archivos comprimidos), con id mayor que 'desde'"""
+    pasadas = conn.execute(
+        "SELECT archivo FROM retenciones WHERE hasta_id > ? ORDER BY desde_id", (desde,)
+    ).fetchall()
+    if not pasadas:
+        return
+    
+    kioscos = dict(conn.execute("SELECT id, uuid FROM kioscos").fetchall())
+    jugadores = dict(conn.execute("SELECT id, nombre FROM jugadores").fetchall())
+    categorias: Dict[str, str] = {}
+    for (archivo,) in pasadas:
+        if not os.path.exists(archivo):
+            # Sin el archivo esas partidas ya no se pueden enviar: mejor pararse que saltarlas
+            raise ValueError(f"Falta el archivo de retención {archivo}: no se exporta nada")
+        for partida in leer_retenidas(archivo):
+            if partida["id"] <= desde:
+                continue
+            palabra = partida["palabra"]
+            if palabra not in categorias:
+                fila = conn.execute("SELECT categoria FROM palabras WHERE palabra = ?", (palabra,)).fetchone()
+                categorias[palabra] = fila[0] if fila else "GENERAL"
+            origen = partida.get("origen")
+            yield (
+                partida["id"],
+                kioscos.get(origen, local) if origen is not None else local,
+                partida.get("secuencia") or partida["id"],
+                int(datetime.strptime(partida["fecha"], "%Y-%m-%d %H:%M:%S").timestamp()),
+                palabra,
+                categorias[palabra],
+                partida["dificultad"],
+                partida["intentos"],
+                partida["victoria"],
+                partida["tiempo_segundos"],
+                jugadores.get(partida["jugador_id"]),
+            )
+
+
+def exportar_cambios(gestor, destino: str, carpeta: str = ".", completo: bool = False) -> Optional[str]:
+    """Escribe las partidas nuevas desde la última exportación a 'destino'; None si no hay ninguna
+    
+    También salen las que un reseteo o la retención ya sacaron de partidas sin haberse
+    exportado. Con completo=True se exporta todo otra vez (p. ej. si se perdió un archivo):
+    importar es idempotente, lo repetido se descarta.
+    """
+    gestor.sincronizar()
+    conn = gestor.conn
+    local = identidad_kiosco(conn)
+    desde = 0
+    if not completo:
+        fila = conn.execute("SELECT hasta_id FROM sincronizaciones WHERE destino = ?", (destino,)).fetchone()
+        desde = fila[0] if fila else 0
+    
+    # Cada fuente va en orden de id: basta mezclarlas. Una partida a medio mover puede estar
+    # en dos a la vez (se copia antes de borrarse), así que se salta el id repetido
+    filas = heapq.merge(
+        _filas_partidas(conn, local, desde),
+        _filas_archivo_epocas(gestor, local, desde),
+        _filas_retenidas(conn, local, desde),
+        key=lambda fila: fila[0]
+    )
+    ruta = Path(carpeta) / f"cambios_{local[:8]}_{destino}_{desde + 1:010d}.jsonl.xz"
+    parcial = ruta.with_name(ruta.name + ".parcial")
+    ultimo_id = desde
+    exportadas = 0
+    try:
+        with lzma.open(parcial, "wt", preset=PRESET_LZMA, encoding="utf-8") as salida:
+            cabecera = {"formato": FORMATO, "origen": local, "destino": destino, "desde_id": desde,
+                        "fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "columnas": COLUMNAS}
+            salida.write(json.dumps(cabecera, ensure_ascii=False) + "\n")
+            # Cuesta lo que ocupen las partidas nuevas, no el historial
+            for fila in filas:
+                if fila[0] == ultimo_id:
+                    continue
+                salida.write(json.dumps(fila[1:], ensure_ascii=False) + "\n")
+                exportadas += 1
+                ultimo_id = fila[0]
+            # El pie permite detectar un archivo cortado al importarlo
+            salida.write(json.dumps({"fin": exportadas, "hasta_id": ultimo_id}) + "\n")
+        if not exportadas:
+            return None
+        with open(parcial, "rb") as archivo:
+            os.fsync(archivo.fileno())
+        os.replace(parcial, ruta)
+    finally:
+        # Cierra la conexión del archivo de épocas si la mezcla se cortó a medias
+        filas.close()
+        if parcial.exists():
+            parcial.unlink()
+    
+    # La marca solo avanza con el archivo ya escrito entero
+    with conn:
+        conn.execute('''
+            INSERT INTO sincronizaciones (destino, hasta_id, fecha) VALUES (?, ?, ?)
+            ON CONFLICT (destino) DO UPDATE SET hasta_id = MAX(hasta_id, excluded.hasta_id), fecha = excluded.fecha
+        ''', (destino, ultimo_id, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+    return str(ruta)
+
+
+def importar_cambios(gestor, ruta: str) -> Dict[str, int]:
+    """Aplica un archivo de cambios en una sola transacción; repetirlo no cambia nada"""
+    gestor.sincronizar()
+    conn = gestor.conn
+    local = identidad_kiosco(conn)
+    kioscos: Dict[str, int] = {}
+    palabras: Dict[str, int] = {}
+    jugadores: Dict[str, int] = {}
+    resultado = {"recibidas": 0, "nuevas": 0, "propias": 0}
+    
+    def id_kiosco(uuid: str) -> int:
+        if uuid not in kioscos:
+            conn.execute("INSERT OR IGNORE INTO kioscos (uuid) VALUES (?)", (uuid,))
+            kioscos[uuid] = conn.execute("SELECT id FROM kioscos WHERE uuid = ?", (uuid,)).fetchone()[0]
+        return kioscos[uuid]
+    
+    def id_palabra(palabra: str, dificultad: str, categoria: str) -> int:
+        if palabra not in palabras:
+            # Una palabra que solo llega jugada no entra en el sorteo de este kiosco
+            conn.execute(
+                "INSERT OR IGNORE INTO palabras (palabra, dificultad, categoria, jugable) VALUES (?, ?, ?, 0)",
+                (palabra, dificultad, categoria)
+            )
+            palabras[palabra] = conn.execute("SELECT id FROM palabras WHERE palabra = ?", (palabra,)).fetchone()[0]
+        return palabras[palabra]
+    
+    def id_jugador(nombre: str) -> Optional[int]:
+        # Los perfiles se emparejan por nombre: el id de cada kiosco no dice nada aquí
+        if nombre is None:
+            return None
+        if nombre not in jugadores:
+            conn.execute(
+                "INSERT OR IGNORE INTO jugadores (nombre, creado) VALUES (?, ?)",
+                (nombre, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            )
+            jugadores[nombre] = conn.execute("SELECT id FROM jugadores WHERE nombre = ?", (nombre,)).fetchone()[0]
+        return jugadores[nombre]
+    
+    def insertar(lote):
+        # partidas_recibidas recuerda lo importado aunque ya no esté en partidas (retención, reseteos)
+        cursor = conn.executemany('''
+            INSERT OR IGNORE INTO partidas (momento, palabra_id, intentos, victoria, tiempo_segundos,
+                                            dificultad, jugador_id, origen, secuencia)
+            SELECT ?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9
+            WHERE NOT EXISTS (SELECT 1 FROM partidas_recibidas WHERE origen = ?8 AND secuencia = ?9)
+        ''', lote)
+        resultado["nuevas"] += cursor.rowcount
+    
+    with lzma.open(ruta, "rt", encoding="utf-8") as entrada:
+        cabecera = json.loads(entrada.readline() or "{}")
+        if cabecera.get("formato") != FORMATO or cabecera.get("columnas") != COLUMNAS:
+            raise ValueError(f"{ruta} no es un archivo de cambios compatible")
+        
+        if conn.in_transaction:
+            conn.commit()
+        pie = None
+        lote = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for linea in entrada:
+                valores = json.loads(linea)
+                if isinstance(valores, dict):
+                    pie = valores
+                    break
+                (kiosco, secuencia, momento, palabra, categoria, dificultad,
+                 intentos, victoria, tiempo, jugador) = valores
+                resultado["recibidas"] += 1
+                
+                # Partidas de esta misma base que vuelven a través de otro kiosco
+                if kiosco == local:
+                    resultado["propias"] += 1
+                    continue
+                lote.append((momento, id_palabra(palabra, dificultad, categoria), intentos, victoria, tiempo,
+                             CODIGOS_DIFICULTAD.get(dificultad, 0), id_jugador(jugador), id_kiosco(kiosco),
+                             secuencia))
+                if len(lote) >= LOTE:
+                    insertar(lote)
+                    lote = []
+            if lote:
+                insertar(lote)
+            
+            if pie is None or pie.get("fin") != resultado["recibidas"]:
+                raise ValueError(f"{ruta} está incompleto: no se importa nada")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    
+    # El buffer de últimas partidas lee de partidas: recoger las recién llegadas
+    gestor.cargar_partidas_recientes()
+    return resultado
+
+
+if __name__ == "__main__":
+    import argparse
+    from gestor_bd import GestorBaseDatos
+    
+    parser = argparse.ArgumentParser(description="Sincroniza partidas entre kioscos con archivos de cambios")
+    parser.add_argument("--db", default="juego_palabras.db", help="Ruta de la base de datos")
+    parser.add_argument("--exportar", metavar="DESTINO",
+                        help="Escribe las partidas nuevas desde la última exportación a DESTINO")
+    parser.add_argument("--carpeta", default=".", help="Carpeta donde se escribe el archivo exportado")
+    parser.add_argument("--completo", action="store_true", help="Exporta todas las partidas, no solo las nuevas")
+    parser.add_argument("--importar", metavar="ARCHIVO", nargs="+", help="Aplica uno o varios archivos de cambios")
+    parser.add_argument("--kiosco", action="store_true", help="Muestra el identificador de esta base")
+    args = parser.parse_args()
+    
+    gestor = GestorBaseDatos(args.db)
+    try:
+        if args.exportar:
+            ruta = exportar_cambios(gestor, args.exportar, args.carpeta, args.completo)
+            print(f"📤 {ruta}" if ruta else f"✅ Nada nuevo para {args.exportar}")
+        elif args.importar:
+            for ruta in args.importar:
+                resultado = importar_cambios(gestor, ruta)
+                print(f"📥 {ruta}: {resultado['nuevas']} nuevas de {resultado['recibidas']} "
+                      f"({resultado['propias']} propias)")
+        elif args.kiosco:
+            print(f"🖥️ Kiosco {identidad_kiosco(gestor.conn)}")
+        else:
+            parser.print_help()
+    finally:
+        gestor.cerrar()
@@ -0,0 +1,6 @@
+# tests/conftest.py
+import sys
+from pathlib import Path
+
+# Los módulos del juego están en la raíz del repositorio
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,145 @@
+# tests/test_escritor_diferido.py
+import sqlite3
+
+import pytest
+
+from gestor_bd import GestorBaseDatos
+
+
+@pytest.fixture
+def ruta(tmp_path):
+    return str(tmp_path / "juego.db")
+
+
+def bloquear(gestor: GestorBaseDatos) -> dict:
+    """Hace que los lotes del escritor fallen como con la base bloqueada mientras estado["bloqueada"]"""
+    estado = {"bloqueada": True}
+    ejecutar = gestor.conexiones.ejecutar_con_reintentos
+    
+    def ejecutar_bloqueada(funcion, *args, **kwargs):
+        if estado["bloqueada"]:
+            raise sqlite3.OperationalError("database is locked")
+        return ejecutar(funcion, *args, **kwargs)
+    
+    gestor.conexiones.ejecutar_con_reintentos = ejecutar_bloqueada
+    return estado
+
+
+def test_lote_fallido_se_avisa_y_se_reintenta(ruta):
+    """Un lote que falla por la base no se pierde: sincronizar avisa y se guarda con el siguiente"""
+    gestor = GestorBaseDatos(ruta, escritura_diferida=True)
+    try:
+        estado = bloquear(gestor)
+        gestor.guardar_partida("PYTHON", 3, True, 20, "MEDIO")
+        with pytest.raises(sqlite3.OperationalError):
+            gestor.sincronizar()
+        # El error se avisa una sola vez
+        gestor.sincronizar()
+        
+        estado["bloqueada"] = False
+        gestor.guardar_partida("PYTHON", 4, False, 30, "MEDIO")
+        assert gestor.obtener_estadisticas()["partidas_totales"] == 2
+    finally:
+        gestor.cerrar()
+
+
+def test_lote_fallido_se_guarda_al_cerrar(ruta):
+    """Lo que queda pendiente de reintentar se guarda al cerrar"""
+    gestor = GestorBaseDatos(ruta, escritura_diferida=True)
+    estado = bloquear(gestor)
+    gestor.guardar_partida("PYTHON", 3, True, 20, "MEDIO")
+    with pytest.raises(sqlite3.OperationalError):
+        gestor.sincronizar()
+    estado["bloqueada"] = False
+    gestor.cerrar()
+    
+    gestor = GestorBaseDatos(ruta)
+    try:
+        assert gestor.obtener_estadisticas()["partidas_totales"] == 1
+    finally:
+        gestor.cerrar()
+
+
+def test_error_al_cerrar_se_lanza(ruta):
+    """Si al cerrar aún no se pueden guardar, cerrar lanza el error en vez de perderlas en silencio"""
+    gestor = GestorBaseDatos(ruta, escritura_diferida=True)
+    bloquear(gestor)
+    gestor.guardar_partida("PYTHON", 3, True, 20, "MEDIO")
+    with pytest.raises(sqlite3.OperationalError):
+        gestor.cerrar()
+
+
+def test_partidas_rechazadas_no_bloquean_las_siguientes(ruta):
+    """Datos que la base rechaza se avisan y no se reintentan con cada lote"""
+    gestor = GestorBaseDatos(ruta, escritura_diferida=True)
+    try:
+        gestor.conn.execute('''
+            CREATE TRIGGER rechazar_negativos BEFORE INSERT ON partidas WHEN NEW.intentos < 0
+            BEGIN SELECT RAISE(ABORT, 'intentos negativos'); END
+        ''')
+        gestor.conn.commit()
+        
+        gestor.guardar_partida("PYTHON", -1, True, 20, "MEDIO")
+        with pytest.raises(sqlite3.IntegrityError):
+            gestor.sincronizar()
+        gestor.guardar_partida("PYTHON", 4, False, 30, "MEDIO")
+        assert gestor.obtener_estadisticas()["partidas_totales"] == 1
+    finally:
+        gestor.cerrar()
+
+
+def test_lote_con_datos_rechazados_guarda_las_demas(ruta, capsys):
+    """Si la base rechaza una partida de un lote, el resto del lote se guarda igual"""
+    gestor = GestorBaseDatos(ruta, escritura_diferida=True)
+    try:
+        gestor.conn.execute('''
+            CREATE TRIGGER rechazar_negativos BEFORE INSERT ON partidas WHEN NEW.intentos < 0
+            BEGIN SELECT RAISE(ABORT, 'intentos negativos'); END
+        ''')
+        gestor.conn.commit()
+        
+        # Con la base bloqueada las dos primeras se acumulan y se reintentan con la tercera
+        estado = bloquear(gestor)
+        gestor.guardar_partida("PYTHON", 3, True, 20, "MEDIO")
+        gestor.guardar_partida("PYTHON", -7, True, 20, "MEDIO")
+        with pytest.raises(sqlite3.OperationalError):
+            gestor.sincronizar()
+        estado["bloqueada"] = False
+        gestor.guardar_partida("PYTHON", 5, False, 30, "MEDIO")
+        
+        with pytest.raises(sqlite3.IntegrityError):
+            gestor.sincronizar()
+        assert gestor.obtener_estadisticas()["partidas_totales"] == 2
+        assert "-7" in capsys.readouterr().out
+    finally:
+        gestor.cerrar()
+
+
+@pytest.mark.parametrize("escritura_diferida", [False, True])
+def test_recientes_solo_cuenta_partidas_guardadas(ruta, escritura_diferida):
+    """Las métricas recientes no incluyen partidas que la base rechazó o aún no guardó"""
+    gestor = GestorBaseDatos(ruta, escritura_diferida=escritura_diferida)
+    try:
+        gestor.conn.execute('''
+            CREATE TRIGGER rechazar_negativos BEFORE INSERT ON partidas WHEN NEW.intentos < 0
+            BEGIN SELECT RAISE(ABORT, 'intentos negativos'); END
+        ''')
+        gestor.conn.commit()
+        
+        gestor.guardar_partida("PYTHON", 3, True, 20, "MEDIO")
+        with pytest.raises(sqlite3.IntegrityError):
+            gestor.guardar_partida("PYTHON", -1, True, 20, "MEDIO")
+            gestor.sincronizar()
+        assert gestor.obtener_metricas_recientes()["partidas"] == 1
+        
+        if escritura_diferida:
+            estado = bloquear(gestor)
+            gestor.guardar_partida("PYTHON", 4, False, 30, "MEDIO")
+            with pytest.raises(sqlite3.OperationalError):
+                gestor.obtener_metricas_recientes()
+            assert gestor.obtener_metricas_recientes()["partidas"] == 1
+            estado["bloqueada"] = False
+            gestor.guardar_partida("PYTHON", 2, True, 10, "MEDIO")
+            assert gestor.obtener_metricas_recientes()["partidas"] == 3
+    finally:
+        gestor.cerrar()
@@ -0,0 +1,39 @@
+# tests/test_gestor_asincrono.py
+import asyncio
+from gestor_asincrono import GestorAsincrono
+from gestor_bd import GestorBaseDatos
+
+
+def test_gestor_sincrono_abierto_antes(tmp_path):
+    """El hilo de la fachada no hereda la conexión de escritura de un gestor de otro hilo"""
+    ruta = str(tmp_path / "juego.db")
+    gestor = GestorBaseDatos(ruta)
+    try:
+        async def principal():
+            async with GestorAsincrono(ruta) as asincrono:
+                await asincrono.guardar_partida("PYTHON", 3, True, 20, "MEDIO")
+                return await asincrono.obtener_estadisticas()
+        
+        assert asyncio.run(principal())["partidas_totales"] == 1
+        gestor.guardar_partida("PYTHON", 4, False, 30, "MEDIO")
+        assert gestor.obtener_estadisticas()["partidas_totales"] == 2
+    finally:
+        gestor.cerrar()
+
+
+def test_gestor_sincrono_abierto_despues(tmp_path):
+    """Con la fachada abierta, un gestor síncrono en otro hilo usa sus propias conexiones"""
+    ruta = str(tmp_path / "juego.db")
+    
+    async def principal():
+        async with GestorAsincrono(ruta) as asincrono:
+            await asincrono.guardar_partida("PYTHON", 3, True, 20, "MEDIO")
+            gestor = GestorBaseDatos(ruta)
+            try:
+                gestor.guardar_partida("PYTHON", 4, False, 30, "MEDIO")
+                assert gestor.obtener_estadisticas()["partidas_totales"] == 2
+            finally:
+                gestor.cerrar()
+            return await asincrono.obtener_estadisticas()
+    
+    assert asyncio.run(principal())["partidas_totales"] == 2
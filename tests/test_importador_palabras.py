@@ -0,0 +1,69 @@
+# tests/test_importador_palabras.py
+import pytest
+
+from gestor_bd import GestorBaseDatos
+from importador_palabras import TRIGGER_VERSION, TRIGGERS_BUSQUEDA, importar_palabras
+
+
+@pytest.fixture
+def gestor(tmp_path):
+    gestor = GestorBaseDatos(str(tmp_path / "juego.db"))
+    yield gestor
+    gestor.cerrar()
+
+
+def version(gestor: GestorBaseDatos) -> int:
+    return gestor.conn.execute("SELECT version FROM contador_cambios WHERE tabla = 'palabras'").fetchone()[0]
+
+
+def triggers(gestor: GestorBaseDatos) -> set:
+    return {fila[0] for fila in gestor.conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+
+
+@pytest.mark.parametrize("reconstruir_indices", [False, True])
+def test_importar_sube_la_version_una_vez_y_se_puede_buscar(gestor, tmp_path, reconstruir_indices):
+    archivo = tmp_path / "palabras.txt"
+    archivo.write_text("\n".join(f"ZORRO{i:04d}" for i in range(500)) + "\n", encoding="utf-8")
+    antes = version(gestor)
+    
+    resultado = importar_palabras(gestor, str(archivo), tamano_lote=100, reconstruir_indices=reconstruir_indices)
+    
+    assert resultado["insertadas"] == 500
+    assert version(gestor) == antes + 1
+    assert {TRIGGER_VERSION, *TRIGGERS_BUSQUEDA} <= triggers(gestor)
+    assert len(gestor.buscar("ZORRO", limite=1000)) == 500
+    
+    # Los triggers vuelven a funcionar para las palabras que lleguen después
+    with gestor.conn:
+        gestor.conn.execute("INSERT INTO palabras (palabra, dificultad, categoria) VALUES ('ZORRUNO', 'MEDIO', 'ANIMALES')")
+    assert version(gestor) == antes + 2
+    assert [datos["palabra"] for datos in gestor.buscar("ZORRUNO")] == ["ZORRUNO"]
+
+
+def test_importar_sin_palabras_nuevas_no_sube_la_version(gestor, tmp_path):
+    archivo = tmp_path / "palabras.txt"
+    archivo.write_text("CASA\nSOL\n", encoding="utf-8")
+    antes = version(gestor)
+    assert importar_palabras(gestor, str(archivo))["insertadas"] == 0
+    assert version(gestor) == antes
+
+
+def test_error_en_la_importacion_conserva_los_triggers(gestor, tmp_path):
+    archivo = tmp_path / "palabras.jsonl"
+    archivo.write_text('{"palabra": "ZORRO"}\nesto no es json\n', encoding="utf-8")
+    with pytest.raises(ValueError):
+        importar_palabras(gestor, str(archivo), tamano_lote=1, reconstruir_indices=True)
+    assert {TRIGGER_VERSION, *TRIGGERS_BUSQUEDA} <= triggers(gestor)
+    assert gestor.buscar("ZORRO") == []
+
+
+def test_importar_hace_jugable_una_palabra_ya_jugada(gestor, tmp_path):
+    """Una palabra que solo se había jugado entra al sorteo cuando llega en el diccionario"""
+    gestor.guardar_partida("ZZQWERTY", 3, True, 20, "FACIL")
+    archivo = tmp_path / "palabras.csv"
+    archivo.write_text("palabra,dificultad,categoria\nZZQWERTY,DIFICIL,RARAS\n", encoding="utf-8")
+    
+    assert importar_palabras(gestor, str(archivo))["insertadas"] == 1
+    assert gestor.obtener_palabra_aleatoria("FACIL") != "ZZQWERTY"
+    assert gestor.obtener_categoria("ZZQWERTY") == "RARAS"
+    assert "ZZQWERTY" in {gestor.obtener_palabra_aleatoria("DIFICIL") for _ in range(300)}
@@ -0,0 +1,26 @@
+# tests/test_indices_ranking.py
+import pytest
+
+from gestor_bd import GestorBaseDatos
+
+
+@pytest.fixture(scope="module")
+def gestor(tmp_path_factory):
+    """Base en archivo con partidas de varios jugadores y dificultades (y estadísticas del planificador)"""
+    gestor = GestorBaseDatos(str(tmp_path_factory.mktemp("indices") / "juego.db"))
+    for i in range(300):
+        gestor.guardar_partida("PYTHON", 1 + i % 6, i % 3 != 0, 10 + i % 50,
+                               ["FACIL", "MEDIO", "DIFICIL"][i % 3], (None, 1, 2)[i // 3 % 3])
+    gestor.conn.execute("ANALYZE")
+    gestor.conn.commit()
+    yield gestor
+    gestor.cerrar()
+
+
+@pytest.mark.parametrize("jugador_id", [None, 1])
+@pytest.mark.parametrize("dificultad", [None, "FACIL", "MEDIO", "DIFICIL"])
+def test_ranking_usa_indice_sin_ordenar(gestor, dificultad, jugador_id):
+    """El ranking recorre un índice de cobertura en orden: nada de B-tree temporal para ordenar"""
+    plan = gestor.obtener_plan_ranking(dificultad, jugador_id)
+    assert any("COVERING INDEX" in paso for paso in plan), plan
+    assert not any("TEMP B-TREE" in paso for paso in plan), plan
@@ -0,0 +1,61 @@
+# tests/test_instrumentacion.py
+import sqlite3
+
+import pytest
+
+from instrumentacion import ConexionInstrumentada, instrumentador
+
+
+@pytest.fixture
+def conn():
+    instrumentador.reiniciar()
+    conexion = sqlite3.connect(":memory:", factory=ConexionInstrumentada)
+    conexion.execute("CREATE TABLE t (a INTEGER)")
+    conexion.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(1000)])
+    yield conexion
+    conexion.close()
+    instrumentador.reiniciar()
+
+
+def metrica(sql: str) -> dict:
+    return next(m for m in instrumentador.snapshot() if m["sentencia"] == sql)
+
+
+def test_recorrido_completo_se_anota_una_vez(conn):
+    assert sum(1 for _ in conn.execute("SELECT a FROM t")) == 1000
+    fila = metrica("SELECT a FROM t")
+    assert fila["llamadas"] == 1
+    assert fila["filas"] == 1000
+
+
+def test_recorrido_cortado_se_anota_al_cerrar(conn):
+    cursor = conn.execute("SELECT a FROM t")
+    for i, _ in enumerate(cursor):
+        if i == 9:
+            break
+    cursor.close()
+    # Se leen lotes enteros: al menos las filas recorridas y nunca más que la tabla
+    assert 10 <= metrica("SELECT a FROM t")["filas"] <= 1000
+
+
+def test_next_directo_se_anota_al_reejecutar(conn):
+    cursor = conn.execute("SELECT a FROM t")
+    next(cursor)
+    next(cursor)
+    cursor.execute("SELECT 1")
+    assert metrica("SELECT a FROM t")["filas"] == 2
+
+
+def test_with_conn_anota_el_commit(conn):
+    conn.commit()
+    antes = metrica("COMMIT")["llamadas"]
+    with conn:
+        conn.execute("INSERT INTO t VALUES (1)")
+    assert metrica("COMMIT")["llamadas"] == antes + 1
+    
+    with pytest.raises(ValueError):
+        with conn:
+            conn.execute("INSERT INTO t VALUES (2)")
+            raise ValueError
+    assert metrica("ROLLBACK")["llamadas"] == 1
+    assert metrica("COMMIT")["llamadas"] == antes + 1
@@ -0,0 +1,121 @@
+# tests/test_repositorio.py
+import pytest
+
+from gestor_bd import GestorBaseDatos
+from repositorio import DIFICULTADES, PALABRAS_POR_DEFECTO
+from repositorio_memoria import RepositorioMemoria
+
+# Partidas fijas (palabra, intentos, victoria, tiempo, dificultad, jugador_id)
+PARTIDAS = [
+    ("SOL", 2, True, 30, "FACIL", None),
+    ("LUNA", 5, False, 80, "FACIL", None),
+    ("PYTHON", 3, True, 45, "MEDIO", 1),
+    ("DOCKER", 1, True, 20, "DIFICIL", 1),
+    ("JAVA", 3, True, 15, "MEDIO", 2),
+    ("REACT", 4, False, 120, "DIFICIL", 2),
+    ("CASA", 2, True, None, "FACIL", 1),
+    ("MESA", 2, True, 30, "FACIL", None),
+]
+
+IMPLEMENTACIONES = {
+    "sqlite": lambda: GestorBaseDatos(":memory:"),
+    "memoria": RepositorioMemoria,
+}
+
+
+@pytest.fixture(params=list(IMPLEMENTACIONES))
+def repo(request):
+    """Cada prueba se ejecuta sobre todos los repositorios: tienen que comportarse igual"""
+    repositorio = IMPLEMENTACIONES[request.param]()
+    yield repositorio
+    repositorio.cerrar()
+
+
+@pytest.fixture
+def repo_con_partidas(repo):
+    for partida in PARTIDAS:
+        repo.guardar_partida(*partida)
+    repo.sincronizar()
+    return repo
+
+
+def estadisticas_esperadas(jugador_id: int = None):
+    """(partidas, victorias, promedio_intentos) calculados a mano desde PARTIDAS"""
+    partidas = [p for p in PARTIDAS if jugador_id is None or p[5] == jugador_id]
+    intentos_victorias = [p[1] for p in partidas if p[2]]
+    promedio = round(sum(intentos_victorias) / len(intentos_victorias), 2) if intentos_victorias else 0
+    return len(partidas), len(intentos_victorias), promedio
+
+
+def test_vacio(repo):
+    estadisticas = repo.obtener_estadisticas()
+    assert estadisticas["partidas_totales"] == 0
+    assert estadisticas["victorias"] == 0
+    assert repo.obtener_ranking() == []
+
+
+@pytest.mark.parametrize("dificultad", DIFICULTADES)
+def test_palabra_aleatoria_por_dificultad(repo, dificultad):
+    dificultades = {palabra: dificultad for palabra, dificultad, _ in PALABRAS_POR_DEFECTO}
+    for _ in range(20):
+        assert dificultades.get(repo.obtener_palabra_aleatoria(dificultad)) == dificultad
+
+
+def test_palabra_jugada_no_entra_en_el_sorteo(repo):
+    """Una palabra que solo se jugó se guarda con su partida, pero no se sirve en partidas nuevas"""
+    repo.guardar_partida("ZZQWERTY", 3, True, 20, "FACIL")
+    assert "ZZQWERTY" not in {repo.obtener_palabra_aleatoria("FACIL") for _ in range(200)}
+    assert repo.obtener_estadisticas()["partidas_totales"] == 1
+
+
+def test_palabra_alternativa(repo):
+    assert repo.obtener_palabra_aleatoria("EXPERTO") == "DESAFIANTE"
+
+
+def test_categoria(repo):
+    assert repo.obtener_categoria("CASA") == "LUGARES"
+    assert repo.obtener_categoria("NOEXISTE") is None
+
+
+@pytest.mark.parametrize("jugador_id", [None, 1, 2, 3])
+def test_estadisticas(repo_con_partidas, jugador_id):
+    estadisticas = repo_con_partidas.obtener_estadisticas(jugador_id)
+    partidas, victorias, promedio = estadisticas_esperadas(jugador_id)
+    assert estadisticas["partidas_totales"] == partidas
+    assert estadisticas["victorias"] == victorias
+    assert estadisticas["derrotas"] == partidas - victorias
+    assert estadisticas["promedio_intentos"] == promedio
+
+
+def test_estadisticas_por_dificultad(repo_con_partidas):
+    facil = repo_con_partidas.obtener_estadisticas()["por_dificultad"]["facil"]
+    assert facil == {"victorias": 3, "total": 4, "porcentaje": 75.0}
+
+
+def test_ranking_general(repo_con_partidas):
+    # Orden por intentos y tiempo (NULL primero, empates por palabra)
+    ranking = [(fila[0], fila[1], fila[2], fila[4]) for fila in repo_con_partidas.obtener_ranking()]
+    assert ranking == [
+        ("DOCKER", 1, 20, "DIFICIL"), ("CASA", 2, None, "FACIL"), ("SOL", 2, 30, "FACIL"),
+        ("MESA", 2, 30, "FACIL"), ("JAVA", 3, 15, "MEDIO"), ("PYTHON", 3, 45, "MEDIO"),
+    ]
+
+
+def test_ranking_por_dificultad(repo_con_partidas):
+    assert [fila[0] for fila in repo_con_partidas.obtener_ranking(dificultad="FACIL")] == ["CASA", "SOL", "MESA"]
+
+
+def test_ranking_por_jugador(repo_con_partidas):
+    assert [fila[0] for fila in repo_con_partidas.obtener_ranking(jugador_id=1)] == ["DOCKER", "CASA", "PYTHON"]
+
+
+def test_ranking_con_limite(repo_con_partidas):
+    assert len(repo_con_partidas.obtener_ranking(limite=2)) == 2
+
+
+def test_ranking_empates_entre_dificultades(repo):
+    """Con mismos intentos y tiempo, sin filtro de dificultad se desempata por su orden (FACIL, MEDIO, DIFICIL)"""
+    for dificultad in ["DIFICIL", "MEDIO", "FACIL"]:
+        repo.guardar_partida("EMPATE", 2, True, 30, dificultad)
+    repo.sincronizar()
+    assert [fila[4] for fila in repo.obtener_ranking()] == ["FACIL", "MEDIO", "DIFICIL"]
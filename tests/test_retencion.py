@@ -0,0 +1,65 @@
+# tests/test_retencion.py
+import time
+
+import pytest
+
+from gestor_bd import GestorBaseDatos
+from retencion import RetencionPartidas
+
+DIA = 86400
+
+
+@pytest.fixture
+def gestor(tmp_path):
+    gestor = GestorBaseDatos(str(tmp_path / "juego.db"))
+    yield gestor
+    gestor.cerrar()
+
+
+def insertar(gestor: GestorBaseDatos, momento: int, cantidad: int = 1):
+    """Partidas con un momento dado, como llegan importadas de otro kiosco"""
+    palabra_id = gestor.conn.execute("SELECT id FROM palabras WHERE palabra = 'PYTHON'").fetchone()[0]
+    with gestor.conn:
+        gestor.conn.executemany('''
+            INSERT INTO partidas (momento, palabra_id, intentos, victoria, tiempo_segundos, dificultad)
+            VALUES (?, ?, 3, 1, 20, 2)
+        ''', [(momento, palabra_id)] * cantidad)
+
+
+def retener(gestor: GestorBaseDatos, tmp_path, dias: int = 30) -> RetencionPartidas:
+    retencion = RetencionPartidas(gestor.conexiones, dias, carpeta=str(tmp_path / "retenidas"), pausa=0)
+    conn = gestor.conexiones.conectar()
+    try:
+        assert retencion.retener(conn)
+    finally:
+        conn.close()
+    return retencion
+
+
+def partidas(gestor: GestorBaseDatos) -> int:
+    return gestor.conn.execute("SELECT COUNT(*) FROM partidas").fetchone()[0]
+
+
+def test_retiene_las_antiguas(gestor, tmp_path):
+    insertar(gestor, int(time.time()) - 60 * DIA, 20)
+    insertar(gestor, int(time.time()), 5)
+    assert retener(gestor, tmp_path).retenidas == 20
+    assert partidas(gestor) == 5
+    assert gestor.obtener_estadisticas()["partidas_totales"] == 25
+
+
+def test_antigua_importada_no_arrastra_a_las_recientes(gestor, tmp_path):
+    """Solo se retiene el tramo antiguo contiguo: una partida antigua con id alto no se lleva las de hoy"""
+    insertar(gestor, int(time.time()) - 60 * DIA, 5)
+    insertar(gestor, int(time.time()), 10)
+    insertar(gestor, int(time.time()) - 90 * DIA)
+    assert retener(gestor, tmp_path).retenidas == 5
+    assert partidas(gestor) == 11
+    assert gestor.obtener_estadisticas()["partidas_totales"] == 16
+
+
+def test_sin_tramo_antiguo_no_hace_nada(gestor, tmp_path):
+    insertar(gestor, int(time.time()), 3)
+    insertar(gestor, int(time.time()) - 90 * DIA)
+    assert retener(gestor, tmp_path).retenidas == 0
+    assert partidas(gestor) == 4
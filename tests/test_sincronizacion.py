@@ -0,0 +1,150 @@
+# tests/test_sincronizacion.py
+import time
+
+import pytest
+
+from gestor_bd import GestorBaseDatos
+from retencion import RetencionPartidas
+from sincronizacion import exportar_cambios, identidad_kiosco, importar_cambios
+
+
+@pytest.fixture
+def kioscos(tmp_path):
+    origen = GestorBaseDatos(str(tmp_path / "origen.db"))
+    destino = GestorBaseDatos(str(tmp_path / "destino.db"))
+    yield origen, destino
+    origen.cerrar()
+    destino.cerrar()
+
+
+def test_exportar_e_importar(kioscos, tmp_path):
+    origen, destino = kioscos
+    origen.guardar_partida("PYTHON", 3, True, 20, "MEDIO")
+    origen.guardar_partida("SOL", 5, False, 60, "FACIL")
+    
+    ruta = exportar_cambios(origen, "central", str(tmp_path))
+    assert importar_cambios(destino, ruta) == {"recibidas": 2, "nuevas": 2, "propias": 0}
+    # Repetir la importación no duplica nada
+    assert importar_cambios(destino, ruta)["nuevas"] == 0
+    assert destino.obtener_estadisticas()["partidas_totales"] == 2
+    # La marca avanzó: no queda nada nuevo
+    assert exportar_cambios(origen, "central", str(tmp_path)) is None
+
+
+def test_partida_sin_palabra_no_se_salta(kioscos, tmp_path):
+    """Una partida cuya palabra no existe detiene la exportación en vez de perderse tras la marca"""
+    origen, _ = kioscos
+    origen.guardar_partida("PYTHON", 3, True, 20, "MEDIO")
+    origen.guardar_partida("SOL", 5, False, 60, "FACIL")
+    with origen.conn:
+        origen.conn.execute("UPDATE partidas SET palabra_id = -1 WHERE id = (SELECT MIN(id) FROM partidas)")
+    
+    with pytest.raises(ValueError, match="sin palabra"):
+        exportar_cambios(origen, "central", str(tmp_path))
+    assert list(tmp_path.glob("cambios_*")) == []
+    assert origen.conn.execute("SELECT COUNT(*) FROM sincronizaciones").fetchone()[0] == 0
+
+
+def insertar_antiguas(gestor: GestorBaseDatos, cantidad: int, dias: int = 60):
+    """Partidas jugadas hace 'dias' días"""
+    palabra_id = gestor.conn.execute("SELECT id FROM palabras WHERE palabra = 'PYTHON'").fetchone()[0]
+    with gestor.conn:
+        gestor.conn.executemany('''
+            INSERT INTO partidas (momento, palabra_id, intentos, victoria, tiempo_segundos, dificultad)
+            VALUES (?, ?, 3, 1, 20, 2)
+        ''', [(int(time.time()) - dias * 86400, palabra_id)] * cantidad)
+
+
+def esperar_archivador(gestor: GestorBaseDatos):
+    archivador = gestor.conexiones.archivador
+    if archivador:
+        archivador.join()
+
+
+def test_reimportar_tras_la_retencion_no_duplica(kioscos, tmp_path):
+    """Lo ya recibido no vuelve a entrar aunque la retención lo haya sacado de partidas"""
+    origen, destino = kioscos
+    insertar_antiguas(origen, 50)
+    ruta = exportar_cambios(origen, "central", str(tmp_path))
+    assert importar_cambios(destino, ruta)["nuevas"] == 50
+    destino.guardar_partida("SOL", 2, True, 10, "FACIL")
+    
+    retencion = RetencionPartidas(destino.conexiones, 30, carpeta=str(tmp_path / "retenidas"))
+    conn = destino.conexiones.conectar()
+    try:
+        assert retencion.retener(conn)
+    finally:
+        conn.close()
+    assert retencion.retenidas == 50
+    
+    assert importar_cambios(destino, ruta)["nuevas"] == 0
+    assert destino.obtener_estadisticas()["partidas_totales"] == 51
+
+
+def test_reimportar_tras_un_reseteo_no_duplica(kioscos, tmp_path):
+    origen, destino = kioscos
+    for _ in range(5):
+        origen.guardar_partida("PYTHON", 3, True, 20, "MEDIO")
+    ruta = exportar_cambios(origen, "central", str(tmp_path))
+    importar_cambios(destino, ruta)
+    destino.borrar_estadisticas()
+    esperar_archivador(destino)
+    
+    assert importar_cambios(destino, ruta)["nuevas"] == 0
+    assert destino.obtener_estadisticas()["partidas_totales"] == 0
+
+
+def test_restaurar_epoca_conserva_el_origen(kioscos, tmp_path):
+    """Las importadas que vuelven del archivo siguen siendo del kiosco que las jugó"""
+    origen, destino = kioscos
+    for _ in range(3):
+        origen.guardar_partida("PYTHON", 3, True, 20, "MEDIO")
+    importar_cambios(destino, exportar_cambios(origen, "central", str(tmp_path)))
+    destino.guardar_partida("SOL", 2, True, 10, "FACIL")
+    destino.borrar_estadisticas()
+    esperar_archivador(destino)
+    destino.restaurar_epoca(1)
+    
+    assert destino.obtener_estadisticas()["partidas_totales"] == 4
+    # Al reenviarlas, el kiosco que las jugó las reconoce como propias
+    (tmp_path / "reenvio").mkdir()
+    ruta = exportar_cambios(destino, "central", str(tmp_path / "reenvio"), completo=True)
+    assert importar_cambios(origen, ruta) == {"recibidas": 4, "nuevas": 1, "propias": 3}
+    uuids = {fila[0] for fila in destino.conn.execute(
+        "SELECT k.uuid FROM partidas p JOIN kioscos k ON k.id = p.origen"
+    )}
+    assert uuids == {identidad_kiosco(origen.conn)}
+
+
+def test_reseteo_antes_de_exportar_no_pierde_partidas(kioscos, tmp_path):
+    """Las partidas que el reseteo mueve al archivo de épocas sin haberse exportado también salen"""
+    origen, destino = kioscos
+    for _ in range(30):
+        origen.guardar_partida("PYTHON", 3, True, 20, "MEDIO")
+    origen.borrar_estadisticas()
+    esperar_archivador(origen)
+    for _ in range(5):
+        origen.guardar_partida("SOL", 2, True, 10, "FACIL")
+    
+    ruta = exportar_cambios(origen, "central", str(tmp_path))
+    assert importar_cambios(destino, ruta) == {"recibidas": 35, "nuevas": 35, "propias": 0}
+    assert exportar_cambios(origen, "central", str(tmp_path)) is None
+
+
+def test_retencion_antes_de_exportar_no_pierde_partidas(kioscos, tmp_path):
+    """Las partidas que la retención pliega sin haberse exportado salen de su archivo"""
+    origen, destino = kioscos
+    insertar_antiguas(origen, 20)
+    origen.guardar_partida("SOL", 2, True, 10, "FACIL")
+    retencion = RetencionPartidas(origen.conexiones, 30, carpeta=str(tmp_path / "retenidas"))
+    conn = origen.conexiones.conectar()
+    try:
+        assert retencion.retener(conn)
+    finally:
+        conn.close()
+    assert retencion.retenidas == 20
+    
+    ruta = exportar_cambios(origen, "central", str(tmp_path))
+    assert importar_cambios(destino, ruta) == {"recibidas": 21, "nuevas": 21, "propias": 0}
+    assert destino.obtener_estadisticas()["partidas_totales"] == 21
+    assert exportar_cambios(origen, "central", str(tmp_path)) is None
@@ -0,0 +1,122 @@
+# ventana_copia_seguridad.py
+import os
+import tkinter as tk
+from tkinter import ttk, messagebox
+from typing import Dict
+from copias_seguridad import CopiaSeguridad, listar_copias
+from gestor_bd import GestorBaseDatos
+
+class VentanaCopiaSeguridad(tk.Toplevel):
+    """Ventana que hace una copia de seguridad en caliente y muestra su avance"""
+    
+    INTERVALO_MS = 100
+    
+    def __init__(self, parent, gestor_db: GestorBaseDatos, colores: Dict = None, conservar: int = 7):
+        super().__init__(parent)
+        self.gestor_db = gestor_db
+        self.conservar = conservar
+        self.copia = None
+        
+        # Colores del menú inicial
+        self.colores = colores or {
+            "fondo_principal": "#1a1a2e",
+            "fondo_secundario": "#16213e",
+            "acento_principal": "#e94560",
+            "texto_principal": "#ffffff",
+            "texto_secundario": "#a5b4cb",
+            "verde": "#4ade80",
+            "rojo": "#f87171",
+            "azul": "#3b82f6"
+        }
+        
+        self.title("💾 Copia de Seguridad")
+        self.geometry("480x260")
+        self.resizable(False, False)
+        self.configure(bg=self.colores["fondo_principal"])
+        self.protocol("WM_DELETE_WINDOW", self.cerrar)
+        
+        self.configurar_interfaz()
+        self.iniciar_copia()
+    
+    def configurar_interfaz(self):
+        """Configura título, barra de progreso, estado y botón"""
+        main_frame = tk.Frame(self, bg=self.colores["fondo_principal"], padx=20, pady=20)
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        tk.Label(
+            main_frame,
+            text="💾 COPIA DE SEGURIDAD",
+            font=("Arial", 16, "bold"),
+            fg=self.colores["acento_principal"],
+            bg=self.colores["fondo_principal"]
+        ).pack(pady=(0, 15))
+        
+        self.barra = ttk.Progressbar(main_frame, orient=tk.HORIZONTAL, length=420, mode="determinate", maximum=100)
+        self.barra.pack(pady=(0, 10))
+        
+        self.label_estado = tk.Label(
+            main_frame,
+            text="Preparando la copia...",
+            font=("Arial", 10),
+            fg=self.colores["texto_secundario"],
+            bg=self.colores["fondo_principal"],
+            wraplength=420,
+            justify=tk.LEFT
+        )
+        self.label_estado.pack(fill=tk.X, pady=(0, 15))
+        
+        self.boton = tk.Button(
+            main_frame,
+            text="❌ Cancelar",
+            font=("Arial", 11, "bold"),
+            bg=self.colores["rojo"],
+            fg="white",
+            padx=15,
+            pady=5,
+            command=self.cerrar,
+            cursor="hand2"
+        )
+        self.boton.pack()
+    
+    def iniciar_copia(self):
+        """Lanza el hilo de la copia y empieza a consultar su avance"""
+        try:
+            self.copia = CopiaSeguridad(self.gestor_db.conexiones, conservar=self.conservar)
+        except ValueError as e:
+            self.terminar(f"❌ {e}", self.colores["rojo"])
+            return
+        self.copia.start()
+        self.after(self.INTERVALO_MS, self.actualizar_progreso)
+    
+    def actualizar_progreso(self):
+        """Refleja el avance del hilo sin bloquear el bucle de Tk"""
+        if not self.winfo_exists():
+            return
+        self.barra["value"] = self.copia.progreso * 100
+        if not self.copia.terminada:
+            self.label_estado.config(text=f"Copiando páginas... {self.copia.progreso:.0%}")
+            self.after(self.INTERVALO_MS, self.actualizar_progreso)
+            return
+        
+        if self.copia.error:
+            self.terminar(f"❌ No se pudo hacer la copia:\n{self.copia.error}", self.colores["rojo"])
+            return
+        guardadas = len(listar_copias(self.gestor_db.conexiones.nombre_db, self.copia.carpeta))
+        self.terminar(
+            f"✅ Copia verificada (quick_check ok):\n{self.copia.ruta}\n"
+            f"{os.path.getsize(self.copia.ruta) / 2**20:.1f} MB | {guardadas} copias guardadas",
+            self.colores["verde"]
+        )
+    
+    def terminar(self, texto: str, color: str):
+        """Muestra el resultado y convierte el botón en 'Cerrar'"""
+        self.label_estado.config(text=texto, fg=color)
+        self.boton.config(text="✅ Cerrar", bg=self.colores["azul"])
+    
+    def cerrar(self):
+        """Cierra la ventana; si la copia sigue en marcha pide confirmación y la cancela"""
+        if self.copia and self.copia.is_alive():
+            if not messagebox.askyesno("💾 Copia de Seguridad", "La copia no ha terminado. ¿Cancelarla?", parent=self):
+                return
+            self.copia.cancelar()
+        self.destroy()
@@ -0,0 +1,196 @@
+# ventana_historial.py
+import tkinter as tk
+from tkinter import ttk, messagebox
+from datetime import datetime, timedelta
+from typing import Dict
+from gestor_bd import GestorBaseDatos
+
+class VentanaHistorial(tk.Toplevel):
+    """Ventana con el historial completo de partidas, cargado por páginas al hacer scroll"""
+    
+    TAMANO_PAGINA = 100
+    
+    def __init__(self, parent, gestor_db: GestorBaseDatos, colores: Dict = None, jugador_id: int = None):
+        super().__init__(parent)
+        self.gestor_db = gestor_db
+        self.jugador_id = jugador_id
+        
+        # Colores del menú inicial
+        self.colores = colores or {
+            "fondo_principal": "#1a1a2e",
+            "fondo_secundario": "#16213e",
+            "fondo_terciario": "#0f3460",
+            "acento_principal": "#e94560",
+            "texto_principal": "#ffffff",
+            "texto_secundario": "#a5b4cb",
+            "verde": "#4ade80",
+            "rojo": "#f87171",
+            "azul": "#3b82f6"
+        }
+        
+        # Estado de la paginación por clave
+        self.filtros = {}
+        self.ultimo_id = None
+        self.agotado = False
+        self.cargando = False
+        self.filas_cargadas = 0
+        
+        self.title("📜 Historial de Partidas")
+        self.geometry("800x550")
+        self.configure(bg=self.colores["fondo_principal"])
+        
+        self.configurar_interfaz()
+        self.aplicar_filtros()
+    
+    def configurar_interfaz(self):
+        """Configura filtros, tabla y barra de estado"""
+        main_frame = tk.Frame(self, bg=self.colores["fondo_principal"], padx=20, pady=20)
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Título
+        tk.Label(
+            main_frame,
+            text="📜 HISTORIAL DE PARTIDAS",
+            font=("Arial", 18, "bold"),
+            fg=self.colores["acento_principal"],
+            bg=self.colores["fondo_principal"]
+        ).pack(pady=(0, 15))
+        
+        # Filtros
+        filtros_frame = tk.Frame(main_frame, bg=self.colores["fondo_secundario"], padx=10, pady=10)
+        filtros_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        self.var_dificultad = tk.StringVar(value="TODAS")
+        self.var_resultado = tk.StringVar(value="TODOS")
+        self.var_desde = tk.StringVar()
+        self.var_hasta = tk.StringVar()
+        
+        campos = [
+            ("Dificultad:", ttk.Combobox(filtros_frame, textvariable=self.var_dificultad, width=9,
+                                         values=["TODAS", "FACIL", "MEDIO", "DIFICIL"], state="readonly")),
+            ("Resultado:", ttk.Combobox(filtros_frame, textvariable=self.var_resultado, width=10,
+                                        values=["TODOS", "VICTORIAS", "DERROTAS"], state="readonly")),
+            ("Desde:", tk.Entry(filtros_frame, textvariable=self.var_desde, width=11)),
+            ("Hasta:", tk.Entry(filtros_frame, textvariable=self.var_hasta, width=11)),
+        ]
+        
+        for texto, widget in campos:
+            tk.Label(
+                filtros_frame,
+                text=texto,
+                font=("Arial", 9, "bold"),
+                bg=self.colores["fondo_secundario"],
+                fg=self.colores["texto_secundario"]
+            ).pack(side=tk.LEFT, padx=(0, 4))
+            widget.pack(side=tk.LEFT, padx=(0, 10))
+        
+        tk.Button(
+            filtros_frame,
+            text="🔍 FILTRAR",
+            font=("Arial", 9, "bold"),
+            bg=self.colores["azul"],
+            fg="white",
+            command=self.aplicar_filtros,
+            cursor="hand2"
+        ).pack(side=tk.RIGHT)
+        
+        # Tabla con scroll
+        tabla_frame = tk.Frame(main_frame, bg=self.colores["fondo_principal"])
+        tabla_frame.pack(fill=tk.BOTH, expand=True)
+        
+        columnas = ("fecha", "palabra", "resultado", "intentos", "tiempo", "dificultad")
+        self.tabla = ttk.Treeview(tabla_frame, columns=columnas, show="headings")
+        for columna, ancho in zip(columnas, (150, 170, 90, 70, 70, 90)):
+            self.tabla.heading(columna, text=columna.upper())
+            self.tabla.column(columna, width=ancho, anchor=tk.CENTER)
+        
+        self.scrollbar = ttk.Scrollbar(tabla_frame, orient="vertical", command=self.tabla.yview)
+        self.tabla.configure(yscrollcommand=self.al_desplazar)
+        
+        self.tabla.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        
+        # Estado
+        self.label_estado = tk.Label(
+            main_frame,
+            text="",
+            font=("Arial", 9, "italic"),
+            bg=self.colores["fondo_principal"],
+            fg=self.colores["texto_secundario"]
+        )
+        self.label_estado.pack(pady=(10, 0))
+    
+    def leer_fecha(self, texto: str, dias_extra: int = 0):
+        """Valida una fecha YYYY-MM-DD; devuelve None si está vacía"""
+        texto = texto.strip()
+        if not texto:
+            return None
+        fecha = datetime.strptime(texto, "%Y-%m-%d") + timedelta(days=dias_extra)
+        return fecha.strftime("%Y-%m-%d")
+    
+    def aplicar_filtros(self):
+        """Lee los filtros, vacía la tabla y carga la primera página"""
+        try:
+            desde = self.leer_fecha(self.var_desde.get())
+            # "Hasta" incluye el día completo
+            hasta = self.leer_fecha(self.var_hasta.get(), dias_extra=1)
+        except ValueError:
+            messagebox.showwarning("⚠️ Fecha no válida", "Usa el formato AAAA-MM-DD.", parent=self)
+            return
+        
+        resultado = self.var_resultado.get()
+        self.filtros = {
+            "dificultad": None if self.var_dificultad.get() == "TODAS" else self.var_dificultad.get(),
+            "victoria": None if resultado == "TODOS" else resultado == "VICTORIAS",
+            "desde": desde,
+            "hasta": hasta,
+            "jugador_id": self.jugador_id
+        }
+        
+        self.tabla.delete(*self.tabla.get_children())
+        self.ultimo_id = None
+        self.agotado = False
+        self.filas_cargadas = 0
+        self.cargar_pagina()
+    
+    def al_desplazar(self, primero, ultimo):
+        """Actualiza la barra y pide otra página al acercarse al final"""
+        self.scrollbar.set(primero, ultimo)
+        if float(ultimo) > 0.9 and not self.agotado and not self.cargando:
+            self.after_idle(self.cargar_pagina)
+    
+    def cargar_pagina(self):
+        """Carga la siguiente página del historial a continuación de la última fila"""
+        if self.cargando or self.agotado:
+            return
+        
+        self.cargando = True
+        try:
+            filas = self.gestor_db.obtener_historial(self.TAMANO_PAGINA, self.ultimo_id, **self.filtros)
+        except Exception as e:
+            self.cargando = False
+            self.agotado = True
+            messagebox.showerror("Error", f"⚠️ No se pudo cargar el historial:\n{e}", parent=self)
+            return
+        
+        for id_partida, fecha, palabra, intentos, victoria, tiempo, dificultad in filas:
+            self.tabla.insert("", tk.END, iid=str(id_partida), values=(
+                fecha,
+                palabra,
+                "✅ Victoria" if victoria else "❌ Derrota",
+                intentos,
+                f"{tiempo}s" if tiempo is not None else "--",
+                dificultad
+            ))
+        
+        if filas:
+            self.ultimo_id = filas[-1][0]
+            self.filas_cargadas += len(filas)
+        if len(filas) < self.TAMANO_PAGINA:
+            self.agotado = True
+        
+        estado = f"{self.filas_cargadas} partidas cargadas"
+        if not self.agotado:
+            estado += " · desplázate para ver más"
+        self.label_estado.config(text=estado)
+        self.cargando = False